@@ -20,6 +20,8 @@ from selenium.common.exceptions import (
 from selenium.webdriver.common.action_chains import ActionChains
 import getpass
 
+import screenshot_catalog
+
 # === CONFIG & PATHS ===
 CWD_XLSX = os.path.join(os.getcwd(), "FY27_Bills_Budget.xlsx")
 REPO_XLSX = os.path.expanduser("~/mrg/finance/FY27_Bills_Budget.xlsx")
@@ -93,8 +95,7 @@ if not PASSWORD:
 
 import spreadsheet_utils
 if CSV_FILE.endswith(".xlsx"):
-    ef = pd.ExcelFile(CSV_FILE)
-    _df_temp = spreadsheet_utils.read_sheet_robust(ef, ["Bills", "Bill", "Budget"])
+    _df_temp = spreadsheet_utils.read_sheet_robust(CSV_FILE, ["Bills", "Bill", "Budget"])
 else:
     _df_temp = pd.read_csv(CSV_FILE)
 _df_temp = _df_temp.astype(object).fillna("")
@@ -143,52 +144,7 @@ else:
 
 def _find_screenshot(item_name, bill_title=""):
     """Find screenshot file for an item using exact, sanitized, and alphanumeric normalized matching."""
-    if not item_name:
-        return None
-
-    import re
-    safe_name = re.sub(r'[<>:"/\\|?*]', '_', item_name)
-    safe_bill = "".join(c if c.isalnum() or c in " -_" else "_" for c in bill_title)
-    dirs_to_check = []
-    if bill_title:
-        dirs_to_check.append(os.path.join(SCREENSHOT_DIR, bill_title))
-        dirs_to_check.append(os.path.join(SCREENSHOT_DIR, safe_bill))
-    dirs_to_check.append(SCREENSHOT_DIR)
-
-    if os.path.isdir(SCREENSHOT_DIR):
-        for sub in os.listdir(SCREENSHOT_DIR):
-            sp = os.path.join(SCREENSHOT_DIR, sub)
-            if os.path.isdir(sp) and sp not in dirs_to_check:
-                dirs_to_check.append(sp)
-
-    alnum_target = re.sub(r'[^a-zA-Z0-9]+', '', item_name.lower())
-
-    for d in dirs_to_check:
-        if not os.path.isdir(d):
-            continue
-        for ext in [".png", ".jpg", ".jpeg", ".pdf"]:
-            exact = os.path.join(d, f"{safe_name}{ext}")
-            if os.path.exists(exact):
-                return exact
-            exact_orig = os.path.join(d, f"{item_name}{ext}")
-            if os.path.exists(exact_orig):
-                return exact_orig
-            alnum_fn = "".join(c if c.isalnum() or c in " -_" else "_" for c in item_name) + ext
-            alnum_path = os.path.join(d, alnum_fn)
-            if os.path.exists(alnum_path):
-                return alnum_path
-
-        # Alphanumeric fallback scan across all files in directory
-        try:
-            for f in os.listdir(d):
-                f_base, f_ext = os.path.splitext(f)
-                if f_ext.lower() in [".png", ".jpg", ".jpeg", ".pdf"]:
-                    if re.sub(r'[^a-zA-Z0-9]+', '', f_base.lower()) == alnum_target:
-                        return os.path.join(d, f)
-        except Exception:
-            pass
-
-    return None
+    return screenshot_catalog.get_catalog(SCREENSHOT_DIR).find_screenshot(item_name, bill_title)
 
 
 # Interactive Screenshot Audit & On-Demand Capture
@@ -258,6 +214,7 @@ if items_to_capture:
                 import price_scraper
                 price_scraper.dismiss_popups_and_interstitials(c_driver)
                 c_driver.save_screenshot(shot_path)
+                screenshot_catalog.get_catalog(SCREENSHOT_DIR).add(shot_path)
                 print(f"✅ Saved ({os.path.basename(shot_path)})")
             except Exception as err:
                 print(f"❌ Failed: {err}")
@@ -436,7 +393,7 @@ def clear_existing_line_items(driver, section_name):
 
 # === Read spreadsheet ===
 if CSV_FILE.endswith(".xlsx"):
-    df = pd.read_excel(CSV_FILE, sheet_name=SHEET_NAME)
+    df = spreadsheet_utils.read_sheet(CSV_FILE, SHEET_NAME)
 else:
     df = pd.read_csv(CSV_FILE)
 df = df.astype(object).fillna("")
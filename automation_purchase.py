@@ -5,7 +5,6 @@ if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 import time
 from datetime import date
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -100,19 +99,17 @@ import warnings
 warnings.filterwarnings('ignore')
 import spreadsheet_utils
 
-excel_file = pd.ExcelFile(XLSX_PATH)
-df_bills = spreadsheet_utils.read_sheet_robust(excel_file, ["Bills", "Bill", "Budget"])
+df_bills = spreadsheet_utils.read_sheet_robust(XLSX_PATH, ["Bills", "Bill", "Budget"])
 
 # Build mapping of Bill Item ID -> Bill Row info
 bill_item_map = {}
+bill_cols = spreadsheet_utils.ColumnResolver(df_bills.columns)
 if not df_bills.empty:
-    for _, row in df_bills.iterrows():
-        r_dict = row.to_dict()
-        b_id = spreadsheet_utils.get_col_val(r_dict, "bill_item_id")
+    for b_id, r_dict in zip(bill_cols.values(df_bills, "bill_item_id"), df_bills.to_dict("records")):
         if b_id:
             bill_item_map[b_id] = r_dict
 
-df_orders = spreadsheet_utils.read_sheet_robust(excel_file, ["Ordering", "Orders", "OrderT"])
+df_orders = spreadsheet_utils.read_sheet_robust(XLSX_PATH, ["Ordering", "Orders", "OrderT"])
 
 # Check for Order ID column name
 oid_col = "Order ID"
@@ -140,11 +137,14 @@ bill_title = ""
 bill_no = ""
 
 order_groups = {}
-for _, row in df_orders.iterrows():
-    r_dict = row.to_dict()
-    order_id = str(spreadsheet_utils.get_col_val(r_dict, "order_id") or row.get(oid_col, "")).strip()
-    item_name = str(spreadsheet_utils.get_col_val(r_dict, "item_name") or "").strip()
-    bill_item_id = str(spreadsheet_utils.get_col_val(r_dict, "bill_item_id") or "").replace(".0", "").strip()
+order_cols = spreadsheet_utils.ColumnResolver(df_orders.columns)
+order_id_values = order_cols.values(df_orders, "order_id")
+order_item_names = order_cols.values(df_orders, "item_name")
+order_bill_item_ids = order_cols.values(df_orders, "bill_item_id")
+for r_dict, oid, name, bid in zip(df_orders.to_dict("records"), order_id_values, order_item_names, order_bill_item_ids):
+    order_id = str(oid or r_dict.get(oid_col, "")).strip()
+    item_name = name.strip()
+    bill_item_id = bid.replace(".0", "").strip()
 
     # Skip header separators or empty rows
     if not order_id or order_id.startswith("Order ") or not (bill_item_id or item_name):
@@ -163,7 +163,7 @@ order_ids = list(order_groups.keys())
 print("\nAvailable Orders:")
 for i, oid in enumerate(order_ids, 1):
     items_in_o = order_groups[oid]
-    v_name = spreadsheet_utils.get_col_val(items_in_o[0], "vendor") if items_in_o else "Unknown"
+    v_name = order_cols.get(items_in_o[0], "vendor") if items_in_o else "Unknown"
     print(f"  {i}. {oid} ({v_name or 'Unknown'}, {len(items_in_o)} items)")
 
 if pre_selected_order:
@@ -185,7 +185,7 @@ bill_title = selected_order_id
 vendor_name = ""
 for row in order_rows:
     r_dict = row if isinstance(row, dict) else row.to_dict()
-    v = str(spreadsheet_utils.get_col_val(r_dict, "vendor") or "").strip()
+    v = order_cols.get(r_dict, "vendor").strip()
     if v:
         vendor_name = v
         break
@@ -195,21 +195,21 @@ purchase_date = date.today().strftime("%Y-%m-%d")
 
 for i, row in enumerate(order_rows):
     r_dict = row if isinstance(row, dict) else row.to_dict()
-    b_id = str(spreadsheet_utils.get_col_val(r_dict, "bill_item_id") or "").replace(".0", "").strip()
+    b_id = order_cols.get(r_dict, "bill_item_id").replace(".0", "").strip()
     b_row = bill_item_map.get(b_id, {})
     has_bill_row = bool(b_row)
 
-    item_bill_no = str(spreadsheet_utils.get_col_val(b_row, "bill_no") or spreadsheet_utils.get_col_val(r_dict, "bill_no") or bill_no or "").replace(".0", "").strip()
+    item_bill_no = str(bill_cols.get(b_row, "bill_no") or order_cols.get(r_dict, "bill_no") or bill_no or "").replace(".0", "").strip()
     if item_bill_no and not bill_no:
         bill_no = item_bill_no
 
-    item_name = str(spreadsheet_utils.get_col_val(r_dict, "item_name") or spreadsheet_utils.get_col_val(b_row, "item_name") or "").strip()
-    description = str(spreadsheet_utils.get_col_val(r_dict, "description") or spreadsheet_utils.get_col_val(b_row, "description") or "").strip()
-    link = str(spreadsheet_utils.get_col_val(r_dict, "link") or spreadsheet_utils.get_col_val(b_row, "link") or "").strip()
-    source_bill_title = str(spreadsheet_utils.get_col_val(b_row, "bill_title") or spreadsheet_utils.get_col_val(r_dict, "bill_title") or "").strip()
+    item_name = str(order_cols.get(r_dict, "item_name") or bill_cols.get(b_row, "item_name") or "").strip()
+    description = str(order_cols.get(r_dict, "description") or bill_cols.get(b_row, "description") or "").strip()
+    link = str(order_cols.get(r_dict, "link") or bill_cols.get(b_row, "link") or "").strip()
+    source_bill_title = str(bill_cols.get(b_row, "bill_title") or order_cols.get(r_dict, "bill_title") or "").strip()
 
-    cost = safe_float(spreadsheet_utils.get_col_val(r_dict, "cost") or spreadsheet_utils.get_col_val(b_row, "cost") or spreadsheet_utils.get_col_val(r_dict, "allocation") or 0.0)
-    qty = safe_int(spreadsheet_utils.get_col_val(r_dict, "quantity") or 1)
+    cost = safe_float(order_cols.get(r_dict, "cost") or bill_cols.get(b_row, "cost") or order_cols.get(r_dict, "allocation") or 0.0)
+    qty = safe_int(order_cols.get(r_dict, "quantity") or 1)
     total = cost * qty
 
     bill_line_ref = f"Bill {item_bill_no or '?'}, Line {b_id or i+1}"
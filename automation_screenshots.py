@@ -6,16 +6,18 @@ if SCRIPT_DIR not in sys.path:
 import time
 import re
 import json
+import threading
 import pandas as pd
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+import screenshot_catalog
+
 # === CONFIG ===
 DEFAULT_XLSX = os.path.expanduser(
     "~/Library/CloudStorage/OneDrive-GeorgiaInstituteofTechnology/"
@@ -27,7 +29,6 @@ SHEET_NAME = "Bills"
 SAVE_FOLDER = "./screenshots"
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REVIEW_HTML = os.path.join(SCRIPT_DIR, "review.html")
-DELAY = 5  # seconds to wait after page load
 MAX_RETRIES = 2  # retry failed page loads
 
 
@@ -284,56 +285,15 @@ def dismiss_popups(driver):
     price_scraper.dismiss_popups_and_interstitials(driver)
 
 
-def wait_for_page_ready(driver, timeout=15):
-    """Wait for the page to fully load."""
-    try:
-        WebDriverWait(driver, timeout).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
-    except TimeoutException:
-        pass
-    time.sleep(2)  # Extra settle for JS content
+def wait_for_page_ready(driver, url=""):
+    """Wait for the page to settle (price rendered, or network idle and DOM stable), up to the vendor's limit."""
+    import price_scraper
+    return price_scraper.wait_for_page_ready(driver, url)
 
 
 def _find_file_in_dir(dir_path, item_name):
     """Find a screenshot file in dir_path using exact, sanitized, space-normalized, or case-insensitive matching."""
-    if not dir_path or not os.path.isdir(dir_path):
-        return None
-
-    # Match the same filename sanitization used when screenshots are saved.
-    def _sanitize_for_filename(name):
-        return "".join(c if c.isalnum() or c in " -_" else "_" for c in str(name or "")).strip()
-
-    safe_name = _sanitize_for_filename(item_name) + ".png"
-    exact = os.path.join(dir_path, safe_name)
-    if os.path.exists(exact):
-        return exact
-
-    # Try exact match after removing punctuation differences that often appear between the UI label and saved filename.
-    alias_candidates = {
-        re.sub(r'[<>:"/\\|?*]', '_', str(item_name or "")) + ".png",
-        safe_name,
-        re.sub(r'\s+', ' ', str(item_name or "")).strip() + ".png",
-    }
-    for candidate in alias_candidates:
-        alt = os.path.join(dir_path, candidate)
-        if os.path.exists(alt):
-            return alt
-
-    target_norm = re.sub(r'\s+', ' ', safe_name).lower()
-    try:
-        for f in os.listdir(dir_path):
-            file_norm = re.sub(r'\s+', ' ', f).lower()
-            if file_norm == target_norm:
-                return os.path.join(dir_path, f)
-            # Also match when punctuation differences exist between item labels and saved filenames.
-            cleaned_f = "".join(c if c.isalnum() or c in " -_" else "_" for c in f).lower()
-            cleaned_target = "".join(c if c.isalnum() or c in " -_" else "_" for c in safe_name).lower()
-            if cleaned_f == cleaned_target:
-                return os.path.join(dir_path, f)
-    except Exception:
-        pass
-    return None
+    return screenshot_catalog.get_catalog(SAVE_FOLDER).find_in_dir(dir_path, item_name)
 
 
 def find_screenshots_for_item(bill_title, item_name, screenshot_file=None, order_id=None):
@@ -1129,7 +1089,8 @@ if __name__ == "__main__":
 
     # === LOAD SPREADSHEET ===
     if CSV_PATH.endswith(".xlsx"):
-        df = pd.read_excel(CSV_PATH, sheet_name=SHEET_NAME)
+        import spreadsheet_utils
+        df = spreadsheet_utils.read_sheet(CSV_PATH, SHEET_NAME)
     else:
         df = pd.read_csv(CSV_PATH, encoding="utf-8", on_bad_lines="skip")
     df = df.astype(object).fillna("")
@@ -1229,6 +1190,8 @@ if __name__ == "__main__":
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
+    import price_scraper
+    price_scraper.enable_network_events(chrome_options)
 
     service = Service()
     driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -1240,6 +1203,18 @@ if __name__ == "__main__":
     review_data = []
     processed = 0
 
+    # Every page needs a screenshot, so the browser still visits each one. Prices are
+    # also fetched over plain HTTP in the background (several at a time) and fill in
+    # for pages whose rendered price can't be read.
+    http_prices = {}
+
+    def _prefetch_http_prices():
+        urls = [str(u).strip() for u in df_filtered["Link"]]
+        for url, scraped in price_scraper.scrape_prices_http([u for u in urls if u.startswith("http")]):
+            http_prices[url] = scraped
+
+    threading.Thread(target=_prefetch_http_prices, name="price-http", daemon=True).start()
+
     for idx, row in df_filtered.iterrows():
         item_name = str(row.get("Item Name", "")).strip()
         url = str(row.get("Link", "")).strip()
@@ -1264,14 +1239,8 @@ if __name__ == "__main__":
         for attempt in range(MAX_RETRIES + 1):
             try:
                 driver.get(url)
-                wait_for_page_ready(driver)
+                wait_for_page_ready(driver, url)
                 dismiss_popups(driver)
-                from urllib.parse import urlparse
-                domain = urlparse(url).netloc.lower()
-                if "amazon" in domain:
-                    time.sleep(DELAY)
-                else:
-                    time.sleep(DELAY - 2)
 
                 scraped_text, confidence = extract_price_from_page(driver, url)
                 parsed = parse_price(scraped_text)
@@ -1279,6 +1248,7 @@ if __name__ == "__main__":
                 safe_filename = re.sub(r'[<>:"/\\|?*]', '_', item_name) + ".png"
                 screenshot_path = os.path.join(SAVE_FOLDER, safe_filename)
                 driver.save_screenshot(screenshot_path)
+                screenshot_catalog.get_catalog(SAVE_FOLDER).add(screenshot_path)
                 screenshot_file = safe_filename
                 print(f"  📸 Saved new screenshot")
                 break
@@ -1298,6 +1268,10 @@ if __name__ == "__main__":
 
         old_shot, new_shot = find_screenshots_for_item(bill_title, item_name, screenshot_file)
 
+        http_price = http_prices.get(url)
+        if (parsed is None or parsed <= 0.0) and http_price:
+            scraped_text, parsed, confidence = http_price["raw_price"], http_price["current_price"], "low"
+
         if parsed is not None and parsed > 0.0:
             status = calculate_review_status(csv_cost, parsed, screenshot_file=screenshot_file)
             if status == "needs_review":
@@ -0,0 +1,112 @@
+"""
+bench_xlsx_reader.py - Compare the xlsx_reader engine with openpyxl on a large synthetic Bills sheet.
+
+    python benchmarks/bench_xlsx_reader.py [--rows 20000] [--repeat 3]
+
+Builds a workbook shaped like FY27_Bills_Budget.xlsx (a Bills sheet with the
+usual columns, separator rows every 8 items, plus Test and Ordering sheets) and
+times each engine reading the Bills sheet the way the web app and CLI do. The
+on-disk workbook_cache is turned off so every run parses the sheet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "web-app"))
+
+import xlsx_reader  # noqa: E402
+import spreadsheet_utils  # noqa: E402
+import xlsx_manager  # noqa: E402
+import workbook_cache  # noqa: E402
+
+# Time parsing, not cache hits (and don't leave pickles of the temp workbooks behind)
+workbook_cache.ENABLED = False
+
+COLUMNS = ["Bill Item ID", "Bill No.", "Bill Title", "Item Name", "Budget Section", "Quantity",
+           "Cost", "Vendor", "Description", "Link", "Total Cost", "Status", "Person", "Notes", "Order ID"]
+VENDORS = ["Amazon", "McMaster-Carr", "DigiKey", "Blue Robotics", "Mouser"]
+
+
+def build_workbook(path: str, rows: int):
+    wb = openpyxl.Workbook(write_only=True)
+    bills = wb.create_sheet("Bills")
+    bills.append(COLUMNS)
+    item_id = 0
+    for i in range(rows):
+        bill = i // 200
+        if i % 8 == 7:
+            bills.append([None, None, f"Request {bill}"] + [None] * (len(COLUMNS) - 3))
+            continue
+        item_id += 1
+        qty, cost = 1 + i % 5, round(3.5 + (i % 97) * 1.25, 2)
+        bills.append([
+            item_id, 1000 + bill, f"Bill {bill} - Subsystem {bill % 7}", f"Part {i} M3x{8 + i % 20} screw",
+            ["Electrical", "Mechanical", "Software"][i % 3], qty, cost, VENDORS[i % len(VENDORS)],
+            f"Spare for assembly {i % 50}", f"https://www.example.com/dp/B0{i:08d}", qty * cost,
+            "bill requested", f"gburdell{i % 9}", "", "",
+        ])
+    queue = wb.create_sheet("Test")
+    queue.append(["Bill Item ID", "Bill No.", "Bill Title", "Item Name", "Quantity", "Cost", "Vendor", "Link"])
+    for i in range(200):
+        queue.append([None, None, None, f"Queued part {i}", 1, 9.99, "Amazon", f"https://www.example.com/q{i}"])
+    ordering = wb.create_sheet("Ordering")
+    ordering.append(["Ordering"])
+    ordering.append(["Order ID", "Bill Item ID", "Item Name", "Quantity", "Status"])
+    for i in range(0, rows, 10):
+        ordering.append([f"2609{i % 30:02d}_amazon_gburdell3", i + 1, f"Part {i}", 1, "ordered"])
+    wb.save(path)
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "FY27_Bills_Budget.xlsx")
+        print(f"Building {args.rows}-row workbook...")
+        build_workbook(path, args.rows)
+        print(f"  {os.path.getsize(path) / 1e6:.1f} MB\n")
+        xlsx_manager.LOCAL_XLSX = path
+
+        benches = [
+            ("raw rows (Bills)",
+             lambda: list(openpyxl.load_workbook(path, read_only=True, data_only=True)["Bills"].iter_rows(values_only=True)),
+             lambda: xlsx_reader.read_rows(path, "Bills")),
+            ("web app records (Bills)",
+             lambda: xlsx_manager._read_local_sheet("Bills", engine="openpyxl"),
+             lambda: xlsx_manager._read_local_sheet("Bills", engine="fast")),
+            ("read_sheet_robust (Bills)",
+             lambda: spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="openpyxl"),
+             lambda: spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")),
+        ]
+
+        assert xlsx_manager._read_local_sheet("Bills", engine="openpyxl") == xlsx_manager._read_local_sheet("Bills", engine="fast")
+
+        print(f"{'benchmark':<28}{'openpyxl':>10}{'fast':>10}{'speedup':>10}")
+        for name, slow, fast in benches:
+            t_slow, t_fast = best_of(args.repeat, slow), best_of(args.repeat, fast)
+            print(f"{name:<28}{t_slow:>9.2f}s{t_fast:>9.2f}s{t_slow / t_fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+browser_pool.py - Warm headless Chrome sessions shared by the price scrapers.
+
+Starting Chrome takes 1-3s, and the add-item link scraper, order price checks,
+`mrg price-check` and price_scraper.scrape_item_price each used to start and quit
+one per call, with their own copy of the options and hard-coded snap paths. This
+module keeps the options in one place and lends drivers out of a small pool:
+
+    with browser_pool.lease() as driver:
+        driver.get(url)
+
+A driver is health-checked before it is handed out, dropped if the lease raised,
+replaced after PAGES_PER_BROWSER leases and quit once idle for IDLE_SECONDS.
+prewarm() starts one in the background ahead of an expected lease.
+
+CHROME_BIN / CHROMEDRIVER_PATH override the browser and driver (default: snap
+Chromium when installed, else whatever Selenium finds). BROWSER_POOL_SIZE and
+BROWSER_IDLE_SECONDS size the pool; every process has its own.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+except ImportError:
+    webdriver = None
+    Options = None
+    Service = None
+
+import price_scraper
+
+_SNAP_CHROME = "/snap/chromium/current/usr/lib/chromium-browser/chrome"
+_SNAP_CHROMEDRIVER = "/snap/chromium/current/usr/lib/chromium-browser/chromedriver"
+
+CHROME_BIN = os.environ.get("CHROME_BIN") or (_SNAP_CHROME if os.path.exists(_SNAP_CHROME) else "")
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH") or (
+    _SNAP_CHROMEDRIVER if os.path.exists(_SNAP_CHROMEDRIVER) else ""
+)
+POOL_SIZE = max(1, int(os.environ.get("BROWSER_POOL_SIZE", "1")))
+IDLE_SECONDS = float(os.environ.get("BROWSER_IDLE_SECONDS", "90"))
+PAGES_PER_BROWSER = 50
+PAGE_LOAD_TIMEOUT = 20
+# How long lease() waits for a browser when all of them are out
+LEASE_WAIT_SECONDS = 60
+
+
+def chrome_options():
+    """The headless Chrome options every scraper uses (CDP network events on, for wait_for_page_ready)."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    if CHROME_BIN:
+        chrome_options.binary_location = CHROME_BIN
+    price_scraper.enable_network_events(chrome_options)
+    return chrome_options
+
+
+def create_driver():
+    """Start a new headless Chrome webdriver (not pooled; the caller quits it)."""
+    if webdriver is None:
+        raise RuntimeError("selenium is not installed")
+    service = Service(CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options())
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool:
+    """Up to size drivers, lent out one lease at a time and reused while healthy."""
+
+    def __init__(self, size: int = POOL_SIZE, idle_seconds: float = IDLE_SECONDS,
+                 max_uses: int = PAGES_PER_BROWSER):
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self.max_uses = max_uses
+        self._idle: list[dict] = []  # {"driver", "uses", "last_used"}, most recently used last
+        self._live = 0  # idle + leased + starting
+        self._leased: dict[int, dict] = {}
+        self._cond = threading.Condition()
+        self._reaper: threading.Thread | None = None
+        self._closed = False
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _start(self) -> dict:
+        try:
+            driver = create_driver()
+        except BaseException:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        return {"driver": driver, "uses": 0, "last_used": time.monotonic()}
+
+    def _discard(self, entry: dict):
+        _quit(entry["driver"])
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    def acquire(self):
+        """Take a healthy driver, starting one if the pool has room. Pair with release()."""
+        deadline = time.monotonic() + LEASE_WAIT_SECONDS
+        while True:
+            with self._cond:
+                while not self._closed and not self._idle and self._live >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("no browser free in the pool")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("browser pool is closed")
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    self._live += 1
+            if entry is None:
+                entry = self._start()
+            elif not self._healthy(entry["driver"]):
+                self._discard(entry)
+                continue
+            with self._cond:
+                closed = self._closed
+                if not closed:
+                    self._leased[id(entry["driver"])] = entry
+            if closed:  # closed while Chrome was starting
+                self._discard(entry)
+                raise RuntimeError("browser pool is closed")
+            return entry["driver"]
+
+    def release(self, driver, healthy: bool = True):
+        """Return a driver from acquire(); healthy=False quits it instead of keeping it."""
+        with self._cond:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            return
+        entry["uses"] += 1
+        if not healthy or self._closed or (self.max_uses > 0 and entry["uses"] >= self.max_uses):
+            self._discard(entry)
+            return
+        entry["last_used"] = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+        self._ensure_reaper()
+
+    @contextmanager
+    def lease(self):
+        """with pool.lease() as driver: ... (the driver is dropped if the block raises)."""
+        driver = self.acquire()
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self.release(driver, healthy)
+
+    def prewarm(self):
+        """Start a driver in the background if none is idle and the pool has room."""
+        with self._cond:
+            if self._closed or self._idle or self._live >= self.size:
+                return
+            self._live += 1
+
+        def start():
+            try:
+                entry = self._start()
+            except Exception as e:
+                print(f"[browser pool] Could not prewarm Chrome: {e}")
+                return
+            with self._cond:
+                closed = self._closed
+                if not closed:
+                    self._idle.append(entry)
+                    self._cond.notify()
+            if closed:
+                self._discard(entry)
+                return
+            self._ensure_reaper()
+
+        threading.Thread(target=start, name="browser-prewarm", daemon=True).start()
+
+    def _ensure_reaper(self):
+        with self._cond:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="browser-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        """Quit drivers idle for longer than idle_seconds; exits once the pool is empty."""
+        while True:
+            time.sleep(max(1.0, min(self.idle_seconds / 2, 30.0)))
+            self.reap()
+            with self._cond:
+                if self._live == 0:
+                    self._reaper = None
+                    return
+
+    def reap(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._cond:
+            expired = [e for e in self._idle if now - e["last_used"] > self.idle_seconds]
+            self._idle = [e for e in self._idle if now - e["last_used"] <= self.idle_seconds]
+        for entry in expired:
+            self._discard(entry)
+
+    def close(self, leased: bool = False):
+        """
+        Quit every idle driver; leased ones are quit when released, or now with
+        leased=True (at exit, or when the lease holder was interrupted and won't return them).
+        """
+        with self._cond:
+            entries, self._idle = self._idle, []
+            if leased:
+                entries += self._leased.values()
+                self._leased = {}
+            self._closed = True
+            self._cond.notify_all()
+        for entry in entries:
+            self._discard(entry)
+
+
+_pool: BrowserPool | None = None
+_pool_pid = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BrowserPool:
+    """This process's pool (a forked child gets its own; drivers can't cross a fork; a closed one is replaced)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid() or _pool._closed:
+            _pool, _pool_pid = BrowserPool(), os.getpid()
+        return _pool
+
+
+def lease():
+    """Lease a warm driver from this process's pool: with browser_pool.lease() as driver: ..."""
+    return get_pool().lease()
+
+
+def prewarm():
+    get_pool().prewarm()
+
+
+@atexit.register
+def _close_pool():
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close(leased=True)
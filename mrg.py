@@ -4,7 +4,7 @@ mrg.py — MRG Finance CLI Tool
 
 Usage:
     mrg-finance report [--fresh] [--order ORDER_ID]
-    mrg-finance doctor [--fresh]
+    mrg-finance doctor [--fresh] [--jobs N] [--incremental]
     mrg-finance bill-request [--fresh] [--bill TITLE]
     mrg-finance purchase [--fresh] [--order ORDER_ID]
     mrg-finance review [--bill TITLE]
@@ -72,17 +72,17 @@ def get_python_executable():
 
 def download_xlsx_via_graph_api(target_path):
     """Download fresh FY27_Bills_Budget.xlsx directly from SharePoint via Graph API."""
-    import requests
     try:
         sys.path.insert(0, os.path.join(SCRIPT_DIR, "web-app"))
         import xlsx_manager
+        import graph_client
         creds = xlsx_manager._get_graph_token()
         if not creds:
             return False
         access_token, drive_id, file_id = creds
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/content"
+        url = f"{graph_client.GRAPH_ROOT}/drives/{drive_id}/items/{file_id}/content"
         headers = {"Authorization": f"Bearer {access_token}"}
-        resp = requests.get(url, headers=headers, timeout=30)
+        resp = graph_client.get(url, headers=headers, timeout=30)
         if resp.status_code == 200:
             os.makedirs(os.path.dirname(target_path), exist_ok=True)
             with open(target_path, "wb") as f:
@@ -128,11 +128,11 @@ def fresh_sync():
 
 def load_xlsx():
     """Load the xlsx and return filtered dataframe."""
-    import pandas as pd
+    import spreadsheet_utils
     import warnings
     warnings.filterwarnings('ignore')
 
-    df = pd.read_excel(XLSX_PATH, sheet_name=SHEET_NAME).astype(object).fillna("")
+    df = spreadsheet_utils.read_sheet(XLSX_PATH, SHEET_NAME).astype(object).fillna("")
     df.columns = df.columns.str.strip()
 
     # Filter to real items
@@ -148,11 +148,11 @@ def load_xlsx():
 
 def load_ordering():
     """Load the Ordering sheet from local xlsx."""
-    import pandas as pd
+    import spreadsheet_utils
     import warnings
     warnings.filterwarnings('ignore')
 
-    df = pd.read_excel(XLSX_PATH, sheet_name=ORDERING_SHEET, header=1).astype(object).fillna("")
+    df = spreadsheet_utils.read_sheet(XLSX_PATH, ORDERING_SHEET, header=1).astype(object).fillna("")
     df.columns = df.columns.str.strip()
     return df
 
@@ -209,6 +209,7 @@ def cmd_screenshots(args):
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
+        price_scraper.enable_network_events(chrome_options)
         service = Service()
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.set_page_load_timeout(20)
@@ -230,8 +231,7 @@ def cmd_screenshots(args):
             driver.get(url)
         except Exception:
             pass
-        import time
-        time.sleep(2)
+        price_scraper.wait_for_page_ready(driver, url)
         price_scraper.dismiss_popups_and_interstitials(driver)
 
         # Screenshot
@@ -380,11 +380,7 @@ def cmd_purchase(args):
 def cmd_price_check(args):
     """Check current prices vs allocation, generate Amazon cart."""
     import re
-    import time
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.common.by import By
+    import browser_pool
 
     df = load_xlsx()
     bill_title = select_bill(df, args.bill)
@@ -392,17 +388,6 @@ def cmd_price_check(args):
 
     print(f"\n💰 Price Check: {bill_title} ({len(items)} items)\n")
 
-    # Setup Chrome
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-
-    service = Service()
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.set_page_load_timeout(20)
-
     results = []
     total_allocated = 0
     total_current = 0
@@ -425,46 +410,47 @@ def cmd_price_check(args):
         except (ValueError, TypeError):
             pass
 
-        current_price = None
-        if url and url.startswith("http"):
-            try:
-                driver.get(url)
-            except Exception:
-                pass
-            time.sleep(3)
-
-            # Scrape price
-            price_text = price_scraper.scrape_price_from_driver(driver)
-            current_price = price_scraper.parse_price(price_text)
-
-        total_allocated += allocated * qty
-        delta_str = "—"
-        if current_price is not None:
-            delta = current_price - allocated
-            total_current += current_price * qty
-            total_overrun += max(0, delta * qty)
-            if delta > 0:
-                delta_str = f"\033[91m+${delta:.2f}\033[0m"  # Red
-            elif delta < 0:
-                delta_str = f"\033[92m-${abs(delta):.2f}\033[0m"  # Green
-            else:
-                delta_str = f"\033[92m$0.00\033[0m"
-            current_str = f"${current_price:.2f}"
-        else:
-            current_str = "—"
-            total_current += allocated * qty
-
-        print(f"  {item_name[:28]:<28} ${allocated:<10.2f} {current_str:<12} {delta_str}")
-
         results.append({
             "name": item_name,
             "url": url,
             "allocated": allocated,
-            "current": current_price,
+            "current": None,
             "qty": qty,
         })
 
-    driver.quit()
+    by_url = {}
+    for r in results:
+        by_url.setdefault(r["url"], []).append(r)
+
+    # Plain HTTP first, a pooled browser only for pages it can't price; rows print as prices arrive
+    try:
+        for url, scraped in price_scraper.check_prices(by_url):
+            for r in by_url[url]:
+                current_price = scraped["current_price"] if scraped else None
+                r["current"] = current_price
+                allocated, qty = r["allocated"], r["qty"]
+
+                total_allocated += allocated * qty
+                delta_str = "—"
+                if current_price is not None:
+                    delta = current_price - allocated
+                    total_current += current_price * qty
+                    total_overrun += max(0, delta * qty)
+                    if delta > 0:
+                        delta_str = f"\033[91m+${delta:.2f}\033[0m"  # Red
+                    elif delta < 0:
+                        delta_str = f"\033[92m-${abs(delta):.2f}\033[0m"  # Green
+                    else:
+                        delta_str = f"\033[92m$0.00\033[0m"
+                    current_str = f"${current_price:.2f}"
+                else:
+                    current_str = "—"
+                    total_current += allocated * qty
+
+                print(f"  {r['name'][:28]:<28} ${allocated:<10.2f} {current_str:<12} {delta_str}")
+    finally:
+        # Also quits a browser the page thread still holds if the run was interrupted
+        browser_pool.get_pool().close(leased=True)
 
     print(f"\n{'='*70}")
     print(f"  Total Allocated: ${total_allocated:.2f}")
@@ -521,7 +507,10 @@ def cmd_doctor(args):
     import spreadsheet_utils
     print(f"\n🩺 Running MRG Finance Spreadsheet Diagnostic Doctor...")
     print(f"   Target file: {XLSX_PATH}\n")
-    results = spreadsheet_utils.validate_budget_spreadsheet(XLSX_PATH)
+    results = spreadsheet_utils.validate_budget_spreadsheet(
+        XLSX_PATH, jobs=getattr(args, "jobs", 1), incremental=getattr(args, "incremental", False))
+    for sheet, (checked, total) in results.get("rechecked", {}).items():
+        print(f"   {sheet}: re-checked {checked} of {total} row(s) changed since the last run")
     print("-" * 75)
     print(f"Summary: {results['summary']}")
     print("-" * 75)
@@ -547,14 +536,12 @@ def cmd_report(args):
 
     if not order_id:
         # Prompt interactively if order ID not specified
-        import pandas as pd
         import spreadsheet_utils
         if not os.path.exists(XLSX_PATH):
             print(f"❌ Spreadsheet not found at {XLSX_PATH}")
             return
         try:
-            ef = pd.ExcelFile(XLSX_PATH)
-            df_orders = spreadsheet_utils.read_sheet_robust(ef, ["Ordering", "Orders", "OrderT"])
+            df_orders = spreadsheet_utils.read_sheet_robust(XLSX_PATH, ["Ordering", "Orders", "OrderT"])
             oid_col = next((c for c in df_orders.columns if "order" in str(c).lower()), "Order ID")
             order_ids = list(dict.fromkeys(str(r.get(oid_col, "")).strip() for _, r in df_orders.iterrows() if str(r.get(oid_col, "")).strip() and not str(r.get(oid_col, "")).strip().startswith("#")))
 
@@ -632,6 +619,8 @@ Examples:
     # doctor
     p_doc = sub.add_parser("doctor", help="Run diagnostic health check on FY27_Bills_Budget.xlsx")
     p_doc.add_argument("--fresh", "-f", action="store_true", help="Sync from SharePoint first")
+    p_doc.add_argument("--jobs", "-j", type=int, default=1, help="Check the Bills and Ordering sheets in parallel (e.g. -j 2)")
+    p_doc.add_argument("--incremental", "-i", action="store_true", help="Only re-check rows changed since the last --incremental run")
 
     args = parser.parse_args()
 
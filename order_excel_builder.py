@@ -254,14 +254,15 @@ def main():
         print(f"❌ Master spreadsheet not found at {excel_path}")
         return
 
-    wb_in = openpyxl.load_workbook(excel_path, data_only=True)
-    df_bills = spreadsheet_utils.read_sheet_robust(wb_in, ["Bills", "Bill", "Budget"])
-    bill_item_map = {spreadsheet_utils.get_col_val(r.to_dict(), "bill_item_id"): r.to_dict() for _, r in df_bills.iterrows() if spreadsheet_utils.get_col_val(r.to_dict(), "bill_item_id")}
+    df_bills = spreadsheet_utils.read_sheet_robust(excel_path, ["Bills", "Bill", "Budget"])
+    bill_cols = spreadsheet_utils.ColumnResolver(df_bills.columns)
+    bill_item_map = {b_id: r for b_id, r in zip(bill_cols.values(df_bills, "bill_item_id"), df_bills.to_dict("records")) if b_id}
 
-    df_orders = spreadsheet_utils.read_sheet_robust(wb_in, ["Ordering", "Orders", "OrderT"])
+    df_orders = spreadsheet_utils.read_sheet_robust(excel_path, ["Ordering", "Orders", "OrderT"])
     oid_col = next((c for c in df_orders.columns if "order" in str(c).lower()), "Order ID")
 
-    order_rows = [r for _, r in df_orders.iterrows() if str(r.get(oid_col, "")).strip() == order_id]
+    order_cols = spreadsheet_utils.ColumnResolver(df_orders.columns)
+    order_rows = [r for r in df_orders.to_dict("records") if str(r.get(oid_col, "")).strip() == order_id]
     if not order_rows:
         print(f"❌ Order '{order_id}' not found in {excel_path}")
         return
@@ -270,14 +271,14 @@ def main():
     scraped_results = {}
     print(f"🔍 Loading {len(order_rows)} item(s) for order {order_id}...")
     for i, row in enumerate(order_rows, 1):
-        b_id = spreadsheet_utils.get_col_val(row.to_dict(), "bill_item_id")
+        b_id = order_cols.get(row, "bill_item_id")
         b_row = bill_item_map.get(b_id, {})
-        b_no = spreadsheet_utils.get_col_val(b_row, "bill_no") or spreadsheet_utils.get_col_val(row.to_dict(), "bill_no") or "376851"
-        item_name = spreadsheet_utils.get_col_val(row.to_dict(), "item_name") or spreadsheet_utils.get_col_val(b_row, "item_name")
-        sec = spreadsheet_utils.get_col_val(b_row, "budget_section") or "B03 - General Inventoried Goods"
-        link = spreadsheet_utils.get_col_val(row.to_dict(), "link") or spreadsheet_utils.get_col_val(b_row, "link")
-        cost = spreadsheet_utils.safe_float(b_row.get("Cost", row.to_dict().get("Allocation", 0)))
-        qty = spreadsheet_utils.safe_int(row.to_dict().get("Quantity", 1))
+        b_no = bill_cols.get(b_row, "bill_no") or order_cols.get(row, "bill_no") or "376851"
+        item_name = order_cols.get(row, "item_name") or bill_cols.get(b_row, "item_name")
+        sec = bill_cols.get(b_row, "budget_section") or "B03 - General Inventoried Goods"
+        link = order_cols.get(row, "link") or bill_cols.get(b_row, "link")
+        cost = spreadsheet_utils.safe_float(b_row.get("Cost", row.get("Allocation", 0)))
+        qty = spreadsheet_utils.safe_int(row.get("Quantity", 1))
 
         if not args.skip_scrape and link and link.startswith("http"):
             res = price_scraper.scrape_item_price(link)
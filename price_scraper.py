@@ -6,9 +6,16 @@ Used by web-app (app.py, screenshot_worker.py) and CLI tools (mrg.py).
 
 from __future__ import annotations
 
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
 from urllib.parse import urlparse
 
+# Concurrent plain-HTTP price fetches in check_prices() before any browser is used
+HTTP_WORKERS = int(os.environ.get("PRICE_HTTP_WORKERS", "8"))
+
 # Vendor domain mappings
 VENDOR_DOMAINS = {
     "amazon": "Amazon",
@@ -199,6 +206,101 @@ def scrape_price_from_driver(driver) -> str:
     return ""
 
 
+# Longest a page may take to settle before we screenshot/scrape it anyway (seconds)
+PAGE_READY_MAX_WAIT = {
+    "Amazon": 8.0,
+    "McMaster-Carr": 10.0,  # product pages render client-side
+    "DigiKey": 8.0,
+    "Mouser": 8.0,
+}
+PAGE_READY_DEFAULT_WAIT = 6.0
+PAGE_READY_QUIET = 0.5  # network idle + DOM unchanged this long counts as settled
+
+# Elements that hold the item price once the product page has rendered (see scrape_price_from_driver)
+_PRICE_READY_SELECTOR = ", ".join([
+    ".priceToPay",
+    "#corePriceDisplay_desktop_feature_div .a-price",
+    "#corePrice_desktop .a-price",
+    "#priceblock_ourprice",
+    "#priceblock_dealprice",
+    "#newBuyBoxPrice",
+    "#price_inside_buybox",
+    '[itemprop="price"]',
+    '[data-testid*="price"]',
+])
+
+_PAGE_STATE_JS = """
+const price = Array.from(document.querySelectorAll(arguments[0])).some(e => /\\d/.test(e.textContent || e.getAttribute("content") || ""));
+return [document.readyState, price, document.getElementsByTagName("*").length,
+        performance.getEntriesByType("resource").length, document.body ? document.body.innerHTML.length : 0];
+"""
+
+
+def enable_network_events(chrome_options):
+    """Ask Chrome for CDP performance logs so wait_for_page_ready can see in-flight requests."""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+
+def _pending_requests(driver, inflight: set) -> int | None:
+    """Update inflight from the CDP Network events logged since the last call. None if logs aren't enabled."""
+    import json
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get("method", "")
+        if method == "Network.requestWillBeSent":
+            inflight.add(message["params"].get("requestId"))
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            inflight.discard(message["params"].get("requestId"))
+    return len(inflight)
+
+
+def wait_for_page_ready(driver, url: str = "", max_wait: float | None = None, poll: float = 0.1) -> str:
+    """
+    Wait until a freshly loaded page is ready to screenshot or scrape, instead of a fixed sleep.
+
+    Returns as soon as a price element has rendered ("price"), or once the network is
+    idle (at most 2 requests in flight, from CDP logs when enable_network_events was
+    used, otherwise no new resource entries) and the DOM has stopped changing for
+    PAGE_READY_QUIET seconds ("idle"). Gives up after the vendor's PAGE_READY_MAX_WAIT
+    ("timeout").
+    """
+    import time
+
+    if max_wait is None:
+        max_wait = PAGE_READY_MAX_WAIT.get(detect_vendor_from_url(url), PAGE_READY_DEFAULT_WAIT)
+    deadline = time.monotonic() + max_wait
+    inflight: set = set()
+    last, stable_since = None, time.monotonic()
+
+    while True:
+        try:
+            ready_state, has_price, *snapshot = driver.execute_script(_PAGE_STATE_JS, _PRICE_READY_SELECTOR)
+        except Exception:
+            ready_state, has_price, snapshot = "loading", False, None
+
+        now = time.monotonic()
+        if ready_state != "loading" and has_price:
+            return "price"
+
+        pending = _pending_requests(driver, inflight)
+        if snapshot != last or (pending is not None and pending > 2):
+            last, stable_since = snapshot, now
+        elif ready_state == "complete" and now - stable_since >= PAGE_READY_QUIET:
+            return "idle"
+
+        if now >= deadline:
+            return "timeout"
+        time.sleep(poll)
+
+
 def dismiss_popups_and_interstitials(driver):
     """
     Dismiss cookie popups, consent dialogs, and Amazon/vendor anti-bot 'Continue shopping' interstitials.
@@ -219,7 +321,7 @@ def dismiss_popups_and_interstitials(driver):
                 try:
                     if btn.is_displayed():
                         btn.click()
-                        time.sleep(3)
+                        wait_for_page_ready(driver, max_wait=3)
                         break
                 except Exception:
                     continue
@@ -279,9 +381,10 @@ def generate_amazon_cart_url(items: list[dict]) -> str:
     return "https://www.amazon.com/gp/aws/cart/add.html?" + "&".join(params)
 
 
-def scrape_item_price(url: str, timeout: int = 10) -> dict | None:
+def scrape_price_http(url: str, timeout: int = 10) -> dict | None:
     """
-    Fetch a product URL and attempt to extract current item price and vendor.
+    Fetch a product URL with a plain HTTP request and extract the price from
+    JSON-LD, price meta tags or common page-source patterns (no browser).
     Returns dict with 'current_price' (float), 'raw_price' (str), 'vendor' (str)
     or None if unparseable/failed.
     """
@@ -298,7 +401,6 @@ def scrape_item_price(url: str, timeout: int = 10) -> dict | None:
         "Accept-Language": "en-US,en;q=0.9",
     }
 
-    # 1. Fast HTTP request strategy
     try:
         import requests
         resp = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
@@ -375,34 +477,135 @@ def scrape_item_price(url: str, timeout: int = 10) -> dict | None:
     except Exception:
         pass
 
-    # 2. Fallback to Selenium headless driver if available
-    try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
+    return None
 
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument(f"user-agent={headers['User-Agent']}")
 
-        driver = webdriver.Chrome(options=chrome_options)
-        try:
-            driver.set_page_load_timeout(timeout)
-            driver.get(url)
-            raw_str = scrape_price_from_driver(driver)
-            p_float = parse_price(raw_str)
-            if p_float is not None:
-                return {
-                    "current_price": p_float,
-                    "raw_price": raw_str,
-                    "vendor": vendor,
-                }
-        finally:
-            driver.quit()
+def scrape_price_browser(driver, url: str) -> dict | None:
+    """Load url in a Selenium driver and scrape the rendered price (same dict as scrape_price_http)."""
+    try:
+        driver.get(url)
     except Exception:
         pass
+    wait_for_page_ready(driver, url)
+    raw_str = scrape_price_from_driver(driver)
+    p_float = parse_price(raw_str)
+    if p_float is None:
+        return None
+    return {
+        "current_price": p_float,
+        "raw_price": raw_str,
+        "vendor": detect_vendor_from_url(url),
+    }
 
-    return None
 
+def _leased_browser_price(url: str) -> dict | None:
+    import browser_pool
+
+    with browser_pool.lease() as driver:
+        return scrape_price_browser(driver, url)
+
+
+def scrape_item_price(url: str, timeout: int = 10) -> dict | None:
+    """
+    Fetch a product URL and attempt to extract current item price and vendor:
+    plain HTTP first, then a pooled headless browser if that finds nothing.
+    Returns dict with 'current_price' (float), 'raw_price' (str), 'vendor' (str)
+    or None if unparseable/failed.
+    """
+    if not isinstance(url, str) or not url.strip() or not url.startswith("http"):
+        return None
+
+    result = scrape_price_http(url, timeout)
+    if result is not None:
+        return result
+    try:
+        return _leased_browser_price(url)
+    except Exception:
+        return None
+
+
+def scrape_prices_http(urls, workers: int = HTTP_WORKERS, timeout: int = 10):
+    """Yield (url, scrape_price_http result) for each distinct URL as soon as it finishes, `workers` at a time."""
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls))), thread_name_prefix="price-http")
+    try:
+        futures = {pool.submit(scrape_price_http, url, timeout): url for url in urls}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception:
+                yield futures[future], None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def check_prices(urls, browser=None, workers: int = HTTP_WORKERS, timeout: int = 10):
+    """
+    Yield (url, result) for each distinct URL as soon as its price is known, where
+    result is a scrape_price_http-style dict or None.
+
+    Every URL is first tried over plain HTTP, `workers` requests at a time. Only the
+    ones HTTP finds no price for go to browser(url) (default: a driver leased from
+    browser_pool), one at a time on their own thread, so browser pages overlap with
+    the remaining HTTP requests. Closing the generator early doesn't wait for a page
+    in progress; the background threads stop after it.
+    """
+    urls = list(dict.fromkeys(urls))
+    web = [url for url in urls if isinstance(url, str) and url.startswith("http")]
+    for url in urls:
+        if url not in web:
+            yield url, None
+    if not web:
+        return
+
+    browser = browser or _leased_browser_price
+    results: Queue = Queue()
+    escalated: Queue = Queue()
+    stop = threading.Event()
+
+    def fetch_loop():
+        http = scrape_prices_http(web, workers, timeout)
+        handled = set()
+        try:
+            for url, result in http:
+                if stop.is_set():
+                    break
+                handled.add(url)
+                if result is not None:
+                    results.put((url, result))
+                else:
+                    escalated.put(url)
+        except Exception as e:
+            print(f"[price check] HTTP price checks failed: {e}")
+        finally:
+            http.close()
+            escalated.put(None)
+            # Every URL gets a result, so the consumer never waits on one that was dropped
+            for url in web:
+                if url not in handled:
+                    results.put((url, None))
+
+    def browser_loop():
+        while True:
+            url = escalated.get()
+            if url is None or stop.is_set():
+                return
+            try:
+                results.put((url, browser(url)))
+            except Exception as e:
+                print(f"[price check] Browser scrape failed for {url}: {e}")
+                results.put((url, None))
+
+    threads = [threading.Thread(target=fetch_loop, name="price-http-feed", daemon=True),
+               threading.Thread(target=browser_loop, name="price-browser", daemon=True)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in web:
+            yield results.get()
+    finally:
+        # Don't join: the browser thread may be mid-page for a while. It exits after that page.
+        stop.set()
+        escalated.put(None)
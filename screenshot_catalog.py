@@ -0,0 +1,195 @@
+"""
+screenshot_catalog.py - One scan of screenshots/ per CLI run, answering filename lookups from memory.
+
+automation.py and automation_screenshots.py look up a screenshot for every item of
+a bill, each with its own fuzzy filename rules (sanitized names, collapsed
+whitespace, case, alphanumeric-only, .png/.jpg/.jpeg/.pdf). Previously every lookup
+listed the directories again. A catalog walks the tree once, on first use, and
+keeps per-folder maps for each of those name forms, so a lookup is a few dict
+probes. Files written during the run are added with add().
+
+    catalog = screenshot_catalog.get_catalog("screenshots")
+    catalog.find_in_dir("screenshots/Drive Train", "Thruster T200")
+    catalog.find_screenshot("Thruster T200", "Drive Train")
+"""
+
+from __future__ import annotations
+
+import os
+import re
+
+EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf")
+
+
+def sanitize(name) -> str:
+    """The filename sanitization used when screenshots are saved."""
+    return "".join(c if c.isalnum() or c in " -_" else "_" for c in str(name or ""))
+
+
+def _space_norm(name: str) -> str:
+    return re.sub(r'\s+', ' ', name).lower()
+
+
+def _alnum(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9]+', '', name.lower())
+
+
+class _Folder:
+    """Name maps for one directory's files, first file (in listing order) winning for each key."""
+
+    def __init__(self, names: list[str]):
+        self.names: set[str] = set()
+        self.by_space: dict[str, tuple[int, str]] = {}
+        self.by_clean: dict[str, tuple[int, str]] = {}
+        self.by_alnum: dict[str, tuple[int, str]] = {}
+        self.count = 0
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        if name in self.names:
+            return
+        self.names.add(name)
+        entry = (self.count, name)
+        self.count += 1
+        self.by_space.setdefault(_space_norm(name), entry)
+        self.by_clean.setdefault(sanitize(name).lower(), entry)
+        base, ext = os.path.splitext(name)
+        if ext.lower() in EXTENSIONS:
+            self.by_alnum.setdefault(_alnum(base), entry)
+
+
+class ScreenshotCatalog:
+    """Filename index of a screenshots root and every folder below it."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._folders: dict[str, _Folder | None] = {}
+        self._subdirs: list[str] = []  # root's immediate subfolders, in listing order
+        self._alnum_dirs: dict[str, list[str]] = {}  # alnum key -> folders holding such a file
+        self._scanned = False
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normpath(os.path.abspath(path))
+
+    def _scan(self):
+        self._scanned = True
+        root_key = self._key(self.root)
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            key = self._key(dirpath)
+            self._set_folder(key, _Folder(filenames))
+            if key == root_key:
+                self._subdirs = [os.path.join(dirpath, d) for d in dirnames]
+
+    def _set_folder(self, key: str, folder: _Folder | None):
+        self._folders[key] = folder
+        if folder is not None:
+            for alnum in folder.by_alnum:
+                self._alnum_dirs.setdefault(alnum, []).append(key)
+
+    def folder(self, path: str) -> _Folder | None:
+        """The name maps for a folder (listed on first use if outside the root), None if it doesn't exist."""
+        if not self._scanned:
+            self._scan()
+        key = self._key(path)
+        if key not in self._folders:
+            try:
+                names = [e.name for e in os.scandir(path) if e.is_file()]
+            except OSError:
+                names = None
+            self._set_folder(key, _Folder(names) if names is not None else None)
+        return self._folders[key]
+
+    def add(self, path: str):
+        """Record a file written during this run."""
+        if not self._scanned:
+            self._scan()
+        dir_path = os.path.dirname(path) or "."
+        known = self._key(dir_path) in self._folders
+        folder = self.folder(dir_path)
+        if not known and os.path.dirname(self._key(dir_path)) == self._key(self.root):
+            self._subdirs.append(dir_path)  # new bill folder
+        if folder is None:
+            # Folder created since we last looked: list it now (includes the new file)
+            del self._folders[self._key(dir_path)]
+            self.folder(dir_path)
+            return
+        name = os.path.basename(path)
+        base, ext = os.path.splitext(name)
+        if ext.lower() in EXTENSIONS and _alnum(base) not in folder.by_alnum:
+            self._alnum_dirs.setdefault(_alnum(base), []).append(self._key(dir_path))
+        folder.add(name)
+
+    def find_in_dir(self, dir_path: str, item_name: str) -> str | None:
+        """
+        Find an item's .png in dir_path: the saved (sanitized) name, then common
+        punctuation/whitespace variants, then any file matching after collapsing
+        whitespace and case, or after sanitizing both names.
+        """
+        if not dir_path:
+            return None
+        folder = self.folder(dir_path)
+        if folder is None:
+            return None
+
+        safe_name = sanitize(item_name).strip() + ".png"
+        candidates = [
+            safe_name,
+            re.sub(r'[<>:"/\\|?*]', '_', str(item_name or "")) + ".png",
+            re.sub(r'\s+', ' ', str(item_name or "")).strip() + ".png",
+        ]
+        for candidate in candidates:
+            if candidate in folder.names:
+                return os.path.join(dir_path, candidate)
+
+        hits = [h for h in (folder.by_space.get(_space_norm(safe_name)), folder.by_clean.get(sanitize(safe_name).lower())) if h]
+        return os.path.join(dir_path, min(hits)[1]) if hits else None
+
+    def find_screenshot(self, item_name: str, bill_title: str = "") -> str | None:
+        """
+        Find an item's screenshot (.png/.jpg/.jpeg/.pdf) under the root: the bill's
+        folder first, then the root, then every other bill folder. Exact and sanitized
+        names win over an alphanumeric-only match within each folder.
+        """
+        if not item_name:
+            return None
+        if not self._scanned:
+            self._scan()
+
+        # Any match below has the same alphanumeric key, so only folders holding one need checking
+        holding = set(self._alnum_dirs.get(_alnum(item_name), ()))
+        if not holding:
+            return None
+
+        dirs = []
+        if bill_title:
+            dirs += [os.path.join(self.root, bill_title), os.path.join(self.root, sanitize(bill_title))]
+        dirs.append(self.root)
+        listed = {self._key(d) for d in dirs}
+        dirs += [d for d in self._subdirs if self._key(d) in holding and self._key(d) not in listed]
+
+        exact_names = [re.sub(r'[<>:"/\\|?*]', '_', item_name), item_name, sanitize(item_name)]
+        for d in dirs:
+            if self._key(d) not in holding:
+                continue
+            folder = self.folder(d)
+            for ext in EXTENSIONS:
+                for base in exact_names:
+                    if base + ext in folder.names:
+                        return os.path.join(d, base + ext)
+            hit = folder.by_alnum.get(_alnum(item_name))
+            if hit:
+                return os.path.join(d, hit[1])
+        return None
+
+
+_catalogs: dict[str, ScreenshotCatalog] = {}
+
+
+def get_catalog(root: str = "screenshots") -> ScreenshotCatalog:
+    """The run's catalog for a screenshots root (scanned on first lookup)."""
+    key = os.path.abspath(root)
+    if key not in _catalogs:
+        _catalogs[key] = ScreenshotCatalog(root)
+    return _catalogs[key]
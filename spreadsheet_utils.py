@@ -10,11 +10,16 @@ Protects against common user editing variations in FY27_Bills_Budget.xlsx:
 
 from __future__ import annotations
 
+import json
 import os
 import re
+from functools import lru_cache
 import pandas as pd
 import openpyxl
 
+import workbook_cache
+import xlsx_reader
+
 
 COLUMN_ALIASES = {
     "bill_item_id": ["bill item id", "bill_item_id", "item id", "id", "bill item #"],
@@ -32,6 +37,12 @@ COLUMN_ALIASES = {
     "order_id": ["order id", "order_id", "order #", "order number", "order_id (yymmdd_vendor_gburdell3)"],
 }
 
+# Matches any cell text containing any alias (header row detection)
+_ALIAS_PATTERN = re.compile("|".join(
+    re.escape(alias)
+    for alias in sorted({a for aliases in COLUMN_ALIASES.values() for a in aliases}, key=len, reverse=True)
+))
+
 
 def clean_str(val) -> str:
     """Safely convert value to string, handling floats like 376851.0 -> '376851'."""
@@ -71,15 +82,31 @@ def safe_int(val, default: int = 1) -> int:
         return default
 
 
-def find_sheet_name(excel_file: pd.ExcelFile | str | openpyxl.Workbook, candidate_names: list[str]) -> str | None:
+def _workbook_path(excel_file) -> str | None:
+    """File path behind a path or pd.ExcelFile argument (None for openpyxl Workbooks or buffers)."""
+    if isinstance(excel_file, (str, os.PathLike)):
+        return os.fspath(excel_file)
+    if isinstance(excel_file, pd.ExcelFile) and isinstance(excel_file.io, (str, os.PathLike)):
+        return os.fspath(excel_file.io)
+    return None
+
+
+def find_sheet_name(excel_file: pd.ExcelFile | str | openpyxl.Workbook | list[str], candidate_names: list[str],
+                    engine: str | None = None) -> str | None:
     """Find sheet name ignoring case and slight differences."""
     if isinstance(excel_file, str):
+        fast = xlsx_reader.resolve_engine(engine) == "fast"
         try:
-            wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
-            existing_sheets = wb.sheetnames
-            wb.close()
+            if fast:
+                existing_sheets = xlsx_reader.sheet_names(excel_file)
+            else:
+                wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+                existing_sheets = wb.sheetnames
+                wb.close()
         except Exception:
             existing_sheets = []
+    elif isinstance(excel_file, (list, tuple)):
+        existing_sheets = list(excel_file)
     elif hasattr(excel_file, "sheetnames"):
         existing_sheets = excel_file.sheetnames
     elif hasattr(excel_file, "sheet_names"):
@@ -100,70 +127,374 @@ def find_sheet_name(excel_file: pd.ExcelFile | str | openpyxl.Workbook, candidat
     return None
 
 
+class ColumnResolver:
+    """
+    Maps canonical keys (COLUMN_ALIASES) to a frame's actual column names, once.
+
+    Matching is the same as get_col_val: exact alias match on the lowercased,
+    stripped name first, then substring match. Build one per DataFrame (or use
+    resolver_for(columns)) instead of calling get_col_val on every row.
+
+        cols = ColumnResolver(df.columns)
+        ids = cols.values(df, "bill_item_id")    # whole cleaned column
+        name = cols.get(row_dict, "item_name")   # one row
+    """
+
+    def __init__(self, columns):
+        # Lowercased name -> original name; a later duplicate wins, like a row dict would
+        self._norm = {str(k).lower().strip(): k for k in columns}
+        self._resolved: dict[str, object] = {}
+
+    def column(self, canonical_key: str):
+        """The actual column name for canonical_key, or None if no column matches."""
+        if canonical_key not in self._resolved:
+            self._resolved[canonical_key] = self._match(COLUMN_ALIASES.get(canonical_key, [canonical_key]))
+        return self._resolved[canonical_key]
+
+    def _match(self, aliases: list[str]):
+        # 1. Exact match
+        for alias in aliases:
+            if alias in self._norm:
+                return self._norm[alias]
+        # 2. Substring match fallback
+        for alias in aliases:
+            for k, original in self._norm.items():
+                if alias in k or k in alias:
+                    return original
+        return None
+
+    def get(self, row, canonical_key: str, default: str = "") -> str:
+        """Cleaned value of canonical_key in a row dict/Series with these columns."""
+        col = self.column(canonical_key)
+        if col is None or col not in row:
+            return default
+        return clean_str(row[col])
+
+    def values(self, df: pd.DataFrame, canonical_key: str, default: str = "") -> pd.Series:
+        """Whole column for canonical_key, cleaned with clean_str (default where missing)."""
+        col = self.column(canonical_key)
+        if col is None or col not in df.columns:
+            return pd.Series(default, index=df.index, dtype=object)
+        series = df[col]
+        if isinstance(series, pd.DataFrame):  # duplicate column names: last one wins
+            series = series.iloc[:, -1]
+        return series.map(clean_str).astype(object)
+
+
+@lru_cache(maxsize=64)
+def _resolver_for(columns: tuple) -> ColumnResolver:
+    return ColumnResolver(columns)
+
+
+def resolver_for(columns) -> ColumnResolver:
+    """Shared ColumnResolver for a set of column names (rows of the same frame share one)."""
+    try:
+        return _resolver_for(tuple(columns))
+    except TypeError:  # unhashable column labels
+        return ColumnResolver(columns)
+
+
 def get_col_val(row_dict: dict, canonical_key: str, default: str = "") -> str:
     """Extract a row value using flexible column alias matching."""
-    aliases = COLUMN_ALIASES.get(canonical_key, [canonical_key])
-    norm_row = {str(k).lower().strip(): v for k, v in row_dict.items()}
-    # 1. Exact match
-    for alias in aliases:
-        if alias in norm_row:
-            return clean_str(norm_row[alias])
-    # 2. Substring match fallback
-    for alias in aliases:
-        for k, v in norm_row.items():
-            if alias in k or k in alias:
-                return clean_str(v)
-    return default
-
-
-def read_sheet_robust(excel_file: pd.ExcelFile | str | openpyxl.Workbook, sheet_candidates: list[str], max_header_scan: int = 10) -> pd.DataFrame:
+    return resolver_for(row_dict.keys()).get(row_dict, canonical_key, default)
+
+
+def read_sheet(path: str, sheet_name: str, header: int = 0, engine: str | None = None) -> pd.DataFrame:
+    """
+    pd.read_excel(path, sheet_name=sheet_name, header=header), through the snapshot cache.
+
+    engine picks the reader: "fast" (xlsx_reader) or "openpyxl" (pandas). Defaults to
+    XLSX_READER_ENGINE.
+    """
+    engine = xlsx_reader.resolve_engine(engine)
+
+    def load():
+        if engine == "fast":
+            return xlsx_reader.read_frame(path, sheet_name, header=header)
+        return pd.read_excel(path, sheet_name=sheet_name, header=header, engine="openpyxl")
+
+    return workbook_cache.cached(path, f"sheet:{engine}:{sheet_name}:{header}", load)
+
+
+def read_sheet_robust(excel_file: pd.ExcelFile | str | openpyxl.Workbook, sheet_candidates: list[str], max_header_scan: int = 10,
+                      engine: str | None = None) -> pd.DataFrame:
     """
     Read an Excel sheet robustly by searching the first max_header_scan rows
     for the true header row containing key column names.
+
+    For a path or pd.ExcelFile, engine picks the reader: "fast" (xlsx_reader, reads
+    the sheet once) or "openpyxl" (pandas). Defaults to XLSX_READER_ENGINE. Results
+    for a path are kept in the snapshot cache (workbook_cache.py).
     """
-    sheet_name = find_sheet_name(excel_file, sheet_candidates)
+    path = _workbook_path(excel_file)
+    if path is None:
+        return _read_sheet_robust(excel_file, sheet_candidates, max_header_scan, engine)
+    engine = xlsx_reader.resolve_engine(engine)
+    key = f"robust:{engine}:{max_header_scan}:{'|'.join(sheet_candidates)}"
+    return workbook_cache.cached(path, key, lambda: _read_sheet_robust(excel_file, sheet_candidates, max_header_scan, engine))
+
+
+def _read_sheet_robust(excel_file, sheet_candidates: list[str], max_header_scan: int, engine: str | None) -> pd.DataFrame:
+    sheet_name = find_sheet_name(excel_file, sheet_candidates, engine=engine)
     if not sheet_name:
         return pd.DataFrame()
 
+    path = _workbook_path(excel_file)
     if isinstance(excel_file, openpyxl.Workbook):
         ws = excel_file[sheet_name]
         data = list(ws.iter_rows(values_only=True))
         df_raw = pd.DataFrame(data)
+    elif path is not None and xlsx_reader.resolve_engine(engine) == "fast":
+        rows = xlsx_reader.read_rows(path, sheet_name)
+        df_raw = pd.DataFrame(rows, dtype=object)
     else:
-        df_raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None, engine="openpyxl")
+        df_raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None, engine="openpyxl").astype(object)
+        rows = df_raw.where(df_raw.notna(), None).values.tolist()
 
     if df_raw.empty:
         return pd.DataFrame()
 
-    header_row_idx = 0
-    best_match_count = 0
+    header_row_idx = find_header_row(df_raw, max_header_scan)
+
+    if isinstance(excel_file, openpyxl.Workbook):
+        header_vals = [str(c).strip() if c is not None else "" for c in df_raw.iloc[header_row_idx]]
+        df_rows = df_raw.iloc[header_row_idx + 1:].copy()
+        df_rows.columns = header_vals
+        return df_rows.astype(object).fillna("")
+
+    # Promote the header row in memory; same columns, dtypes and index pd.read_excel(header=n) gives
+    df = xlsx_reader.frame_from_rows(rows, header=header_row_idx).astype(object).fillna("")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
 
-    all_alias_strings = set()
-    for aliases in COLUMN_ALIASES.values():
-        all_alias_strings.update(aliases)
 
-    for row_idx in range(min(max_header_scan, len(df_raw))):
-        row_vals = [str(v).lower().strip() for v in df_raw.iloc[row_idx].dropna()]
-        matches = sum(1 for v in row_vals if any(alias in v for alias in all_alias_strings))
+def find_header_row(df_raw: pd.DataFrame, max_header_scan: int = 10) -> int:
+    """Index of the row among the first max_header_scan with the most cells containing a column alias."""
+    header_row_idx = 0
+    best_match_count = 0
+    for row_idx, row in enumerate(df_raw.head(max_header_scan).itertuples(index=False)):
+        matches = sum(1 for v in row if not pd.isna(v) and _ALIAS_PATTERN.search(str(v).lower().strip()))
         if matches > best_match_count:
             best_match_count = matches
             header_row_idx = row_idx
+    return header_row_idx
+
+
+BILLS_SHEET_CANDIDATES = ["Bills", "Bill", "Budget"]
+ORDERING_SHEET_CANDIDATES = ["Ordering", "Orders", "OrderT"]
+
+
+BILL_FIELDS = ["b_id", "name", "bill_no", "link", "cost"]
+ORDER_FIELDS = ["order_id", "b_id", "item_name"]
+
+
+def _cost_column(df_bills: pd.DataFrame) -> str | None:
+    return "Cost" if "Cost" in df_bills.columns else "Allocation" if "Allocation" in df_bills.columns else None
+
+
+def _bill_fields(df_bills: pd.DataFrame) -> pd.DataFrame:
+    """The cleaned values the Bills checks look at (BILL_FIELDS), indexed like df_bills."""
+    cols = ColumnResolver(df_bills.columns)
+    cost_col = _cost_column(df_bills)
+    return pd.DataFrame({
+        "b_id": cols.values(df_bills, "bill_item_id"),
+        "name": cols.values(df_bills, "item_name"),
+        "bill_no": cols.values(df_bills, "bill_no"),
+        "link": cols.values(df_bills, "link"),
+        "cost": df_bills[cost_col].map(safe_float) if cost_col else 0.0,
+    }, index=df_bills.index, columns=BILL_FIELDS)
+
+
+def _bill_row_warnings(fields: pd.DataFrame) -> dict:
+    """Per-row warnings {row index: [messages]} for missing Item Name / Bill No., cost <= 0 and non-http links."""
+    b_ids, names, bill_nos, links, costs = (fields[c] for c in BILL_FIELDS)
+    lines = pd.Series(fields.index + 2, index=fields.index)  # 1-indexed Excel row after header
+    active = (names != "") | (b_ids != "")  # skip empty separator rows
+    row_checks = (
+        (active & (names == ""), lambda i: f"Row {lines[i]} has Bill Item ID '{b_ids[i]}' but missing Item Name."),
+        (active & (bill_nos == ""), lambda i: f"Row {lines[i]} ('{names[i]}') missing Bill No."),
+        (active & (costs <= 0), lambda i: f"Row {lines[i]} ('{names[i]}') has cost <= $0.00 (${costs[i]:.2f})."),
+        (active & (links != "") & ~links.str.startswith("http"), lambda i: f"Row {lines[i]} ('{names[i]}') has non-standard link: '{links[i]}'."),
+    )
+    per_row: dict = {}
+    for mask, fmt in row_checks:
+        for i in mask[mask].index:
+            per_row.setdefault(i, []).append(fmt(i))
+    return per_row
+
+
+def _duplicate_errors(b_ids: pd.Series) -> list[str]:
+    """One error per repeated Bill Item ID, pointing at its first row."""
+    lines = pd.Series(b_ids.index + 2, index=b_ids.index)
+    has_id = b_ids != ""
+    dup = has_id & b_ids.duplicated()
+    if not dup.any():
+        return []
+    first_line = lines[has_id & ~dup].groupby(b_ids[has_id & ~dup]).first()
+    return [
+        f"Duplicate Bill Item ID '{b_id}' on row {line} (previously seen on row {first_line[b_id]})."
+        for b_id, line in zip(b_ids[dup], lines[dup])
+    ]
+
+
+def check_bills(df_bills: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """
+    Row checks for the Bills sheet: duplicate Bill Item IDs (errors), and missing
+    Item Name / Bill No., cost <= 0 and non-http links (warnings). Messages come
+    out in row order. Separator rows (no Item Name and no ID) are skipped.
+    """
+    fields = _bill_fields(df_bills)
+    per_row = _bill_row_warnings(fields)
+    return _duplicate_errors(fields["b_id"]), [msg for i in sorted(per_row) for msg in per_row[i]]
 
-    if isinstance(excel_file, openpyxl.Workbook):
-        header_vals = [str(c).strip() if c is not None else "" for c in df_raw.iloc[header_row_idx]]
-        df_rows = df_raw.iloc[header_row_idx + 1:].copy()
-        df_rows.columns = header_vals
-        df = df_rows.astype(object).fillna("")
+
+def bill_item_ids(df_bills: pd.DataFrame) -> set[str]:
+    """All non-empty Bill Item IDs on the Bills sheet."""
+    ids = ColumnResolver(df_bills.columns).values(df_bills, "bill_item_id")
+    return set(ids[ids != ""])
+
+
+def _order_fields(df_orders: pd.DataFrame) -> pd.DataFrame:
+    cols = ColumnResolver(df_orders.columns)
+    return pd.DataFrame({
+        "order_id": cols.values(df_orders, "order_id"),
+        "b_id": cols.values(df_orders, "bill_item_id"),
+        "item_name": cols.values(df_orders, "item_name"),
+    }, index=df_orders.index, columns=ORDER_FIELDS)
+
+
+def _orphan_warnings(fields: pd.DataFrame, known_b_ids: set[str]) -> list[str]:
+    if not known_b_ids:
+        return []
+    order_ids, b_ids = fields["order_id"], fields["b_id"]
+    real = (order_ids != "") & ~order_ids.str.startswith("Order ") & ((b_ids != "") | (fields["item_name"] != ""))
+    linked = fields[real & (b_ids != "")].assign(line=lambda f: f.index + 3)  # Excel row index
+    merged = linked.merge(pd.DataFrame({"b_id": sorted(known_b_ids)}), on="b_id", how="left", indicator=True)
+    orphans = merged[merged["_merge"] == "left_only"]
+    return [
+        f"Ordering sheet row {line} (Order: '{order_id}') references Bill Item ID '{b_id}' which does not exist in Bills sheet."
+        for line, order_id, b_id in zip(orphans["line"], orphans["order_id"], orphans["b_id"])
+    ]
+
+
+def check_ordering(df_orders: pd.DataFrame, known_b_ids: set[str]) -> list[str]:
+    """Warn for Ordering rows whose Bill Item ID isn't on the Bills sheet (anti-join on the ID)."""
+    return _orphan_warnings(_order_fields(df_orders), known_b_ids)
+
+
+# ---- Incremental checks ----
+# State kept between doctor runs, per sheet: {"columns": [...], "rows": {excel line: [hash, fields, warnings]}}.
+# Rows whose content hash is unchanged reuse their cleaned fields and warnings; only
+# changed rows are cleaned and checked again. Cross-row checks (duplicate IDs,
+# orphaned orders) then run over the combined fields, which is vectorized and cheap.
+
+DOCTOR_STATE_VERSION = 1
+
+
+def _row_hashes(df: pd.DataFrame, columns: list) -> list[int]:
+    if not columns:
+        return [0] * len(df)
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).tolist()
+
+
+def _split_changed(df: pd.DataFrame, columns: list, state: dict | None, line_offset: int):
+    """(hashes, lines, changed mask, previous rows) for df against a sheet's saved state."""
+    hashes = _row_hashes(df, columns)
+    lines = [str(i + line_offset) for i in df.index]
+    prev = state["rows"] if state and state.get("columns") == [str(c) for c in df.columns] else {}
+    changed = [prev.get(line, (None,))[0] != h for line, h in zip(lines, hashes)]
+    return hashes, lines, pd.Series(changed, index=df.index, dtype=bool), prev
+
+
+def _merge_fields(df: pd.DataFrame, changed: pd.Series, fresh: pd.DataFrame, prev: dict, lines: list, names: list) -> pd.DataFrame:
+    kept = [prev[line][1] for line, c in zip(lines, changed) if not c]
+    reused = pd.DataFrame(kept, index=df.index[~changed.values], columns=names)
+    return pd.concat([fresh, reused]).reindex(df.index)
+
+
+def check_bills_incremental(df_bills: pd.DataFrame, state: dict | None) -> tuple[list[str], list[str], dict, int]:
+    """
+    check_bills, re-checking only rows whose content changed since state (from the
+    last run). Returns (errors, warnings, new state, number of rows re-checked).
+    """
+    cols = ColumnResolver(df_bills.columns)
+    hashed = [c for c in dict.fromkeys([cols.column(k) for k in ("bill_item_id", "item_name", "bill_no", "link")] + [_cost_column(df_bills)]) if c is not None]
+    hashes, lines, changed, prev = _split_changed(df_bills, hashed, state, 2)
+
+    fresh = _bill_fields(df_bills[changed.values])
+    fresh_warnings = _bill_row_warnings(fresh)
+    fields = _merge_fields(df_bills, changed, fresh, prev, lines, BILL_FIELDS)
+
+    warnings, rows = [], {}
+    for i, line, h, c, values in zip(df_bills.index, lines, hashes, changed, fields.values.tolist()):
+        row_warnings = fresh_warnings.get(i, []) if c else prev[line][2]
+        warnings.extend(row_warnings)
+        rows[line] = [h, values, row_warnings]
+
+    new_state = {"columns": [str(c) for c in df_bills.columns], "rows": rows}
+    return _duplicate_errors(fields["b_id"]), warnings, new_state, int(changed.sum())
+
+
+def check_ordering_incremental(df_orders: pd.DataFrame, known_b_ids: set[str], state: dict | None) -> tuple[list[str], dict, int]:
+    """check_ordering, cleaning only rows changed since state. Returns (warnings, new state, rows re-checked)."""
+    cols = ColumnResolver(df_orders.columns)
+    hashed = [c for c in dict.fromkeys(cols.column(k) for k in ("order_id", "bill_item_id", "item_name")) if c is not None]
+    hashes, lines, changed, prev = _split_changed(df_orders, hashed, state, 3)
+
+    fields = _merge_fields(df_orders, changed, _order_fields(df_orders[changed.values]), prev, lines, ORDER_FIELDS)
+    rows = {line: [h, values, []] for line, h, values in zip(lines, hashes, fields.values.tolist())}
+    new_state = {"columns": [str(c) for c in df_orders.columns], "rows": rows}
+    return _orphan_warnings(fields, known_b_ids), new_state, int(changed.sum())
+
+
+def doctor_state_path(xlsx_path: str) -> str:
+    """Sidecar file holding incremental doctor state (kept in the CLI cache dir, not next to the synced xlsx)."""
+    return workbook_cache.sidecar_path(xlsx_path, "doctor.json")
+
+
+def _load_doctor_state(xlsx_path: str) -> dict:
+    try:
+        with open(doctor_state_path(xlsx_path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("version") == DOCTOR_STATE_VERSION else {}
+
+
+def _save_doctor_state(xlsx_path: str, state: dict):
+    state["version"] = DOCTOR_STATE_VERSION
+    try:
+        workbook_cache.write_atomic(doctor_state_path(xlsx_path), json.dumps(state).encode())
+    except OSError as e:
+        print(f"⚠️ Could not save doctor state: {e}")
+
+
+def _validate_bills_sheet(xlsx_path: str, sheet: str, state: dict | None = None, incremental: bool = False):
+    """(errors, warnings, Bill Item IDs, new incremental state, (rows checked, rows)) for the Bills sheet."""
+    df_bills = read_sheet_robust(xlsx_path, [sheet])
+    if df_bills.empty:
+        return [], [f"'${sheet}' sheet contains no data rows."], set(), None, (0, 0)
+    if incremental:
+        errors, warnings, new_state, checked = check_bills_incremental(df_bills, state)
+        b_ids = {row[1][0] for row in new_state["rows"].values()} - {""}
     else:
-        df = pd.read_excel(excel_file, sheet_name=sheet_name, header=header_row_idx).astype(object).fillna("")
-        df.columns = [str(c).strip() for c in df.columns]
-    return df
+        (errors, warnings), new_state, checked = check_bills(df_bills), None, len(df_bills)
+        b_ids = bill_item_ids(df_bills)
+    return errors, warnings, b_ids, new_state, (checked, len(df_bills))
+
 
+def _read_ordering_sheet(xlsx_path: str, sheet: str) -> pd.DataFrame:
+    return read_sheet_robust(xlsx_path, [sheet])
 
-def validate_budget_spreadsheet(xlsx_path: str) -> dict:
+
+def validate_budget_spreadsheet(xlsx_path: str, jobs: int = 1, incremental: bool = False) -> dict:
     """
     Run a full diagnostic health check on FY27_Bills_Budget.xlsx.
     Returns dict with 'valid' (bool), 'errors' (list of str), 'warnings' (list of str), 'summary' (str).
+
+    jobs > 1 reads and checks the Bills and Ordering sheets in parallel processes.
+    incremental re-checks only rows changed since the last incremental run (state in
+    doctor_state_path()); results also get 'rechecked': {sheet: (rows re-checked, rows)}.
     """
     results = {"valid": True, "errors": [], "warnings": [], "summary": ""}
 
@@ -174,82 +505,60 @@ def validate_budget_spreadsheet(xlsx_path: str) -> dict:
         return results
 
     try:
-        excel_file = pd.ExcelFile(xlsx_path)
+        if xlsx_reader.resolve_engine(None) == "fast":
+            sheet_list = xlsx_reader.sheet_names(xlsx_path)
+        else:
+            sheet_list = pd.ExcelFile(xlsx_path).sheet_names
     except Exception as ex:
         results["valid"] = False
         results["errors"].append(f"Failed to open Excel file: {ex}")
         results["summary"] = "CRITICAL: Excel file corrupt or unreadable."
         return results
 
+    bills_sheet = find_sheet_name(sheet_list, BILLS_SHEET_CANDIDATES)
+    ordering_sheet = find_sheet_name(sheet_list, ORDERING_SHEET_CANDIDATES)
+    state = _load_doctor_state(xlsx_path) if incremental else {}
+    bills_args = (xlsx_path, bills_sheet, state.get("bills"), incremental)
+
+    if jobs > 1 and bills_sheet and ordering_sheet:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, 2)) as pool:
+            bills_future = pool.submit(_validate_bills_sheet, *bills_args)
+            orders_future = pool.submit(_read_ordering_sheet, xlsx_path, ordering_sheet)
+            bills_result, df_orders = bills_future.result(), orders_future.result()
+    else:
+        bills_result = _validate_bills_sheet(*bills_args) if bills_sheet else None
+        df_orders = _read_ordering_sheet(xlsx_path, ordering_sheet) if ordering_sheet else pd.DataFrame()
+
+    new_state, rechecked = {}, {}
+
     # 1. Validate Bills Sheet
-    bills_sheet = find_sheet_name(excel_file, ["Bills", "Bill", "Budget"])
+    known_b_ids = set()
     if not bills_sheet:
         results["valid"] = False
         results["errors"].append("Missing required 'Bills' sheet in workbook.")
     else:
-        df_bills = read_sheet_robust(excel_file, [bills_sheet])
-        if df_bills.empty:
-            results["warnings"].append(f"'${bills_sheet}' sheet contains no data rows.")
-        else:
-            seen_item_ids = {}
-            for idx, row in df_bills.iterrows():
-                excel_line = idx + 2  # 1-indexed Excel row after header
-                r_dict = row.to_dict()
-                b_id = get_col_val(r_dict, "bill_item_id")
-                item_name = get_col_val(r_dict, "item_name")
-                bill_no = get_col_val(r_dict, "bill_no")
-                cost = safe_float(r_dict.get("Cost", r_dict.get("Allocation", 0)))
-                link = get_col_val(r_dict, "link")
-
-                if not item_name and not b_id:
-                    continue  # skip empty separator rows
-
-                if b_id:
-                    if b_id in seen_item_ids:
-                        results["errors"].append(
-                            f"Duplicate Bill Item ID '{b_id}' on row {excel_line} (previously seen on row {seen_item_ids[b_id]})."
-                        )
-                        results["valid"] = False
-                    else:
-                        seen_item_ids[b_id] = excel_line
-
-                if not item_name:
-                    results["warnings"].append(f"Row {excel_line} has Bill Item ID '{b_id}' but missing Item Name.")
-                if not bill_no:
-                    results["warnings"].append(f"Row {excel_line} ('{item_name}') missing Bill No.")
-                if cost <= 0:
-                    results["warnings"].append(f"Row {excel_line} ('{item_name}') has cost <= $0.00 (${cost:.2f}).")
-                if link and not link.startswith("http"):
-                    results["warnings"].append(f"Row {excel_line} ('{item_name}') has non-standard link: '{link}'.")
+        errors, warnings, known_b_ids, new_state["bills"], checked = bills_result
+        rechecked[bills_sheet] = checked
+        results["errors"].extend(errors)
+        results["warnings"].extend(warnings)
+        if errors:
+            results["valid"] = False
 
     # 2. Validate Ordering Sheet
-    ordering_sheet = find_sheet_name(excel_file, ["Ordering", "Orders", "OrderT"])
-    if ordering_sheet:
-        df_orders = read_sheet_robust(excel_file, [ordering_sheet])
-        if not df_orders.empty:
-            bills_sheet_name = find_sheet_name(excel_file, ["Bills", "Bill", "Budget"])
-            df_bills = read_sheet_robust(excel_file, [bills_sheet_name]) if bills_sheet_name else pd.DataFrame()
-            known_b_ids = set()
-            if not df_bills.empty:
-                for _, r in df_bills.iterrows():
-                    bid = get_col_val(r.to_dict(), "bill_item_id")
-                    if bid:
-                        known_b_ids.add(bid)
-
-            for idx, row in df_orders.iterrows():
-                excel_line = idx + 3  # Excel row index
-                r_dict = row.to_dict()
-                order_id = get_col_val(r_dict, "order_id")
-                b_id = get_col_val(r_dict, "bill_item_id")
-                item_name = get_col_val(r_dict, "item_name")
-
-                if not order_id or order_id.startswith("Order ") or not (b_id or item_name):
-                    continue
-
-                if b_id and known_b_ids and b_id not in known_b_ids:
-                    results["warnings"].append(
-                        f"Ordering sheet row {excel_line} (Order: '{order_id}') references Bill Item ID '{b_id}' which does not exist in Bills sheet."
-                    )
+    if not df_orders.empty:
+        if incremental:
+            warnings, new_state["ordering"], checked = check_ordering_incremental(df_orders, known_b_ids, state.get("ordering"))
+            rechecked[ordering_sheet] = (checked, len(df_orders))
+        else:
+            warnings = check_ordering(df_orders, known_b_ids)
+        results["warnings"].extend(warnings)
+
+    if incremental:
+        results["rechecked"] = rechecked
+        if any(checked for checked, _ in rechecked.values()) or new_state.keys() != state.keys() - {"version"}:
+            _save_doctor_state(xlsx_path, new_state)
 
     error_cnt = len(results["errors"])
     warn_cnt = len(results["warnings"])
@@ -0,0 +1,19 @@
+"""
+tests/conftest.py - Fixtures shared by the whole suite.
+"""
+
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../web-app")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import shared_cache
+
+
+@pytest.fixture(autouse=True)
+def private_shared_cache(monkeypatch):
+    """Keep every test off the real shared cache file (live workers would adopt its data)."""
+    monkeypatch.setattr(shared_cache, "_store", shared_cache.MemoryStore())
+    monkeypatch.setattr(shared_cache, "_store_pid", os.getpid())
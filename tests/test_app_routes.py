@@ -173,10 +173,13 @@ def test_order_deletion_title_cleanup(client):
 
     with patch("xlsx_manager._get_graph_token", return_value=("mock_token", "mock_drive", "mock_file")), \
          patch("xlsx_manager.graph_get_table_columns", return_value=["Order ID", "Bill Item ID", "Vendor", "Item Name"]), \
-         patch("requests.get", side_effect=mock_requests_get), \
-         patch("requests.patch") as mock_patch, \
+         patch("graph_client.get", side_effect=mock_requests_get), \
+         patch("graph_client.patch") as mock_patch, \
+         patch("graph_client.post") as mock_post, \
          patch("xlsx_manager.update_item", return_value=True):
         mock_patch.return_value.status_code = 200
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"responses": []}
         response = client.post("/orders/delete", data={"order_id": "260811_amazon_tester"}, follow_redirects=True)
         assert response.status_code == 200
 
@@ -203,8 +206,63 @@ def test_prevent_duplicate_order_item_submission(client):
     with patch("xlsx_manager.read_items", return_value=mock_item), \
          patch("xlsx_manager._get_graph_token", return_value=("mock_token", "mock_drive", "mock_file")), \
          patch("xlsx_manager.graph_get_table_columns", return_value=["Order ID", "Bill Item ID", "Vendor", "Item Name", "Quantity"]), \
-         patch("requests.get", side_effect=mock_requests_get):
+         patch("graph_client.get", side_effect=mock_requests_get):
         response = client.post("/create-order/submit", data={"item_ids": ["101"]}, follow_redirects=True)
         assert response.status_code == 200
         assert b"is already assigned to an order" in response.data or b"already included in an existing order" in response.data
 
+
+def test_thumbnail_etag_and_cache_headers(client, tmp_path, monkeypatch):
+    import screenshot_worker
+    import shared_cache
+    import thumbnails
+
+    monkeypatch.setattr(screenshot_worker, "SCREENSHOT_DIR", str(tmp_path / "screenshots"))
+    monkeypatch.setattr(thumbnails, "THUMB_DIR", str(tmp_path / "thumbs"))
+    monkeypatch.setattr(shared_cache, "_store", shared_cache.MemoryStore())
+    monkeypatch.setattr(shared_cache, "_store_pid", os.getpid())
+    (tmp_path / "screenshots" / "Bill").mkdir(parents=True)
+    shot = tmp_path / "screenshots" / "Bill" / "Widget.png"
+    shot.write_bytes(b"not really a png")
+
+    client.post("/login", data={"password": "boats0519", "name": "Tester"})
+    with client.application.test_request_context():
+        from routes.screenshots import thumbnail_url
+        url = thumbnail_url("Bill/Widget.png", 160)
+    assert f"v={shot.stat().st_mtime_ns}" in url
+
+    response = client.get(url, headers={"Accept": "image/webp,*/*"})
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "private" in response.headers["Cache-Control"]
+    assert "Accept" in response.headers["Vary"]
+
+    again = client.get(url, headers={"Accept": "image/webp,*/*", "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+    unversioned = client.get("/thumbnails/Bill/Widget.png")
+    assert "no-cache" in unversioned.headers["Cache-Control"]
+    assert client.get("/thumbnails/Bill/Missing.png").status_code == 404
+    assert client.get("/thumbnails/../secret.png").status_code == 404
+
+
+def test_thumbnail_is_generated_once(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    import thumbnails
+
+    monkeypatch.setattr(thumbnails, "THUMB_DIR", str(tmp_path / "thumbs"))
+    source = tmp_path / "Widget.png"
+    Image.new("RGBA", (1920, 1080), (255, 0, 0, 255)).save(source)
+
+    path = thumbnails.thumbnail(str(source), "Bill/Widget.png", 160, "jpeg")
+    with Image.open(path) as im:
+        assert im.size == (160, 90)
+    assert thumbnails.thumbnail(str(source), "Bill/Widget.png", 160, "jpeg") == path
+
+    os.utime(source, ns=(1, 1))  # retaken: new variant, old one removed
+    newer = thumbnails.thumbnail(str(source), "Bill/Widget.png", 160, "jpeg")
+    assert newer != path and not os.path.exists(path)
+
+    thumbnails.discard("Bill/Widget.png")
+    assert not os.path.exists(newer)
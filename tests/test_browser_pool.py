@@ -0,0 +1,153 @@
+"""
+tests/test_browser_pool.py - Unit tests for the shared warm-browser pool.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import browser_pool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.crashed = False
+
+    @property
+    def current_url(self):
+        if self.crashed or self.quit_called:
+            raise RuntimeError("chrome not reachable")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    started = []
+
+    def create():
+        started.append(FakeDriver())
+        return started[-1]
+
+    monkeypatch.setattr(browser_pool, "create_driver", create)
+    return started
+
+
+def test_lease_reuses_healthy_drivers_and_replaces_broken_ones(drivers):
+    pool = browser_pool.BrowserPool(size=1, max_uses=3)
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+    assert first is second and len(drivers) == 1
+
+    first.crashed = True
+    with pool.lease() as third:
+        pass
+    assert third is not first and first.quit_called
+
+    with pytest.raises(ValueError):
+        with pool.lease() as fourth:
+            raise ValueError("bad page")
+    assert fourth is third and third.quit_called
+
+    for _ in range(3):
+        with pool.lease() as fifth:
+            pass
+    # Recycled after max_uses leases
+    assert fifth.quit_called and len(drivers) == 3
+
+
+def test_lease_waits_for_a_free_driver(drivers, monkeypatch):
+    monkeypatch.setattr(browser_pool, "LEASE_WAIT_SECONDS", 0.2)
+    pool = browser_pool.BrowserPool(size=1)
+    held = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    monkeypatch.setattr(browser_pool, "LEASE_WAIT_SECONDS", 5)
+    assert pool.acquire() is held
+
+
+def test_prewarm_and_idle_reaping(drivers):
+    pool = browser_pool.BrowserPool(size=2, idle_seconds=10)
+    pool.prewarm()
+    deadline = time.monotonic() + 5
+    while not pool._idle and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.prewarm()  # one is already idle
+    with pool.lease() as driver:
+        assert driver is drivers[0]
+    assert len(drivers) == 1
+
+    pool.reap(now=time.monotonic() + 11)
+    assert drivers[0].quit_called and pool._live == 0
+
+
+def test_close_quits_leased_drivers_when_asked(drivers):
+    pool = browser_pool.BrowserPool(size=2)
+    held = pool.acquire()
+    with pool.lease():
+        pass
+    pool.close()
+    assert drivers[1].quit_called and not held.quit_called
+
+    pool.close(leased=True)
+    assert held.quit_called and pool._live == 0
+    pool.release(held)  # a late release of a driver close() already quit is a no-op
+    assert pool._live == 0
+
+
+def test_closed_pool_lends_and_prewarms_nothing(drivers):
+    pool = browser_pool.BrowserPool(size=1)
+    held = pool.acquire()
+    waiter_error = []
+
+    def wait():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            waiter_error.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.05)
+    pool.close()
+    waiter.join(timeout=5)
+    assert waiter_error  # woken by close() instead of waiting out LEASE_WAIT_SECONDS
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    pool.prewarm()
+    pool.release(held)
+    assert len(drivers) == 1 and held.quit_called and pool._live == 0
+
+
+def test_prewarm_discards_a_driver_that_started_after_close(monkeypatch):
+    started = threading.Event()
+    proceed = threading.Event()
+    driver = FakeDriver()
+
+    def create():
+        started.set()
+        proceed.wait(5)
+        return driver
+
+    monkeypatch.setattr(browser_pool, "create_driver", create)
+    pool = browser_pool.BrowserPool(size=1)
+    pool.prewarm()
+    assert started.wait(5)
+    pool.close()
+    proceed.set()
+    deadline = time.monotonic() + 5
+    while pool._live and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert driver.quit_called and not pool._idle and pool._live == 0
@@ -0,0 +1,139 @@
+"""
+tests/test_graph_client.py - Unit tests for the pooled Graph session.
+"""
+
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../web-app")))
+
+import graph_client
+
+
+def test_session_is_reused_and_rebuilt_after_fork():
+    first = graph_client.get_session()
+    assert graph_client.get_session() is first
+    assert "gzip" in first.headers["Accept-Encoding"]
+
+    with patch("os.getpid", return_value=graph_client._session_pid + 1):
+        assert graph_client.get_session() is not first
+
+
+def test_endpoint_keys_drop_ids():
+    key = graph_client._endpoint(
+        "patch",
+        "https://graph.microsoft.com/v1.0/drives/b!abc/items/0146XYZ/workbook/worksheets('Bills')/range(address='B6:D6')",
+    )
+    assert key == "PATCH /workbook/worksheets()/range()"
+    key = graph_client._endpoint("get", "https://graph.microsoft.com/v1.0/drives/b!abc/root:/OPS-1 Operations/FY27.xlsx")
+    assert key == "GET /root:"
+
+
+def test_request_records_latency_stats():
+    graph_client.reset_stats()
+    session = MagicMock()
+    session.request.return_value.status_code = 404
+    with patch("graph_client.get_session", return_value=session):
+        graph_client.get("https://graph.microsoft.com/v1.0/drives/d/items/f/workbook/tables/BillsT/rows")
+
+    assert session.request.call_args.kwargs["timeout"] == graph_client.DEFAULT_TIMEOUT
+    stats = graph_client.get_stats()["GET /workbook/tables/BillsT/rows"]
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+
+
+def _write_rclone_conf(path, access_token, expiry):
+    token = '{"access_token": "%s", "token_type": "Bearer", "expiry": "%s"}' % (access_token, expiry)
+    path.write_text(f"[onedrive]\ntype = onedrive\ndrive_id = drive1\ntoken = {token}\n")
+
+
+def test_token_cached_until_rclone_conf_changes(tmp_path, monkeypatch):
+    conf = tmp_path / "rclone.conf"
+    _write_rclone_conf(conf, "tok1", "2099-01-01T00:00:00.123456789Z")
+    monkeypatch.setattr(graph_client, "RCLONE_CONF", str(conf))
+    graph_client.invalidate_token()
+
+    with patch("graph_client._load_token", wraps=graph_client._load_token) as load:
+        assert graph_client.get_token() == ("tok1", "drive1")
+        assert graph_client.get_token() == ("tok1", "drive1")
+        assert load.call_count == 1
+
+        _write_rclone_conf(conf, "tok2", "2099-01-01T00:00:00Z")
+        os.utime(conf, (1, 1))
+        assert graph_client.get_token() == ("tok2", "drive1")
+        assert load.call_count == 2
+
+
+def test_token_is_refreshed_only_when_about_to_expire(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    def expiring_in(seconds):
+        return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    conf = tmp_path / "rclone.conf"
+    monkeypatch.setattr(graph_client, "RCLONE_CONF", str(conf))
+    monkeypatch.setattr(graph_client, "_last_refresh_attempt", 0.0)
+
+    # rclone wouldn't renew this one yet, so don't run it
+    _write_rclone_conf(conf, "tok1", expiring_in(120))
+    graph_client.invalidate_token()
+    with patch("graph_client._refresh_token") as refresh:
+        assert graph_client.get_token() == ("tok1", "drive1")
+    refresh.assert_not_called()
+
+    def renew():
+        graph_client._last_refresh_attempt = graph_client.time.time()
+        _write_rclone_conf(conf, "tok2", expiring_in(3600))
+        os.utime(conf, (1, 1))
+
+    _write_rclone_conf(conf, "tok1", expiring_in(-5))
+    graph_client.invalidate_token()
+    with patch("graph_client._refresh_token", side_effect=renew) as refresh:
+        assert graph_client.get_token() == ("tok2", "drive1")
+    refresh.assert_called_once()
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path, monkeypatch):
+    import threading
+    from datetime import datetime, timedelta, timezone
+
+    conf = tmp_path / "rclone.conf"
+    _write_rclone_conf(conf, "tok1", (datetime.now(timezone.utc) - timedelta(seconds=5)).strftime("%Y-%m-%dT%H:%M:%SZ"))
+    monkeypatch.setattr(graph_client, "RCLONE_CONF", str(conf))
+    monkeypatch.setattr(graph_client, "_last_refresh_attempt", 0.0)
+    graph_client.invalidate_token()
+
+    def renew():
+        graph_client._last_refresh_attempt = graph_client.time.time()
+        graph_client.time.sleep(0.1)
+        _write_rclone_conf(conf, "tok2", "2099-01-01T00:00:00Z")
+        os.utime(conf, (1, 1))
+
+    results = []
+    with patch("graph_client._refresh_token", side_effect=renew) as refresh:
+        threads = [threading.Thread(target=lambda: results.append(graph_client.get_token())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert refresh.call_count == 1
+    assert results == [("tok2", "drive1")] * 4
+
+
+def test_unauthorized_request_is_retried_with_the_refreshed_token(tmp_path, monkeypatch):
+    conf = tmp_path / "rclone.conf"
+    _write_rclone_conf(conf, "tok2", "2099-01-01T00:00:00Z")
+    monkeypatch.setattr(graph_client, "RCLONE_CONF", str(conf))
+    graph_client.invalidate_token()
+
+    session = MagicMock()
+    expired, ok = MagicMock(status_code=401), MagicMock(status_code=200)
+    session.request.side_effect = [expired, ok]
+    with patch("graph_client.get_session", return_value=session), \
+         patch("graph_client._refresh_token") as refresh:
+        resp = graph_client.get("https://graph.microsoft.com/v1.0/drives/d/items/f", headers={"Authorization": "Bearer tok1"})
+
+    assert resp is ok
+    assert session.request.call_args.kwargs["headers"]["Authorization"] == "Bearer tok2"
+    refresh.assert_not_called()  # rclone.conf already held a newer token
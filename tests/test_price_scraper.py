@@ -58,3 +58,130 @@ def test_generate_amazon_cart_url():
     assert "Quantity.1=2" in cart_url
     assert "ASIN.2=B012345678" in cart_url
     assert "Quantity.2=1" in cart_url
+
+
+class FakePage:
+    """Driver stand-in whose page state changes on each poll: (readyState, has_price, dom_size) per call."""
+
+    def __init__(self, states):
+        self.states = list(states)
+
+    def execute_script(self, script, *args):
+        state = self.states.pop(0) if len(self.states) > 1 else self.states[0]
+        ready, has_price, size = state
+        return [ready, has_price, size, size, size]
+
+    def get_log(self, kind):
+        raise ValueError("performance log not enabled")
+
+
+def test_wait_for_page_ready_exits_when_price_renders():
+    page = FakePage([("loading", False, 1), ("interactive", False, 5), ("interactive", True, 9)])
+    assert price_scraper.wait_for_page_ready(page, max_wait=5, poll=0.01) == "price"
+
+
+def test_wait_for_page_ready_waits_for_dom_to_settle():
+    page = FakePage([("complete", False, 10), ("complete", False, 20), ("complete", False, 30)])
+    assert price_scraper.wait_for_page_ready(page, max_wait=5, poll=0.01) == "idle"
+
+
+def test_wait_for_page_ready_gives_up_at_max_wait():
+    sizes = iter(range(10 ** 6))
+
+    class Busy(FakePage):
+        def execute_script(self, script, *args):
+            size = next(sizes)
+            return ["complete", False, size, size, size]
+
+    assert price_scraper.wait_for_page_ready(Busy([]), max_wait=0.2, poll=0.01) == "timeout"
+
+
+def test_wait_for_page_ready_tracks_cdp_requests():
+    import json
+
+    def event(method, request_id):
+        return {"message": json.dumps({"message": {"method": method, "params": {"requestId": request_id}}})}
+
+    inflight = set()
+
+    class Driver:
+        def __init__(self):
+            self.logs = [[event("Network.requestWillBeSent", str(i)) for i in range(4)],
+                         [event("Network.loadingFinished", "0"), event("Network.loadingFailed", "1")]]
+
+        def get_log(self, kind):
+            return self.logs.pop(0) if self.logs else []
+
+    driver = Driver()
+    assert price_scraper._pending_requests(driver, inflight) == 4
+    assert price_scraper._pending_requests(driver, inflight) == 2
+
+
+def test_check_prices_escalates_only_unresolved_urls(monkeypatch):
+    import threading
+    import time
+
+    def fake_http(url, timeout=10):
+        time.sleep(0.05 if "slow" in url else 0)
+        if "js-only" in url:
+            return None
+        return {"current_price": 5.0, "raw_price": "$5.00", "vendor": ""}
+
+    browsed = []
+    first_result = threading.Event()
+
+    def fake_browser(url):
+        browsed.append(url)
+        first_result.wait(2)  # HTTP results are handed back while the browser is busy
+        return {"current_price": 7.5, "raw_price": "$7.50", "vendor": ""}
+
+    monkeypatch.setattr(price_scraper, "scrape_price_http", fake_http)
+    urls = ["https://a.com/js-only", "https://a.com/slow", "https://a.com/fast", "https://a.com/fast", "not a link"]
+
+    seen = []
+    for url, result in price_scraper.check_prices(urls, browser=fake_browser, workers=4):
+        seen.append((url, result["current_price"] if result else None))
+        if result and result["current_price"] == 5.0:
+            first_result.set()
+
+    assert sorted(seen, key=str) == sorted([
+        ("not a link", None), ("https://a.com/js-only", 7.5), ("https://a.com/slow", 5.0), ("https://a.com/fast", 5.0),
+    ], key=str)
+    assert browsed == ["https://a.com/js-only"]
+    assert seen.index(("https://a.com/fast", 5.0)) < seen.index(("https://a.com/js-only", 7.5))
+
+
+def test_check_prices_closes_without_waiting_for_the_browser(monkeypatch):
+    import threading
+    import time
+
+    browsing = threading.Event()
+    release = threading.Event()
+
+    def fake_http(url, timeout=10):
+        return {"current_price": 5.0, "raw_price": "$5.00", "vendor": ""} if "fast" in url else None
+
+    def slow_browser(url):
+        browsing.set()
+        release.wait(5)
+        return None
+
+    monkeypatch.setattr(price_scraper, "scrape_price_http", fake_http)
+    checks = price_scraper.check_prices(["https://a.com/js-only", "https://a.com/fast"], browser=slow_browser)
+    assert next(checks)[0] == "https://a.com/fast"
+    assert browsing.wait(2)
+
+    started = time.monotonic()
+    checks.close()  # e.g. the SSE client went away while the browser is mid-page
+    assert time.monotonic() - started < 0.5
+    release.set()
+
+
+def test_check_prices_reports_urls_the_http_pass_dropped(monkeypatch):
+    def broken_http(urls, workers=8, timeout=10):
+        yield urls[0], None
+        raise RuntimeError("executor gone")
+
+    monkeypatch.setattr(price_scraper, "scrape_prices_http", broken_http)
+    results = dict(price_scraper.check_prices(["https://a.com/1", "https://a.com/2"], browser=lambda url: None))
+    assert results == {"https://a.com/1": None, "https://a.com/2": None}
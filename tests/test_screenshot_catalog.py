@@ -0,0 +1,62 @@
+"""
+tests/test_screenshot_catalog.py - Screenshot filename lookups for the CLI scripts.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import screenshot_catalog
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def test_find_screenshot_prefers_bill_folder_and_exact_names(tmp_path):
+    root = str(tmp_path / "screenshots")
+    _touch(os.path.join(root, "Drive Train", "THRUSTER-T200.jpg"))
+    _touch(os.path.join(root, "Drive Train", "Thruster T200.pdf"))
+    _touch(os.path.join(root, "Hull", "Thruster T200.png"))
+    _touch(os.path.join(root, "Battery.png"))
+    catalog = screenshot_catalog.ScreenshotCatalog(root)
+
+    # Exact name (any extension) beats the alphanumeric match in the same folder
+    assert catalog.find_screenshot("Thruster T200", "Drive Train") == os.path.join(root, "Drive Train", "Thruster T200.pdf")
+    assert catalog.find_screenshot("thruster/t200", "Hull") == os.path.join(root, "Hull", "Thruster T200.png")
+    # Root before other bill folders; unknown items are a single dict miss
+    assert catalog.find_screenshot("Battery", "Drive Train") == os.path.join(root, "Battery.png")
+    assert catalog.find_screenshot("Anchor", "Drive Train") is None
+
+
+def test_find_in_dir_matches_saved_name_variants(tmp_path):
+    root = str(tmp_path / "screenshots")
+    bill = os.path.join(root, "Drive Train")
+    _touch(os.path.join(bill, "ESC 30A_.png"))
+    _touch(os.path.join(bill, "m3  screw.png"))
+    catalog = screenshot_catalog.ScreenshotCatalog(root)
+
+    assert catalog.find_in_dir(bill, "ESC 30A!") == os.path.join(bill, "ESC 30A_.png")
+    assert catalog.find_in_dir(bill, "M3 Screw") == os.path.join(bill, "m3  screw.png")
+    assert catalog.find_in_dir(os.path.join(root, "Missing"), "M3 Screw") is None
+
+
+def test_catalog_scans_once_and_learns_new_files(tmp_path, monkeypatch):
+    root = str(tmp_path / "screenshots")
+    _touch(os.path.join(root, "Drive Train", "ESC.png"))
+    catalog = screenshot_catalog.ScreenshotCatalog(root)
+    assert catalog.find_screenshot("ESC", "Drive Train")
+
+    walks = []
+    monkeypatch.setattr(screenshot_catalog.os, "walk", lambda *a, **k: walks.append(a) or iter(()))
+    for _ in range(50):
+        catalog.find_screenshot("ESC", "Drive Train")
+    assert walks == []
+
+    new_shot = os.path.join(root, "Hull", "Anchor.png")
+    _touch(new_shot)
+    catalog.add(new_shot)
+    assert catalog.find_screenshot("Anchor", "Hull") == new_shot
+    assert catalog.find_in_dir(os.path.join(root, "Hull"), "Anchor") == new_shot
@@ -0,0 +1,317 @@
+"""
+tests/test_screenshot_worker.py - Unit tests for the screenshot worker pool.
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../web-app")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import browser_pool
+import screenshot_worker
+import shared_cache
+
+
+class FakeDriver:
+    def __init__(self, log):
+        self.log = log
+        self.thread = threading.current_thread().name
+        self.quit_called = False
+
+    def get(self, url):
+        self.log.append((self.thread, url))
+        time.sleep(0.05)
+
+    def save_screenshot(self, path):
+        with open(path, "wb") as f:
+            f.write(b"png")
+
+    @property
+    def current_url(self):
+        if self.quit_called:
+            raise RuntimeError("session deleted")
+        return self.log[-1][1] if self.log else "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def fake_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "_store", shared_cache.MemoryStore())
+    monkeypatch.setattr(shared_cache, "_store_pid", os.getpid())
+    monkeypatch.setattr(screenshot_worker, "SCREENSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(screenshot_worker.price_scraper, "wait_for_page_ready", lambda d, url="": "idle")
+    monkeypatch.setattr(screenshot_worker, "_autofill_queue_item", lambda *a: None)
+    monkeypatch.setattr(screenshot_worker, "_upload_screenshot_to_sharepoint", lambda *a: None)
+    monkeypatch.setattr(screenshot_worker.price_scraper, "dismiss_popups_and_interstitials", lambda d: None)
+    monkeypatch.setattr(screenshot_worker.price_scraper, "scrape_price_from_driver", lambda d: "$9.99")
+
+    log, drivers = [], []
+
+    def create():
+        drivers.append(FakeDriver(log))
+        return drivers[-1]
+
+    monkeypatch.setattr(screenshot_worker, "_create_chrome_driver", create)
+    monkeypatch.setattr(browser_pool, "create_driver", create)
+    monkeypatch.setattr(browser_pool, "_pool", browser_pool.BrowserPool(size=1))
+    monkeypatch.setattr(browser_pool, "_pool_pid", os.getpid())
+    yield log, drivers
+    screenshot_worker.stop_worker()
+    for t in screenshot_worker._worker_threads:
+        t.join(timeout=5)
+    screenshot_worker._worker_threads.clear()
+
+
+def test_pool_runs_jobs_in_parallel_and_recycles_browsers(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    monkeypatch.setattr(screenshot_worker, "PAGES_PER_BROWSER", 2)
+
+    for i in range(8):
+        screenshot_worker.queue_screenshot(f"Part {i}", f"https://example.com/{i}", "Drive Train")
+    assert screenshot_worker.get_status("Part 0") == "queued"
+
+    screenshot_worker.start_worker(workers=3)
+    screenshot_worker.drain()
+
+    assert all(screenshot_worker.get_status(f"Part {i}") == "done" for i in range(8))
+    assert len({thread for thread, _ in log}) > 1
+    # 8 pages at most 2 per browser
+    assert len(drivers) >= 4
+    assert any(d.quit_called for d in drivers)
+
+
+def test_crashed_browser_is_replaced(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    save = FakeDriver.save_screenshot
+
+    def crash_first_browser(driver, path):
+        if driver is drivers[0]:
+            raise RuntimeError("chrome not reachable")
+        save(driver, path)
+
+    monkeypatch.setattr(FakeDriver, "save_screenshot", crash_first_browser)
+    screenshot_worker.start_worker(workers=1)
+    screenshot_worker.queue_screenshot("Thruster", "https://example.com/t200", "Drive Train")
+    screenshot_worker.drain()
+    # Retried with a fresh browser
+    assert screenshot_worker.get_status("Thruster") == "done"
+    assert drivers[0].quit_called
+
+    screenshot_worker.queue_screenshot("ESC", "https://example.com/esc", "Drive Train")
+    screenshot_worker.drain()
+    assert screenshot_worker.get_status("ESC") == "done"
+    assert len(drivers) == 2
+
+
+def test_job_errors_after_max_attempts(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+
+    def crash(driver, path):
+        raise RuntimeError("chrome not reachable")
+
+    monkeypatch.setattr(FakeDriver, "save_screenshot", crash)
+    screenshot_worker.start_worker(workers=1)
+    screenshot_worker.queue_screenshot("Thruster", "https://example.com/t200", "Drive Train")
+    screenshot_worker.drain()
+    assert screenshot_worker.get_status("Thruster") == "error"
+    assert len(drivers) == screenshot_worker.JOB_MAX_ATTEMPTS
+
+
+def test_interrupted_jobs_resume_on_start(fake_pool):
+    store = shared_cache.get_store()
+    for i in range(3):
+        screenshot_worker.queue_screenshot(f"Part {i}", f"https://example.com/{i}", "Drive Train")
+    # A worker in a process that has since exited took the first job
+    claimed = store.claim_job(screenshot_worker._JOB_NS, f"{screenshot_worker.socket.gethostname()}:{2 ** 22 + 1}")
+    assert screenshot_worker.get_statuses(["Part 0", "Part 1", "Other"]) == ["processing", "queued", "none"]
+
+    screenshot_worker.start_worker(workers=1)
+    screenshot_worker.drain()
+    assert screenshot_worker.get_statuses([f"Part {i}" for i in range(3)]) == ["done"] * 3
+    assert claimed["payload"]["item_name"] == "Part 0"
+
+
+def test_capture_does_not_wait_for_upload(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    release = threading.Event()
+    monkeypatch.setattr(screenshot_worker, "_upload_screenshot_to_sharepoint", lambda *a: release.wait(5))
+
+    screenshot_worker.start_worker(workers=1)
+    for i in range(3):
+        screenshot_worker.queue_screenshot(f"Part {i}", f"https://example.com/{i}", "Drive Train")
+    screenshot_worker.wait_for_jobs()
+
+    # All pages captured while uploads are still blocked
+    assert [url for _, url in log] == [f"https://example.com/{i}" for i in range(3)]
+    assert screenshot_worker._stages["upload"].queue.unfinished_tasks > 0
+    release.set()
+    screenshot_worker.drain()
+    assert all(screenshot_worker.get_status(f"Part {i}") == "done" for i in range(3))
+
+
+def test_cleanup_evicts_least_recently_served(tmp_path, monkeypatch):
+    shots = tmp_path / "shots"
+    monkeypatch.setattr(shared_cache, "_store", shared_cache.SQLiteStore(str(tmp_path / "cache.sqlite3")))
+    monkeypatch.setattr(shared_cache, "_store_pid", os.getpid())
+    monkeypatch.setattr(screenshot_worker, "SCREENSHOT_DIR", str(shots))
+    monkeypatch.setattr(screenshot_worker, "_index_reconciled", False)
+    monkeypatch.setattr(screenshot_worker, "MAX_STORAGE_MB", 1)
+
+    paths = []
+    for i, bill in enumerate(["Old Bill", "Drive Train", "Drive Train"]):
+        (shots / bill).mkdir(parents=True, exist_ok=True)
+        path = shots / bill / f"Part {i}.png"
+        path.write_bytes(b"x" * 400_000)
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(str(path))
+
+    screenshot_worker.reconcile_screenshot_index()
+    store = shared_cache.get_store()
+    assert store.total_size("screenshots") == 1_200_000
+
+    # The oldest file by mtime is still being viewed; Part 1 is the least recently used
+    screenshot_worker.touch_screenshot(paths[0])
+    screenshot_worker._cleanup_old_screenshots()
+
+    assert os.path.exists(paths[0]) and os.path.exists(paths[2])
+    assert not os.path.exists(paths[1])
+    assert store.total_size("screenshots") == 800_000
+
+    # New captures are indexed without another walk
+    (shots / "Drive Train" / "Part 3.png").write_bytes(b"x" * 400_000)
+    screenshot_worker.record_screenshot(str(shots / "Drive Train" / "Part 3.png"))
+    assert store.total_size("screenshots") == 1_200_000
+    screenshot_worker._cleanup_old_screenshots()
+    assert not os.path.exists(paths[2])
+    assert sorted(store.file_index("screenshots")) == [os.path.join("Drive Train", "Part 3.png"), os.path.join("Old Bill", "Part 0.png")]
+
+
+def test_screenshot_lookup_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshot_worker, "SCREENSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(screenshot_worker, "INDEX_POLL_SECONDS", 0)
+    monkeypatch.setattr(shared_cache, "_store", shared_cache.MemoryStore())
+    monkeypatch.setattr(shared_cache, "_store_pid", os.getpid())
+    (tmp_path / "Drive Train").mkdir()
+    (tmp_path / "Drive Train" / "thruster  T200.png").write_bytes(b"png")
+    (tmp_path / "_queue").mkdir()
+    (tmp_path / "_queue" / "ESC.png").write_bytes(b"png")
+
+    # Flexible matching (spacing, case), falling back to other bill folders
+    assert screenshot_worker.get_screenshot_path("Thruster T200", "Drive Train") == str(tmp_path / "Drive Train" / "thruster  T200.png")
+    assert screenshot_worker.get_screenshot_path("ESC", "Drive Train") == str(tmp_path / "_queue" / "ESC.png")
+    assert screenshot_worker.get_screenshot_paths([("ESC", "_queue"), ("Battery", "_queue"), ("", "")]) == [
+        str(tmp_path / "_queue" / "ESC.png"), None, None,
+    ]
+
+    # Files written by another process are picked up by the mtime poll, deletions too
+    (tmp_path / "Hull").mkdir()
+    (tmp_path / "Hull" / "Battery.png").write_bytes(b"png")
+    os.remove(tmp_path / "_queue" / "ESC.png")
+    assert screenshot_worker.get_screenshot_path("Battery") == str(tmp_path / "Hull" / "Battery.png")
+    assert not screenshot_worker.has_screenshot("ESC", "_queue")
+
+    # Our own writes are visible immediately, without waiting for a poll
+    monkeypatch.setattr(screenshot_worker, "INDEX_POLL_SECONDS", 3600)
+    (tmp_path / "Hull" / "Anchor.png").write_bytes(b"png")
+    screenshot_worker.record_screenshot(str(tmp_path / "Hull" / "Anchor.png"))
+    assert screenshot_worker.has_screenshot("Anchor", "Hull")
+
+
+def test_duplicate_jobs_are_coalesced(fake_pool):
+    first = screenshot_worker.queue_screenshot("Thruster T200", "https://Example.com/t200/?utm_source=x#specs", "Drive Train",
+                                               priority=screenshot_worker.PRIORITY_BULK)
+    again = screenshot_worker.queue_screenshot("Thruster T200", "https://example.com/t200", "Drive Train", overwrite=True)
+    assert again == first
+    job = screenshot_worker.get_job(first)
+    assert job["payload"]["overwrite"] is True and job["priority"] == screenshot_worker.PRIORITY_ITEM
+    # A later request without overwrite doesn't clear it
+    assert screenshot_worker.queue_screenshot("Thruster T200", "https://example.com/t200", "Drive Train") == first
+    assert screenshot_worker.get_job(first)["payload"]["overwrite"] is True
+
+    other_bill = screenshot_worker.queue_screenshot("Thruster T200", "https://example.com/t200", "Spares", overwrite=True)
+    other_url = screenshot_worker.queue_screenshot("Thruster T200", "https://example.com/t100", "Drive Train", overwrite=True)
+    assert len({first, other_bill, other_url}) == 3
+
+    log, _ = fake_pool
+    screenshot_worker.start_worker(workers=1)
+    screenshot_worker.drain()
+    # One page load per distinct job
+    assert len(log) == 3
+
+
+def test_interactive_tasks_jump_the_bulk_queue(fake_pool):
+    log, drivers = fake_pool
+    for i in range(6):
+        screenshot_worker.queue_screenshot(f"Part {i}", f"https://example.com/{i}", "Drive Train",
+                                           priority=screenshot_worker.PRIORITY_BULK)
+    screenshot_worker.start_worker(workers=1)
+    while not log:
+        time.sleep(0.01)
+
+    browser = screenshot_worker.InteractiveBrowser()
+    assert browser.run(lambda d: d.get("https://example.com/form") or "ok") == "ok"
+    # Ran on the pool's warm browser, right after the capture in progress
+    assert len(drivers) == 1
+    assert [url for _, url in log].index("https://example.com/form") <= 2
+
+    screenshot_worker.drain()
+    assert screenshot_worker.get_statuses([f"Part {i}" for i in range(6)]) == ["done"] * 6
+
+
+def test_bulk_jobs_are_not_starved(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    monkeypatch.setattr(screenshot_worker, "INTERACTIVE_WAIT_SECONDS", 30)
+    screenshot_worker.queue_screenshot("Part 0", "https://example.com/0", "Drive Train",
+                                       priority=screenshot_worker.PRIORITY_BULK)
+    tasks = [screenshot_worker._Task(lambda d, i=i: d.get(f"https://example.com/task{i}")) for i in range(8)]
+    screenshot_worker._interactive.extend(tasks)
+
+    screenshot_worker.start_worker(workers=1)
+    screenshot_worker.drain()
+    for task in tasks:
+        task.done.wait(5)
+    urls = [url for _, url in log]
+    assert urls.index("https://example.com/0") == screenshot_worker.INTERACTIVE_BURST
+
+
+def test_interactive_browser_without_pool_leases_a_warm_browser(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    monkeypatch.setattr(browser_pool, "LEASE_WAIT_SECONDS", 0.2)
+    browser = screenshot_worker.InteractiveBrowser()
+    browser.run(lambda d: d.get("https://example.com/a"))
+    # Between runs the browser is back in the pool for other requests
+    with browser_pool.lease() as driver:
+        driver.get("https://example.com/other")
+    browser.run(lambda d: d.get("https://example.com/b"))
+    screenshot_worker.InteractiveBrowser().run(lambda d: d.get("https://example.com/c"))
+    assert len(drivers) == 1 and not drivers[0].quit_called
+
+    with pytest.raises(ValueError):
+        browser.run(lambda d: int("not a price"))
+    assert drivers[0].quit_called
+
+
+def test_interactive_tasks_leave_the_queue_when_the_caller_gives_up(fake_pool, monkeypatch):
+    log, drivers = fake_pool
+    monkeypatch.setattr(screenshot_worker, "_pool_running", lambda: True)
+    monkeypatch.setattr(screenshot_worker, "INTERACTIVE_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(screenshot_worker, "INTERACTIVE_TIMEOUT", 0.05)
+    browser = screenshot_worker.InteractiveBrowser()
+
+    # No worker took it, so the caller ran it on a leased browser
+    assert browser.run(lambda d: "ran") == "ran"
+    assert not screenshot_worker._interactive
+
+    # A worker took it but is stuck: the caller times out
+    monkeypatch.setattr(screenshot_worker, "INTERACTIVE_WAIT_SECONDS", 0.5)
+    threading.Timer(0.01, screenshot_worker._pop_interactive).start()
+    with pytest.raises(TimeoutError):
+        browser.run(lambda d: "late")
+    assert not screenshot_worker._interactive
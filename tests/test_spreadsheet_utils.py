@@ -0,0 +1,129 @@
+"""
+test_spreadsheet_utils.py - Header detection and robust sheet loading.
+"""
+
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import spreadsheet_utils
+import workbook_cache
+
+
+@pytest.fixture(autouse=True)
+def private_snapshot_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(workbook_cache, "_memory", {})
+
+
+def _ordering_workbook(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Ordering"
+    ws.append(["FY27 Ordering", None, None])
+    ws.append(["Order ID", "Bill Item ID", "Item Name", None])
+    ws.append(["260901_amazon_gburdell3", 12, "Thruster", None])
+    ws.append([None, None, None, None])
+    ws.append(["260902_digikey_gburdell3", 13, "ESC", "extra"])
+    wb.save(path)
+
+
+def test_find_header_row_prefers_row_with_most_aliases():
+    df_raw = pd.DataFrame([["FY27 Ordering", None], ["Order ID", "Item Name"], ["a", "b"]], dtype=object)
+    assert spreadsheet_utils.find_header_row(df_raw) == 1
+
+
+def test_read_sheet_robust_parses_once(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _ordering_workbook(path)
+
+    with patch("pandas.read_excel", wraps=pd.read_excel) as read_excel:
+        df = spreadsheet_utils.read_sheet_robust(path, ["Ordering"], engine="openpyxl")
+    assert read_excel.call_count == 1
+
+    # Columns and index as pd.read_excel(header=1) names them
+    assert list(df.columns) == ["Order ID", "Bill Item ID", "Item Name", "Unnamed: 3"]
+    assert list(df.index) == [0, 1, 2]
+    assert df.loc[0, "Bill Item ID"] == 12
+    assert df.loc[1, "Order ID"] == ""
+    assert df.loc[2, "Unnamed: 3"] == "extra"
+
+
+def test_column_resolver_matches_get_col_val():
+    df = pd.DataFrame(
+        [[376851.0, "Thruster", "https://x", 2, "ok"], ["", "", "", "", ""]],
+        columns=["Bill Item ID", " ITEM NAME ", "Product Link", "Qty", "Status Notes"],
+        dtype=object,
+    )
+    cols = spreadsheet_utils.ColumnResolver(df.columns)
+    row = df.iloc[0].to_dict()
+    for key in spreadsheet_utils.COLUMN_ALIASES:
+        assert cols.get(row, key, "-") == spreadsheet_utils.get_col_val(row, key, "-")
+
+    assert cols.column("item_name") == " ITEM NAME "
+    assert cols.column("vendor") is None
+    assert list(cols.values(df, "bill_item_id")) == ["376851", ""]
+    assert list(cols.values(df, "vendor", "n/a")) == ["n/a", "n/a"]
+    assert cols.get({}, "item_name") == ""
+
+
+def _doctor_workbook(path):
+    wb = openpyxl.Workbook()
+    bills = wb.active
+    bills.title = "Bills"
+    bills.append(["Bill Item ID", "Bill No.", "Bill Title", "Item Name", "Cost", "Link"])
+    bills.append([1, 1001, "Drive Train", "Thruster", 199.99, "https://example.com/t200"])
+    bills.append([2, None, "Drive Train", "ESC", 0, "example.com/esc"])
+    bills.append([None, None, "Request 1", None, None, None])
+    bills.append([1, 1001, "Drive Train", None, 5, None])
+    orders = wb.create_sheet("Ordering")
+    orders.append(["Ordering"])
+    orders.append(["Order ID", "Bill Item ID", "Item Name"])
+    orders.append(["260901_amazon_gburdell3", 1, "Thruster"])
+    orders.append(["260901_amazon_gburdell3", 42, "Ghost"])
+    orders.append(["Order 2", 43, "Header"])
+    wb.save(path)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_budget_spreadsheet_reports_in_row_order(tmp_path, jobs):
+    path = str(tmp_path / "budget.xlsx")
+    _doctor_workbook(path)
+
+    results = spreadsheet_utils.validate_budget_spreadsheet(path, jobs=jobs)
+
+    assert results["valid"] is False
+    assert results["errors"] == ["Duplicate Bill Item ID '1' on row 5 (previously seen on row 2)."]
+    assert results["warnings"] == [
+        "Row 3 ('ESC') missing Bill No.",
+        "Row 3 ('ESC') has cost <= $0.00 ($0.00).",
+        "Row 3 ('ESC') has non-standard link: 'example.com/esc'.",
+        "Row 5 has Bill Item ID '1' but missing Item Name.",
+        "Ordering sheet row 4 (Order: '260901_amazon_gburdell3') references Bill Item ID '42' which does not exist in Bills sheet.",
+    ]
+
+
+def test_incremental_doctor_rechecks_only_changed_rows(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _doctor_workbook(path)
+    full = spreadsheet_utils.validate_budget_spreadsheet(path)
+
+    first = spreadsheet_utils.validate_budget_spreadsheet(path, incremental=True)
+    assert first["rechecked"] == {"Bills": (4, 4), "Ordering": (3, 3)}
+    again = spreadsheet_utils.validate_budget_spreadsheet(path, incremental=True)
+    assert again["rechecked"] == {"Bills": (0, 4), "Ordering": (0, 3)}
+    for results in (first, again):
+        assert (results["errors"], results["warnings"]) == (full["errors"], full["warnings"])
+
+    # Give ESC the same ID as the Thruster: one changed row, but a new cross-row duplicate
+    wb = openpyxl.load_workbook(path)
+    wb["Bills"]["A3"] = 1
+    wb.save(path)
+    full = spreadsheet_utils.validate_budget_spreadsheet(path)
+    results = spreadsheet_utils.validate_budget_spreadsheet(path, incremental=True)
+
+    assert results["rechecked"]["Bills"] == (1, 4)
+    assert "Duplicate Bill Item ID '1' on row 3 (previously seen on row 2)." in results["errors"]
+    assert (results["errors"], results["warnings"]) == (full["errors"], full["warnings"])
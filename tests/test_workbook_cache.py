@@ -0,0 +1,75 @@
+"""
+test_workbook_cache.py - Parsed sheets are reused until the workbook's content changes.
+"""
+
+import os
+from unittest.mock import patch
+
+import openpyxl
+import pytest
+
+import spreadsheet_utils
+import workbook_cache
+import xlsx_reader
+
+
+@pytest.fixture(autouse=True)
+def private_snapshot_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(workbook_cache, "_memory", {})
+
+
+def _workbook(path, item="Thruster"):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Bills"
+    ws.append(["Bill Item ID", "Bill Title", "Item Name", "Cost"])
+    ws.append([1, "Drive Train", item, 199.99])
+    wb.save(path)
+
+
+def test_unchanged_workbook_is_not_reparsed(tmp_path, monkeypatch):
+    path = str(tmp_path / "budget.xlsx")
+    _workbook(path)
+
+    with patch("xlsx_reader.read_rows", wraps=xlsx_reader.read_rows) as parse:
+        first = spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")
+        assert parse.call_count == 1
+
+        # A new process: nothing in memory, snapshot comes from disk
+        monkeypatch.setattr(workbook_cache, "_memory", {})
+        second = spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")
+        assert parse.call_count == 1
+        assert second.equals(first)
+
+        # Same bytes, new mtime (e.g. rclone re-copied it): still a hit
+        os.utime(path, (1, 1))
+        monkeypatch.setattr(workbook_cache, "_memory", {})
+        spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")
+        assert parse.call_count == 1
+
+        _workbook(path, item="Battery")
+        changed = spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")
+        assert parse.call_count == 2
+        assert changed.iloc[0]["Item Name"] == "Battery"
+
+
+def test_callers_get_their_own_copy(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _workbook(path)
+
+    df = spreadsheet_utils.read_sheet(path, "Bills")
+    df.loc[0, "Item Name"] = "edited"
+    assert spreadsheet_utils.read_sheet(path, "Bills").iloc[0]["Item Name"] == "Thruster"
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    path = str(tmp_path / "budget.xlsx")
+    _workbook(path)
+    monkeypatch.setattr(workbook_cache, "ENABLED", False)
+
+    calls = []
+    workbook_cache.cached(path, "k", lambda: calls.append(1))
+    workbook_cache.cached(path, "k", lambda: calls.append(1))
+    assert len(calls) == 2
+    assert not os.path.exists(workbook_cache.CACHE_DIR)
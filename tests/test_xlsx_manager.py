@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../w
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import xlsx_manager
+import shared_cache
 
 
 def test_column_mapping():
@@ -20,17 +21,62 @@ def test_column_mapping():
 
 
 def test_cache_invalidation():
-    xlsx_manager._cached_items = [{"Item Name": "Test"}]
-    xlsx_manager._cached_items_time = 12345
-    xlsx_manager._cached_queue = [{"Item Name": "Queue Test"}]
-    xlsx_manager._cached_queue_time = 67890
+    store = shared_cache.get_store()
+    xlsx_manager.invalidate_items_cache()
+    assert store.generation("items") == (1, False)
 
     xlsx_manager.invalidate_all_caches()
 
-    assert xlsx_manager._cached_items == []
-    assert xlsx_manager._cached_items_time == 0
-    assert xlsx_manager._cached_queue == []
-    assert xlsx_manager._cached_queue_time == 0
+    assert store.generation("items") == (2, True)
+    assert store.generation("queue") == (1, True)
+    assert store.generation("orders") == (1, True)
+
+
+def test_snapshot_cache_serves_stale_while_revalidating():
+    import threading
+    import time
+
+    loads = []
+    reloaded = threading.Event()
+
+    def loader():
+        loads.append(1)
+        if len(loads) > 1:
+            reloaded.set()
+        return [{"n": len(loads)}]
+
+    cache = xlsx_manager.SnapshotCache("test", loader, ttl=60, max_stale=600)
+    assert cache.get() == [{"n": 1}]
+    assert cache.get() == [{"n": 1}]
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    # Expired: old snapshot returned at once, reload happens in the background
+    cache.invalidate()
+    assert cache.get() == [{"n": 1}]
+    assert reloaded.wait(2)
+    for _ in range(100):
+        if cache.data == [{"n": 2}]:
+            break
+        time.sleep(0.01)
+    assert cache.get() == [{"n": 2}]
+    assert cache.stale_hits == 1
+
+    # invalidate(wait=True) blocks the next read on a fresh load
+    cache.invalidate(wait=True)
+    assert cache.get() == [{"n": 3}]
+
+    # A failing reload keeps the last good snapshot
+    cache.loader = lambda: 1 / 0
+    cache.invalidate(wait=True)
+    assert cache.get() == [{"n": 3}]
+    assert cache.stats()["errors"] == 1
+
+    # An emptied table is a real snapshot, not a failed load
+    cache.loader = lambda: []
+    cache.invalidate(wait=True)
+    assert cache.get() == []
+    assert cache.get() == []
+    assert cache.stats()["fresh"] and cache.stats()["errors"] == 1
 
 
 def test_get_bills_empty():
@@ -52,3 +98,283 @@ def test_get_bills_empty():
         assert len(items_alpha) == 2
     finally:
         xlsx_manager.read_items = original_read_items
+
+
+def test_graph_write_batch_merges_adjacent_cells():
+    from unittest.mock import patch
+
+    batch = xlsx_manager.GraphWriteBatch(("tok", "drive", "file"))
+    for col in (1, 2, 3, 5):
+        batch.set_table_cell("BillsT", 4, col, f"v{col}", tag="row4")
+    batch.set_table_cell("OrderT", 0, 0, "x", tag="order")
+
+    def mock_post(url, json=None, **kwargs):
+        responses = [{"id": r["id"], "status": 200} for r in json["requests"]]
+        class MockResp:
+            status_code = 200
+            def json(self):
+                return {"responses": responses}
+        return MockResp()
+
+    with patch("graph_client.post", side_effect=mock_post) as post:
+        batch.flush()
+
+    body = post.call_args.kwargs["json"]
+    assert post.call_args.args[0].endswith("/$batch")
+    assert [r["url"].split("workbook")[1] for r in body["requests"]] == [
+        "/worksheets('Bills')/range(address='B6:D6')",
+        "/worksheets('Bills')/range(address='F6')",
+        "/worksheets('Ordering')/range(address='A3')",
+    ]
+    assert body["requests"][0]["body"] == {"values": [["v1", "v2", "v3"]]}
+    assert not any("dependsOn" in r for r in body["requests"])
+    assert batch.ok("row4") and batch.ok("order")
+
+
+def test_graph_write_batch_chains_only_around_row_changes():
+    from unittest.mock import patch
+
+    batch = xlsx_manager.GraphWriteBatch(("tok", "drive", "file"))
+    batch.set_table_cell("OrderT", 5, 0, "a", tag="cells")        # 1
+    batch.set_table_cell("BillsT", 2, 1, "b", tag="cells")        # 2
+    batch.delete_table_row("OrderT", 7, tag="del")                # 3
+    batch.set_table_cell("OrderT", 1, 0, "c", tag="after")        # 4
+    batch.set_table_cell("OrderT", 2, 0, "d", tag="after")        # 5
+    batch.set_table_cell("BillsT", 3, 1, "e", tag="cells")        # 6
+
+    def mock_post(url, json=None, **kwargs):
+        # The independent Bills write fails; nothing else depends on it
+        responses = [{"id": r["id"], "status": 400 if r["id"] == "2" else 200,
+                      "body": {"error": {"message": "bad"}}} for r in json["requests"]]
+        class MockResp:
+            status_code = 200
+            def json(self):
+                return {"responses": responses}
+        return MockResp()
+
+    with patch("graph_client.post", side_effect=mock_post) as post:
+        batch.flush()
+
+    deps = [r.get("dependsOn") for r in post.call_args.kwargs["json"]["requests"]]
+    assert deps == [None, None, ["1"], ["3"], ["3"], None]
+    assert [r["ok"] for r in batch.results] == [True, False, True, True, True, True]
+    assert batch.ok("del") and batch.ok("after") and not batch.ok("cells")
+
+
+def test_graph_write_batch_retries_throttled_writes():
+    from unittest.mock import patch
+
+    batch = xlsx_manager.GraphWriteBatch(("tok", "drive", "file"))
+    batch.set_table_cell("BillsT", 2, 1, "a", tag="bad")            # 1: refused for good
+    batch.delete_table_row("OrderT", 7, tag="del")                  # 2: throttled once
+    batch.set_table_cell("OrderT", 1, 0, "b", tag="after-del")      # 3: 424 behind 2
+    batch.set_table_cell("BillsT", 3, 1, "c", tag="fine")           # 4
+    sent = []
+
+    def mock_post(url, json=None, **kwargs):
+        sent.append(json["requests"])
+        if len(sent) == 1:
+            status = {"1": 400, "2": 429, "3": 424, "4": 200}
+        else:
+            status = {r["id"]: 200 for r in json["requests"]}
+        responses = [{"id": r["id"], "status": status[r["id"]], "headers": {"Retry-After": "3"}}
+                     for r in json["requests"]]
+        class MockResp:
+            status_code = 200
+            def json(self):
+                return {"responses": responses}
+        return MockResp()
+
+    with patch("graph_client.post", side_effect=mock_post), patch("time.sleep") as sleep:
+        batch.flush()
+
+    # The throttled delete and the write chained behind it are sent again after Retry-After
+    retried = sent[1]
+    assert [r["url"].split("workbook")[1] for r in retried] == [
+        "/tables/OrderT/rows/itemAt(index=7)", "/worksheets('Ordering')/range(address='A4')",
+    ]
+    assert retried[1]["dependsOn"] == ["1"]
+    sleep.assert_called_once_with(3.0)
+    assert len(sent) == 2
+    assert batch.ok("del") and batch.ok("after-del") and batch.ok("fine")
+    assert not batch.ok("bad")
+
+
+def test_graph_write_batch_single_request_and_failures():
+    from unittest.mock import patch
+
+    batch = xlsx_manager.GraphWriteBatch(("tok", "drive", "file"))
+    batch.delete_table_row("TestTable", 3, tag="del")
+    with patch("graph_client.request") as req:
+        req.return_value.status_code = 404
+        req.return_value.ok = False
+        req.return_value.text = "not found"
+        batch.flush()
+
+    assert req.call_args.args[0] == "DELETE"
+    assert req.call_args.args[1].endswith("/workbook/tables/TestTable/rows/itemAt(index=3)")
+    assert not batch.ok("del")
+    assert batch.ok_count() == 0
+
+
+def test_row_index_follows_own_writes():
+    from unittest.mock import patch
+
+    columns = ["Order ID (YYMMDD_vendor_gburdell3)", "Bill Item ID", "Vendor", "Item Name", "Status"]
+    rows = {"value": [
+        {"index": 0, "values": [["", "", "", "Order 1", ""]]},
+        {"index": 1, "values": [["260811_amazon_tester", 101.0, "Amazon", "Thruster", "pending purchase"]]},
+        {"index": 2, "values": [["260811_amazon_tester", 102, "Amazon", "Battery", "pending purchase"]]},
+    ]}
+
+    xlsx_manager.invalidate_row_index()
+    with patch("xlsx_manager._get_graph_token", return_value=("tok", "drive", "file")), \
+         patch("xlsx_manager.graph_get_table_columns", return_value=columns), \
+         patch("graph_client.get") as get, \
+         patch("graph_client.request") as req:
+        get.return_value.status_code = 200
+        get.return_value.json.return_value = rows
+        req.return_value.status_code = 200
+
+        assert xlsx_manager.find_table_rows("OrderT", "Order ID", "260811_amazon_tester") == [1, 2]
+        assert xlsx_manager.find_table_rows("OrderT", "Bill Item ID", "101") == [1]
+
+        batch = xlsx_manager.GraphWriteBatch(("tok", "drive", "file"))
+        batch.set_table_cell("OrderT", 2, 0, "260812_digikey_tester")
+        batch.flush()
+
+        assert xlsx_manager.find_table_rows("OrderT", "Order ID", "260811_amazon_tester") == [1]
+        assert xlsx_manager.find_table_rows("OrderT", "Order ID", "260812_digikey_tester") == [2]
+        assert get.call_count == 1
+
+        batch.delete_table_row("OrderT", 0)
+        batch.flush()
+        assert "OrderT" not in xlsx_manager._row_index
+    xlsx_manager.invalidate_row_index()
+
+
+def test_row_targets_are_confirmed_live_before_writes():
+    import re
+    from unittest.mock import patch, MagicMock
+
+    columns = ["Order ID (YYMMDD_vendor_gburdell3)", "Bill Item ID", "Vendor", "Item Name", "Status"]
+    indexed = [
+        ["", "", "", "Order 1", ""],
+        ["260811_amazon_tester", 101, "Amazon", "Thruster", "pending purchase"],
+        ["", "", "", "", ""],
+    ]
+    # Someone inserted a row above in Excel after the index was built
+    live = [indexed[0], ["260815_mouser_other", 150, "Mouser", "Fuse", "ordered"], indexed[1], indexed[2]]
+    table = {"rows": indexed}
+
+    def fake_get(url, params=None, **kwargs):
+        resp = MagicMock(status_code=200)
+        if "/range(" in url:
+            first, last = (int(x) for x in re.findall(r"[A-Z]+(\d+)", url.split("address=")[1]))
+            resp.json.return_value = {"values": [live[r - 3] if r - 3 < len(live) else [""] * 5 for r in range(first, last + 1)]}
+        else:
+            resp.json.return_value = {"value": [{"index": i, "values": [v]} for i, v in enumerate(table["rows"])]}
+        return resp
+
+    xlsx_manager.invalidate_row_index()
+    with patch("xlsx_manager._get_graph_token", return_value=("tok", "drive", "file")), \
+         patch("xlsx_manager.graph_get_table_columns", return_value=columns), \
+         patch("graph_client.get", side_effect=fake_get) as get:
+        assert xlsx_manager.find_table_rows("OrderT", "Bill Item ID", "101") == [1]
+        table["rows"] = live  # the rebuild sees the new layout
+        assert xlsx_manager.find_current_rows("OrderT", "Bill Item ID", "101") == [2]
+        # Row 2 was empty in the index but now holds data
+        assert not xlsx_manager.rows_still_match("OrderT", [2], empty=True)
+        assert xlsx_manager.rows_still_match("OrderT", [3, 4], empty=True)
+        # One table read to build the index and one to rebuild it after the mismatch
+        assert sum("/rows" in c.args[0] for c in get.call_args_list) == 2
+    xlsx_manager.invalidate_row_index()
+
+
+def test_concurrent_cache_misses_share_one_load():
+    import threading
+    import time
+
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return [{"Item Name": "Thruster"}]
+
+    cache = xlsx_manager.SnapshotCache("test-flight", slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [[{"Item Name": "Thruster"}]] * 5
+
+
+def test_overlapping_rclone_pulls_are_deduplicated(tmp_path, monkeypatch):
+    import threading
+    import time
+    from unittest.mock import patch
+
+    monkeypatch.setattr(xlsx_manager, "LOCAL_XLSX", str(tmp_path / "budget.xlsx"))
+
+    def slow_rclone(args):
+        time.sleep(0.2)
+        return True
+
+    with patch("xlsx_manager._run_rclone", side_effect=slow_rclone) as rclone:
+        threads = [threading.Thread(target=xlsx_manager.sync_pull, kwargs={"force": True}) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert rclone.call_count == 1
+
+
+def test_workers_share_snapshots_and_invalidations(tmp_path, monkeypatch):
+    from unittest.mock import MagicMock
+
+    store = shared_cache.SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(shared_cache, "_store", store)
+
+    # Two SnapshotCache objects with the same name stand in for two gunicorn workers
+    loader_a = MagicMock(return_value=[{"Item Name": "Thruster"}])
+    loader_b = MagicMock(return_value=[{"Item Name": "Battery"}])
+    worker_a = xlsx_manager.SnapshotCache("items", loader_a)
+    worker_b = xlsx_manager.SnapshotCache("items", loader_b)
+
+    assert worker_a.get() == [{"Item Name": "Thruster"}]
+    assert worker_b.get() == [{"Item Name": "Thruster"}]  # adopted, not reloaded
+    assert loader_b.call_count == 0
+    assert worker_b.shared_hits == 1
+
+    # A write in worker B makes worker A's next read wait for fresh data
+    worker_b.invalidate(wait=True)
+    loader_a.return_value = [{"Item Name": "Thruster v2"}]
+    assert worker_a.get() == [{"Item Name": "Thruster v2"}]
+    assert loader_a.call_count == 2
+    assert store.generation("items") == (1, False)
+
+
+def test_locked_shared_cache_degrades_to_a_miss(tmp_path, monkeypatch):
+    import sqlite3
+    from unittest.mock import MagicMock
+
+    store = shared_cache.SQLiteStore(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(shared_cache, "_store", store)
+    cache = xlsx_manager.SnapshotCache("items", MagicMock(return_value=[{"Item Name": "Thruster"}]))
+    assert cache.get() == [{"Item Name": "Thruster"}]
+
+    class LockedConnection:
+        def execute(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(store, "_conn", LockedConnection())
+    assert store.generation("items") == (-1, True)
+    assert store.load("items") is None
+    cache.loader.return_value = [{"Item Name": "Battery"}]
+    assert cache.get() == [{"Item Name": "Battery"}]  # reloaded instead of a 500
+    assert cache.loader.call_count == 2
@@ -0,0 +1,133 @@
+"""
+test_xlsx_reader.py - The streaming xlsx reader must return what openpyxl returns.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../web-app")))
+
+import xlsx_reader
+import spreadsheet_utils
+import workbook_cache
+import xlsx_manager
+
+
+@pytest.fixture(autouse=True)
+def private_snapshot_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(workbook_cache, "_memory", {})
+
+
+def _budget_workbook(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Bills"
+    ws.append(["Bill Item ID", "Bill No.", "Bill Title", "Item Name", "Cost", "Link", None, "Ordered"])
+    ws.append([1, 1001, "Drive Train", "Thruster  T200", 199.99, "https://example.com/t200", None, datetime(2026, 9, 1)])
+    ws.append([2, 1001, "Drive Train", "ESC", 25, None, "note", True])
+    ws.append([None, None, "Request 1", None, None, None, None, None])
+    ws.append([-1, None, "Liquid", "Allocation", 500, None, None, None])
+    ws["H2"].number_format = "yyyy-mm-dd"
+    ws.cell(row=8, column=4, value="Anchor")  # row after a gap
+    ws.cell(row=8, column=3, value="Hull")
+
+    queue = wb.create_sheet("Test")
+    queue.append(["Bill Item ID", "Item Name", "Quantity"])
+    queue.append([None, "Battery", 2])
+
+    orders = wb.create_sheet("Ordering")
+    orders.append(["Ordering"])
+    orders.append(["Order ID", "Bill Item ID", "Item Name", "Item Name"])
+    orders.append(["260901_amazon_gburdell3", 1, "Thruster", "dup"])
+    wb.save(path)
+
+
+def test_values_match_openpyxl(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _budget_workbook(path)
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    with xlsx_reader.XlsxReader(path) as book:
+        assert book.sheetnames == wb.sheetnames
+        for sheet in wb.sheetnames:
+            expected = [tuple(row) for row in wb[sheet].iter_rows(values_only=True)]
+            got = book.read_rows(sheet)
+            width = max(len(r) for r in expected)
+            assert [r + (None,) * (width - len(r)) for r in got] == expected
+    wb.close()
+
+
+def test_dates_use_the_1904_date_system(tmp_path):
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+    path = str(tmp_path / "mac.xlsx")
+    wb = openpyxl.Workbook()
+    wb.epoch = CALENDAR_MAC_1904
+    wb.active.append([datetime(2026, 9, 1), 1])
+    wb.active["A1"].number_format = "yyyy-mm-dd"
+    wb.save(path)
+
+    with xlsx_reader.XlsxReader(path) as book:
+        assert book.read_rows("Sheet") == [(datetime(2026, 9, 1), 1)]
+
+
+def test_iter_rows_selects_columns_and_rows(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _budget_workbook(path)
+
+    with xlsx_reader.XlsxReader(path) as book:
+        rows = list(book.iter_rows("Bills", min_row=2, max_row=3, columns=[3, 0]))
+        assert rows == [(2, ("Thruster  T200", 1)), (3, ("ESC", 2))]
+        with pytest.raises(KeyError):
+            list(book.iter_rows("Missing"))
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        xlsx_reader.resolve_engine("xlrd")
+
+
+def test_engines_agree_for_web_app_reads(tmp_path, monkeypatch):
+    path = str(tmp_path / "budget.xlsx")
+    _budget_workbook(path)
+    monkeypatch.setattr(xlsx_manager, "LOCAL_XLSX", path)
+
+    for sheet, default_header in (("Bills", False), ("Test", True), ("Ordering", True)):
+        fast = xlsx_manager._read_local_sheet(sheet, engine="fast", default_header=default_header)
+        slow = xlsx_manager._read_local_sheet(sheet, engine="openpyxl", default_header=default_header)
+        assert fast == slow
+
+    header_row, rows = xlsx_manager._read_local_sheet("Bills", engine="fast")
+    assert header_row == 1
+    assert rows[0] == (2, {
+        "Bill Item ID": 1, "Bill No.": 1001, "Bill Title": "Drive Train", "Item Name": "Thruster T200",
+        "Cost": 199.99, "Link": "https://example.com/t200", "Ordered": datetime(2026, 9, 1),
+    })
+    assert rows[-1][0] == 8
+
+
+def test_engines_agree_for_cli_reads(tmp_path):
+    path = str(tmp_path / "budget.xlsx")
+    _budget_workbook(path)
+
+    for sheet in (["Bills"], ["Ordering"]):
+        fast = spreadsheet_utils.read_sheet_robust(path, sheet, engine="fast")
+        slow = spreadsheet_utils.read_sheet_robust(path, sheet, engine="openpyxl")
+        pd.testing.assert_frame_equal(fast, slow)
+
+    # Columns with gaps come back as floats, as they always have with pd.read_excel
+    bills = spreadsheet_utils.read_sheet_robust(path, ["Bills"], engine="fast")
+    assert bills["Bill Item ID"][0] == 1.0 and isinstance(bills["Bill Item ID"][0], float)
+    assert bills["Link"][1] == ""
+
+    for sheet, header in (("Bills", 0), ("Ordering", 1)):
+        frame = xlsx_reader.read_frame(path, sheet, header=header)
+        pd.testing.assert_frame_equal(frame, pd.read_excel(path, sheet_name=sheet, header=header, engine="openpyxl"))
+    frame = xlsx_reader.read_frame(path, "Ordering", header=1)
+    assert list(frame.columns) == ["Order ID", "Bill Item ID", "Item Name", "Item Name.1"]
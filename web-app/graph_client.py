@@ -0,0 +1,277 @@
+"""
+graph_client.py - Shared pooled HTTP session for Microsoft Graph calls.
+
+All Graph traffic goes through one keep-alive requests.Session per process, so
+repeat calls reuse the TCP+TLS connection to graph.microsoft.com instead of
+handshaking every time. Per-endpoint latency stats are kept for /status.
+
+Credentials come from rclone's OneDrive token in rclone.conf. They are cached in
+memory and only re-read when the file changes. rclone only refreshes a token
+that is about to expire, so the token is refreshed (by running rclone, which
+blocks that call) once it is within TOKEN_EXPIRY_MARGIN of expiring, and one
+thread at a time. A request that still comes back 401 (it went out just before
+expiry) is retried once with the refreshed token.
+"""
+
+from __future__ import annotations
+
+import configparser
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GRAPH_ROOT = "https://graph.microsoft.com/v1.0"
+
+# Connections kept open per host. gunicorn runs sync workers, so each process only
+# needs room for the request thread plus background threads (pulls, screenshots).
+POOL_SIZE = int(os.environ.get("GRAPH_POOL_SIZE", "8"))
+DEFAULT_TIMEOUT = 15
+
+RequestException = requests.exceptions.RequestException
+
+RCLONE_CONF = os.path.expanduser("~/.config/rclone/rclone.conf")
+# rclone's oauth2 client renews a token only within ~10s of its expiry; running it earlier leaves the token as is
+TOKEN_EXPIRY_MARGIN = 10
+
+# Parsed rclone credentials, keyed on rclone.conf mtime
+_token_cache: dict = {"mtime": None, "access_token": "", "drive_id": "", "expiry": 0.0}
+_token_lock = threading.Lock()
+_refresh_lock = threading.Lock()  # one rclone refresh at a time
+_last_refresh_attempt = 0.0
+REFRESH_RETRY_SECONDS = 60  # don't re-run a failing rclone refresh on every call
+
+_session: requests.Session | None = None
+_session_pid = 0
+_session_lock = threading.Lock()
+
+# endpoint -> {"calls", "errors", "total_ms", "max_ms", "last_ms"}
+_stats: dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return this process's pooled Graph session, creating it on first use.
+
+    The app is started with gunicorn --preload, so a session created in the master
+    would be inherited by every worker; sockets must not be shared across a fork,
+    so a new session is built whenever the pid changes.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate"})
+            _session = session
+            _session_pid = pid
+    return _session
+
+
+def _endpoint(method: str, url: str) -> str:
+    """Collapse a Graph URL to a stats key, e.g. 'GET /workbook/tables/BillsT/rows'."""
+    path = urlsplit(url).path
+    path = path.split("/v1.0", 1)[-1]
+    if "/root:" in path:
+        # Path-addressed items (file lookup, screenshot uploads) — drop the file path
+        path = "/root:" + ("/content" if path.endswith(":/content") else "")
+    path = re.sub(r"^/drives/[^/]+/items/[^/]+", "", path)
+    path = re.sub(r"^/drives/[^/]+", "", path)
+    path = re.sub(r"\([^)]*\)", "()", path)
+    return f"{method.upper()} {path or '/'}"
+
+
+def _record(key: str, elapsed_ms: float, ok: bool):
+    with _stats_lock:
+        s = _stats.setdefault(key, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+        s["calls"] += 1
+        if not ok:
+            s["errors"] += 1
+        s["total_ms"] += elapsed_ms
+        s["last_ms"] = elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+
+
+def _send(key: str, method: str, url: str, **kwargs) -> requests.Response:
+    start = time.perf_counter()
+    try:
+        resp = get_session().request(method, url, **kwargs)
+    except RequestException:
+        _record(key, (time.perf_counter() - start) * 1000, False)
+        raise
+    _record(key, (time.perf_counter() - start) * 1000, resp.status_code < 400)
+    return resp
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request on the pooled session and record its latency.
+
+    Takes the same arguments as requests.request; timeout defaults to
+    DEFAULT_TIMEOUT. Network errors are recorded and re-raised. A 401 on a
+    Bearer-authorized request is retried once if the token can be refreshed.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    key = _endpoint(method, url)
+    resp = _send(key, method, url, **kwargs)
+
+    headers = kwargs.get("headers") or {}
+    auth = headers.get("Authorization", "")
+    if resp.status_code == 401 and auth.startswith("Bearer "):
+        stale = auth[len("Bearer "):]
+        invalidate_token()
+        token = _refresh_blocking(stale)
+        if token and token["access_token"] != stale:
+            kwargs["headers"] = {**headers, "Authorization": f"Bearer {token['access_token']}"}
+            resp = _send(key, method, url, **kwargs)
+    return resp
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def patch(url: str, **kwargs) -> requests.Response:
+    return request("PATCH", url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    return request("PUT", url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+
+def get_stats() -> dict[str, dict]:
+    """Latency stats per endpoint: calls, errors, avg_ms, max_ms, last_ms."""
+    with _stats_lock:
+        return {
+            key: {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "avg_ms": round(s["total_ms"] / s["calls"], 1) if s["calls"] else 0.0,
+                "max_ms": round(s["max_ms"], 1),
+                "last_ms": round(s["last_ms"], 1),
+            }
+            for key, s in sorted(_stats.items())
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _parse_expiry(value: str) -> float:
+    """Parse rclone's RFC 3339 token expiry (nanosecond precision) to a timestamp. 0 if unknown."""
+    from datetime import datetime
+
+    match = re.match(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?(Z|[+-]\d\d:\d\d)?$", value or "")
+    if not match:
+        return 0.0
+    stamp, frac, tz = match.groups()
+    frac = (frac or ".0")[:7]  # datetime takes at most microseconds
+    tz = "+00:00" if tz in (None, "Z") else tz
+    try:
+        return datetime.fromisoformat(f"{stamp}{frac}{tz}").timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _load_token() -> dict | None:
+    """Read the onedrive token and drive id from rclone.conf."""
+    config = configparser.ConfigParser()
+    config.read(RCLONE_CONF)
+    if "onedrive" not in config:
+        return None
+    try:
+        token = json.loads(config["onedrive"]["token"])
+        return {
+            "access_token": token["access_token"],
+            "drive_id": config["onedrive"]["drive_id"],
+            "expiry": _parse_expiry(token.get("expiry", "")),
+        }
+    except (KeyError, json.JSONDecodeError):
+        return None
+
+
+def _refresh_token():
+    """Have rclone refresh the OAuth token; it writes the new token back to rclone.conf."""
+    global _last_refresh_attempt
+    _last_refresh_attempt = time.time()
+    try:
+        result = subprocess.run(["rclone", "about", "onedrive:"], capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            print(f"[graph] ⚠️ Token refresh failed: {result.stderr.strip()[:150]}")
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        print(f"[graph] ⚠️ Token refresh failed: {e}")
+
+
+def _refresh_blocking(stale: str) -> dict | None:
+    """
+    Refresh the token if it is still `stale` (the access token the caller saw) and
+    return the current credentials. Threads queue behind one refresh instead of each
+    starting rclone; the ones that waited just pick up its result.
+    """
+    with _refresh_lock:
+        token = _cached_token()
+        if token and token["access_token"] != stale:
+            return token  # refreshed while we waited
+        if time.time() - _last_refresh_attempt > REFRESH_RETRY_SECONDS:
+            _refresh_token()
+            token = _cached_token()
+        return token
+
+
+def _cached_token() -> dict | None:
+    """Return the cached credentials, re-reading rclone.conf only if its mtime changed."""
+    try:
+        mtime = os.path.getmtime(RCLONE_CONF)
+    except OSError:
+        return None
+    with _token_lock:
+        if _token_cache["mtime"] != mtime:
+            loaded = _load_token()
+            _token_cache.update(loaded or {"access_token": "", "drive_id": "", "expiry": 0.0})
+            _token_cache["mtime"] = mtime
+        if not _token_cache["access_token"]:
+            return None
+        return dict(_token_cache)
+
+
+def get_token() -> tuple[str, str] | None:
+    """Return (access_token, drive_id) from rclone's OneDrive credentials.
+
+    If the token expires within TOKEN_EXPIRY_MARGIN, waits for rclone to refresh it.
+    """
+    token = _cached_token()
+    if not token:
+        return None
+
+    if token["expiry"] and token["expiry"] - time.time() <= TOKEN_EXPIRY_MARGIN:
+        token = _refresh_blocking(token["access_token"])
+        if not token:
+            return None
+
+    return token["access_token"], token["drive_id"]
+
+
+def invalidate_token():
+    """Forget the cached credentials so the next get_token() re-reads rclone.conf."""
+    with _token_lock:
+        _token_cache["mtime"] = None
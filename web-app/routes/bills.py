@@ -6,7 +6,6 @@ import os
 import io
 import csv
 import shutil
-import requests
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
 import xlsx_manager
 import screenshot_worker
@@ -28,6 +27,7 @@ def _copy_screenshot_to_bill(item_name: str, from_bill: str, to_bill: str):
     dest_path = os.path.join(dest_dir, f"{safe_name}.png")
     try:
         shutil.copy2(src_path, dest_path)
+        screenshot_worker.record_screenshot(dest_path)
     except Exception as e:
         print(f"[screenshot] Local copy error: {e}")
 
@@ -115,7 +115,8 @@ def bill_view(bill_title):
     is_locked = is_bill_locked(bill_title)
 
     total = 0
-    for item in items:
+    paths = screenshot_worker.get_screenshot_paths([(str(item.get("Item Name", "")), bill_title) for item in items])
+    for item, full_path in zip(items, paths):
         try:
             cost = float(str(item.get("Cost", 0)).replace("$", "").replace(",", "") or 0)
             qty = float(item.get("Quantity", 1) or 1)
@@ -123,9 +124,7 @@ def bill_view(bill_title):
         except (ValueError, TypeError):
             pass
 
-        name = str(item.get("Item Name", ""))
-        item["_has_screenshot"] = screenshot_worker.has_screenshot(name, bill_title)
-        full_path = screenshot_worker.get_screenshot_path(name, bill_title)
+        item["_has_screenshot"] = full_path is not None
         if full_path:
             item["_screenshot_path"] = os.path.relpath(full_path, screenshot_worker.SCREENSHOT_DIR)
         else:
@@ -144,7 +143,8 @@ def take_bill_screenshots(bill_title):
         url = str(item.get("Link", "")).strip()
         name = str(item.get("Item Name", "")).strip()
         if url and name and url.startswith("http"):
-            screenshot_worker.queue_screenshot(name, url, bill_title, overwrite=True)
+            screenshot_worker.queue_screenshot(name, url, bill_title, overwrite=True,
+                                               priority=screenshot_worker.PRIORITY_BULK)
             queued_count += 1
 
     if queued_count > 0:
@@ -338,47 +338,26 @@ def delete_bill(bill_title):
         flash("Graph API unavailable", "error")
         return redirect(url_for("dashboard.dashboard"))
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/BillsT/rows"
-    resp = requests.get(rows_url, headers=headers, timeout=15)
-    if resp.status_code != 200:
-        flash("Failed to read bills", "error")
-        return redirect(url_for("dashboard.dashboard"))
-
-    rows = resp.json().get("value", [])
-
-    to_clear = []
-    for r in rows:
-        vals = r["values"][0]
-        row_bill = str(vals[2]) if vals[2] else ""
-        if row_bill == bill_title:
-            to_clear.append(r["index"])
-
+    to_clear = xlsx_manager.find_current_rows("BillsT", "Bill Title", bill_title)
     if not to_clear:
         flash(f"No rows found for '{bill_title}'", "error")
         return redirect(url_for("dashboard.dashboard"))
 
-    first_item_idx = min(to_clear)
-    for r in rows:
-        vals = r["values"][0]
-        row_bill = str(vals[2]) if vals[2] else ""
-        item_name = str(vals[3]) if vals[3] else ""
-        if r["index"] == first_item_idx - 1 and row_bill.startswith("Request") and not item_name:
-            to_clear.append(r["index"])
-            break
+    # Also clear the "Request N" separator row directly above the first item (read live)
+    prev_rows = xlsx_manager.read_table_rows("BillsT", min(to_clear) - 1, 1) if min(to_clear) > 0 else None
+    prev_vals = prev_rows[0] if prev_rows else []
+    if len(prev_vals) > 3:
+        row_bill = str(prev_vals[2]) if prev_vals[2] else ""
+        item_name = str(prev_vals[3]) if prev_vals[3] else ""
+        if row_bill.startswith("Request") and not item_name:
+            to_clear.append(min(to_clear) - 1)
 
-    headers_ct = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-    cleared = 0
+    batch = xlsx_manager.GraphWriteBatch(creds)
     for idx in to_clear:
-        sheet_row = idx + 2
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='B{sheet_row}:J{sheet_row}')"
-        resp = requests.patch(url, headers=headers_ct, json={"values": [[""] * 9]}, timeout=10)
-        url2 = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='L{sheet_row}:P{sheet_row}')"
-        resp2 = requests.patch(url2, headers=headers_ct, json={"values": [[""] * 5]}, timeout=10)
-        if resp.status_code == 200 and resp2.status_code == 200:
-            cleared += 1
+        for col in xlsx_manager.BILLS_CLEAR_COLUMNS:
+            batch.set_table_cell("BillsT", idx, col, "", tag=str(idx))
+    batch.flush()
+    cleared = sum(1 for idx in to_clear if batch.ok(str(idx)))
 
     xlsx_manager.invalidate_all_caches()
 
@@ -475,9 +454,8 @@ def review_bill(bill_title):
         return redirect(url_for("bills.bill_view", bill_title=bill_title))
 
     items = xlsx_manager.get_items_by_bill(bill_title)
-    for item in items:
-        name = str(item.get("Item Name", ""))
-        full_path = screenshot_worker.get_screenshot_path(name, bill_title)
+    paths = screenshot_worker.get_screenshot_paths([(str(item.get("Item Name", "")), bill_title) for item in items])
+    for item, full_path in zip(items, paths):
         if full_path:
             item["_screenshot_path"] = os.path.relpath(full_path, screenshot_worker.SCREENSHOT_DIR)
         else:
@@ -4,9 +4,9 @@ dashboard.py - Main dashboard, system status, and force pull routes.
 
 import os
 import json
-import requests
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 import xlsx_manager
+import graph_client
 import screenshot_worker
 from routes.auth import login_required
 from routes.bills import is_bill_locked
@@ -34,23 +34,24 @@ def dashboard():
     backlog = xlsx_manager.get_backlog_items()
 
     # Add screenshot status to bill items
-    for item in items:
-        name = str(item.get("Item Name", ""))
-        bill = str(item.get("Bill Title", ""))
-        item["_has_screenshot"] = screenshot_worker.has_screenshot(name, bill)
-        item["_screenshot_status"] = screenshot_worker.get_status(name)
-        full_path = screenshot_worker.get_screenshot_path(name, bill)
+    paths = screenshot_worker.get_screenshot_paths(
+        [(str(item.get("Item Name", "")), str(item.get("Bill Title", ""))) for item in items]
+    )
+    statuses = screenshot_worker.get_statuses([str(item.get("Item Name", "")) for item in items])
+    for item, full_path, status in zip(items, paths, statuses):
+        item["_has_screenshot"] = full_path is not None
+        item["_screenshot_status"] = status
         if full_path:
             item["_screenshot_path"] = os.path.relpath(full_path, screenshot_worker.SCREENSHOT_DIR)
         else:
             item["_screenshot_path"] = ""
 
     # Add screenshot status to queue items
-    for item in backlog:
-        name = str(item.get("Item Name", ""))
-        item["_has_screenshot"] = screenshot_worker.has_screenshot(name, "_queue")
-        item["_screenshot_status"] = screenshot_worker.get_status(name)
-        full_path = screenshot_worker.get_screenshot_path(name, "_queue")
+    paths = screenshot_worker.get_screenshot_paths([(str(item.get("Item Name", "")), "_queue") for item in backlog])
+    statuses = screenshot_worker.get_statuses([str(item.get("Item Name", "")) for item in backlog])
+    for item, full_path, status in zip(backlog, paths, statuses):
+        item["_has_screenshot"] = full_path is not None
+        item["_screenshot_status"] = status
         if full_path:
             item["_screenshot_path"] = os.path.relpath(full_path, screenshot_worker.SCREENSHOT_DIR)
         else:
@@ -90,7 +91,7 @@ def system_status():
     if creds:
         access_token, drive_id, file_id = creds
         try:
-            resp = requests.get(
+            resp = graph_client.get(
                 f"https://graph.microsoft.com/v1.0/drives/{drive_id}/root",
                 headers={"Authorization": f"Bearer {access_token}"},
                 timeout=5,
@@ -121,4 +122,8 @@ def system_status():
         status["sync"] = "no local file"
         status["sync_age"] = "No sync"
 
+    # Read cache age/hit counters and Graph call latency for this worker process
+    status["caches"] = xlsx_manager.cache_stats()
+    status["graph"] = graph_client.get_stats()
+
     return json.dumps(status)
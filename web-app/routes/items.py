@@ -6,7 +6,6 @@ import sys
 import os
 import json
 import threading
-import requests
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
@@ -14,6 +13,7 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 import price_scraper
+import browser_pool
 import xlsx_manager
 import screenshot_worker
 from routes.auth import login_required
@@ -111,6 +111,8 @@ def add_item():
 
         return redirect(url_for("dashboard.dashboard"))
 
+    # The link field's auto-fill (scrape_link) will want a browser shortly
+    browser_pool.prewarm()
     return render_template("add_item.html", bills=xlsx_manager.get_bills())
 
 
@@ -197,9 +199,6 @@ def edit_queue_item(table_index):
         flash("Graph API unavailable", "error")
         return redirect(url_for("dashboard.dashboard"))
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-
     if request.method == "POST":
         columns = xlsx_manager.graph_get_table_columns("TestTable")
         if not columns:
@@ -212,14 +211,15 @@ def edit_queue_item(table_index):
             value = request.form.get(form_key, "")
             row_values.append(value)
 
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows/itemAt(index={table_index})"
-        resp = requests.patch(url, headers=headers, json={"values": [row_values]}, timeout=10)
+        batch = xlsx_manager.GraphWriteBatch(creds)
+        batch.update_table_row("TestTable", table_index, row_values)
+        batch.flush()
 
-        if resp.status_code == 200:
+        if batch.ok():
             flash("Item updated", "success")
             xlsx_manager.invalidate_queue_cache()
         else:
-            flash(f"Update failed: {resp.status_code}", "error")
+            flash(f"Update failed: {batch.results[-1]['status']}", "error")
 
         return redirect(url_for("dashboard.dashboard"))
 
@@ -246,17 +246,15 @@ def delete_queue_item_route(table_index):
         flash("Graph API unavailable", "error")
         return redirect(url_for("dashboard.dashboard"))
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows/itemAt(index={table_index})"
-    resp = requests.delete(url, headers=headers, timeout=10)
+    batch = xlsx_manager.GraphWriteBatch(creds)
+    batch.delete_table_row("TestTable", table_index)
+    batch.flush()
 
-    if resp.status_code == 204:
+    if batch.ok():
         flash("Item deleted from queue", "success")
         xlsx_manager.invalidate_queue_cache()
     else:
-        flash(f"Delete failed: {resp.status_code}", "error")
+        flash(f"Delete failed: {batch.results[-1]['status']}", "error")
 
     return redirect(url_for("dashboard.dashboard"))
 
@@ -284,42 +282,22 @@ def scrape_link():
     if not url:
         return json.dumps({"error": "No URL"}), 400
 
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.binary_location = "/snap/chromium/current/usr/lib/chromium-browser/chrome"
-
-    try:
-        service = Service("/snap/chromium/current/usr/lib/chromium-browser/chromedriver")
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.set_page_load_timeout(20)
-
+    def scrape(driver):
         try:
             driver.get(url)
         except Exception:
             pass
+        price_scraper.wait_for_page_ready(driver, url)
+        return driver.title or "", price_scraper.scrape_price_from_driver(driver)
 
-        import time
-        time.sleep(3)
-
-        title = driver.title or ""
-        price_text = price_scraper.scrape_price_from_driver(driver)
-        price = price_scraper.parse_price(price_text)
-        vendor = price_scraper.detect_vendor_from_url(url)
-
-        driver.quit()
+    try:
+        # Someone is waiting on the form: runs ahead of queued screenshot jobs
+        title, price_text = screenshot_worker.InteractiveBrowser().run(scrape)
 
         return json.dumps({
             "title": title,
-            "price": price,
-            "vendor": vendor,
+            "price": price_scraper.parse_price(price_text),
+            "vendor": price_scraper.detect_vendor_from_url(url),
         })
 
     except Exception as e:
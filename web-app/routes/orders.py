@@ -5,7 +5,6 @@ orders.py - Order management routes (view orders, mark purchased, apply formatti
 import sys
 import os
 import json
-import requests
 from datetime import datetime
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
 
@@ -15,6 +14,7 @@ if parent_dir not in sys.path:
 
 import price_scraper
 import xlsx_manager
+import graph_client
 import screenshot_worker
 from routes.auth import login_required
 
@@ -116,14 +116,7 @@ def mark_order_purchased():
         return redirect(url_for("orders.view_orders"))
 
     order_columns = xlsx_manager.graph_get_table_columns("OrderT")
-
-    order_id_col = "Order ID"
-    for col in order_columns:
-        if "Order ID" in col:
-            order_id_col = col
-            break
-
-    success = xlsx_manager.graph_update_order_status(order_id_col, order_id, purchasing_method, order_columns)
+    success = xlsx_manager.graph_update_order_status(order_id, purchasing_method, order_columns)
 
     if success:
         flash(f"Marked order '{order_id}' as {purchasing_method}", "success")
@@ -163,7 +156,7 @@ def delete_order():
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
 
     rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/OrderT/rows"
-    resp = requests.get(rows_url, headers=headers, timeout=15)
+    resp = graph_client.get(rows_url, headers=headers, timeout=15)
     if resp.status_code != 200:
         flash("Failed to read orders", "error")
         return redirect(url_for("orders.view_orders"))
@@ -201,21 +194,13 @@ def delete_order():
                 if p_name.startswith("Order") and not p_oid and not p_bid:
                     to_clear_indices.append(first_item_idx - 1)
 
-    col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R']
-    cleared = 0
-
+    batch = xlsx_manager.GraphWriteBatch(creds)
     for idx in sorted(to_clear_indices):
-        sheet_row = idx + 3
-        try:
-            # Clear input cells A, B, D, E, F, G, J without touching formula cells (C, H, I)
-            for col_i in [0, 1, 3, 4, 5, 6, 9]:
-                if col_i < len(col_letters):
-                    col_let = col_letters[col_i]
-                    cell_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{col_let}{sheet_row}')"
-                    requests.patch(cell_url, headers=headers, json={"values": [[""]]}, timeout=10)
-            cleared += 1
-        except Exception as e:
-            print(f"[order] ⚠️ Error clearing row {sheet_row}: {e}")
+        # Clear input cells A, B, D, E, F, G, J without touching formula cells (C, H, I)
+        for col_i in [0, 1, 3, 4, 5, 6, 9]:
+            batch.set_table_cell("OrderT", idx, col_i, "", tag=str(idx))
+    batch.flush()
+    cleared = sum(1 for idx in to_clear_indices if batch.ok(str(idx)))
 
     for b_id in bill_items_to_reset:
         xlsx_manager.update_item(b_id, {"Status": "bill approved"})
@@ -245,30 +230,30 @@ def delete_order_item():
     access_token, drive_id, file_id = creds
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
 
-    sheet_row = int(row_index) + 3
-    col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R']
-
     try:
         # Clear input cells A, B, D, E, F, G, J for this item row
+        batch = xlsx_manager.GraphWriteBatch(creds)
         for col_i in [0, 1, 3, 4, 5, 6, 9]:
-            if col_i < len(col_letters):
-                col_let = col_letters[col_i]
-                cell_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{col_let}{sheet_row}')"
-                requests.patch(cell_url, headers=headers, json={"values": [[""]]}, timeout=10)
+            batch.set_table_cell("OrderT", int(row_index), col_i, "")
+        batch.flush()
 
         if bill_item_id:
             xlsx_manager.update_item(bill_item_id, {"Status": "bill approved"})
 
-        # Check if any remaining items exist for this order_id
-        order_rows = xlsx_manager._fetch_order_rows()
-        remaining_items = [r for r in order_rows if str(r.get("Order ID (YYMMDD_vendor_gburdell3)", "") or r.get("Order ID", "")).strip() == order_id]
+        # Check if any remaining items exist for this order_id (skip the cleanup if OrderT can't be read)
+        try:
+            order_rows = xlsx_manager._fetch_order_rows()
+        except RuntimeError as e:
+            print(f"[order] ⚠️ Could not re-read OrderT: {e}")
+            order_rows = None
+        remaining_items = [r for r in order_rows or [] if str(r.get("Order ID (YYMMDD_vendor_gburdell3)", "") or r.get("Order ID", "")).strip() == order_id]
 
-        if not remaining_items and order_id:
+        if order_rows is not None and not remaining_items and order_id:
             # Order is now empty! Clean up the Order N title header row above if present
             target_idx = int(row_index)
             if target_idx > 0:
                 rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/OrderT/rows"
-                resp = requests.get(rows_url, headers=headers, timeout=15)
+                resp = graph_client.get(rows_url, headers=headers, timeout=15)
                 if resp.status_code == 200:
                     rows_val = resp.json().get("value", [])
                     prev_row = next((r for r in rows_val if r.get("index") == target_idx - 1), None)
@@ -277,9 +262,9 @@ def delete_order_item():
                         p_name = str(p_vals[3]).strip() if len(p_vals) > 3 and p_vals[3] else ""
                         p_oid = str(p_vals[0]).strip() if len(p_vals) > 0 and p_vals[0] else ""
                         if p_name.startswith("Order") and not p_oid:
-                            header_sheet_row = target_idx - 1 + 3
-                            cell_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='D{header_sheet_row}')"
-                            requests.patch(cell_url, headers=headers, json={"values": [[""]]}, timeout=10)
+                            header_batch = xlsx_manager.GraphWriteBatch(creds)
+                            header_batch.set_table_cell("OrderT", target_idx - 1, 3, "")
+                            header_batch.flush()
 
         xlsx_manager.invalidate_orders_cache()
         flash("Item removed from order", "success")
@@ -374,7 +359,7 @@ def submit_order():
     qty_col_idx = order_columns.index("Quantity") if "Quantity" in order_columns else 5
 
     try:
-        resp = requests.get(rows_url, headers=headers, timeout=20)
+        resp = graph_client.get(rows_url, headers=headers, timeout=20)
         if resp.status_code == 200:
             rows_val = resp.json().get("value", [])
             for row in rows_val:
@@ -400,17 +385,18 @@ def submit_order():
                             max_order_num = num
                     except ValueError:
                         pass
-    except requests.exceptions.RequestException as e:
+    except graph_client.RequestException as e:
         print(f"[order] ⚠️ Graph API request failed: {e}")
         flash("Microsoft Graph API request timed out — please try submitting again", "error")
         return redirect(url_for("orders.create_order"))
 
     first_empty = last_data_idx + 1
     date_str = datetime.now().strftime("%y%m%d")
-    total_wrote = 0
     order_ids = []
+    written = []  # batch tag of each queued item row
 
-    col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R']
+    # Nothing is written until every item has passed validation
+    batch = xlsx_manager.GraphWriteBatch(creds)
 
     for vendor, vendor_items in vendor_groups.items():
         safe_vendor = vendor.lower().replace(" ", "").replace("-", "")[:10]
@@ -420,11 +406,8 @@ def submit_order():
 
         if order_id not in existing_order_ids:
             max_order_num += 1
-            sep_row = first_empty + 3
             item_name_col = order_columns.index("Item Name") if "Item Name" in order_columns else 3
-            sep_col_letter = col_letters[item_name_col] if item_name_col < len(col_letters) else "D"
-            sep_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{sep_col_letter}{sep_row}')"
-            requests.patch(sep_url, headers=headers, json={"values": [[f"Order {max_order_num}"]]}, timeout=30)
+            batch.set_table_cell("OrderT", first_empty, item_name_col, f"Order {max_order_num}")
             first_empty += 1
 
         for item in vendor_items:
@@ -459,8 +442,6 @@ def submit_order():
             else:
                 add_qty = min(max_bill_qty, 1.0) if max_bill_qty >= 1 else max_bill_qty
 
-            sheet_row = first_empty + 3
-
             cells_to_patch = [
                 ("Order ID (YYMMDD_vendor_gburdell3)", order_id),
                 ("Order ID", order_id),
@@ -473,27 +454,19 @@ def submit_order():
                 cells_to_patch.append(("Item Name", item.get("Item Name", "")))
                 cells_to_patch.append(("Vendor", item.get("Vendor", "")))
 
-            item_written = False
+            tag = f"row{first_empty}"
             for c_name, val in cells_to_patch:
                 if c_name in order_columns:
-                    c_idx = order_columns.index(c_name)
-                    if c_idx < len(col_letters):
-                        col_letter = col_letters[c_idx]
-                        cell_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{col_letter}{sheet_row}')"
-                        try:
-                            r = requests.patch(cell_url, headers=headers, json={"values": [[val]]}, timeout=10)
-                            if r.status_code == 200:
-                                item_written = True
-                        except Exception as e:
-                            print(f"[order] ⚠️ Error writing cell {col_letter}{sheet_row}: {e}")
-
-            if item_written:
-                total_wrote += 1
-                if item_id:
-                    existing_bill_item_map[item_id] = (first_empty, add_qty)
+                    batch.set_table_cell("OrderT", first_empty, order_columns.index(c_name), val, tag=tag)
+            written.append(tag)
+            if item_id:
+                existing_bill_item_map[item_id] = (first_empty, add_qty)
 
             first_empty += 1
 
+    batch.flush()
+    total_wrote = sum(1 for tag in written if batch.ok(tag))
+
     for item in selected_items:
         item_id = str(item.get("Bill Item ID", ""))
         if item_id:
@@ -525,66 +498,47 @@ def check_prices():
     if not selected:
         return json.dumps({"error": "No matching items"}), 400
 
+    def result_for(item, current_price):
+        allocated = 0
+        try:
+            allocated = float(str(item.get("Cost", 0)).replace("$", "").replace(",", "") or 0)
+        except (ValueError, TypeError):
+            pass
+
+        delta = None
+        if current_price is not None and allocated > 0:
+            delta = round(current_price - allocated, 2)
+
+        return {
+            "name": item.get("Item Name", ""),
+            "bill_item_id": str(item.get("Bill Item ID", "")),
+            "allocated": allocated,
+            "current": current_price,
+            "delta": delta,
+            "warning": delta is not None and delta > 0,
+        }
+
+    by_link = {}
+    for item in selected:
+        by_link.setdefault(str(item.get("Link", "")), []).append(item)
+
     def generate():
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
-        import time
-
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.binary_location = "/snap/chromium/current/usr/lib/chromium-browser/chrome"
-
-        driver = None
         try:
-            service = Service("/snap/chromium/current/usr/lib/chromium-browser/chromedriver")
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            driver.set_page_load_timeout(20)
+            # Plain HTTP first for every link; only pages it can't price go to a browser,
+            # one page per run() so queued screenshot jobs can interleave with a long check
+            browser = screenshot_worker.InteractiveBrowser()
 
-            for item in selected:
-                link = str(item.get("Link", ""))
-                allocated = 0
-                try:
-                    allocated = float(str(item.get("Cost", 0)).replace("$", "").replace(",", "") or 0)
-                except (ValueError, TypeError):
-                    pass
+            def browser_price(link):
+                return browser.run(lambda driver: price_scraper.scrape_price_browser(driver, link))
 
-                current_price = None
-                if link and link.startswith("http"):
-                    try:
-                        driver.get(link)
-                    except Exception:
-                        pass
-                    time.sleep(3)
-                    price_text = price_scraper.scrape_price_from_driver(driver)
-                    current_price = price_scraper.parse_price(price_text)
-
-                delta = None
-                if current_price is not None and allocated > 0:
-                    delta = round(current_price - allocated, 2)
-
-                result = {
-                    "name": item.get("Item Name", ""),
-                    "bill_item_id": str(item.get("Bill Item ID", "")),
-                    "allocated": allocated,
-                    "current": current_price,
-                    "delta": delta,
-                    "warning": delta is not None and delta > 0,
-                }
-                yield f"data: {json.dumps(result)}\n\n"
+            for link, scraped in price_scraper.check_prices(by_link, browser=browser_price):
+                current_price = scraped["current_price"] if scraped else None
+                for item in by_link[link]:
+                    yield f"data: {json.dumps(result_for(item, current_price))}\n\n"
 
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
         finally:
-            if driver:
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
             yield "data: {\"done\": true}\n\n"
 
     return Response(generate(), mimetype="text/event-stream")
@@ -2,9 +2,12 @@
 screenshots.py - Screenshot serving and queuing routes.
 """
 
-from flask import Blueprint, send_from_directory, redirect, url_for, flash, request
+import os
+from flask import Blueprint, current_app, send_from_directory, send_file, redirect, url_for, flash, request, abort
+from werkzeug.security import safe_join
 import xlsx_manager
 import screenshot_worker
+import thumbnails
 from routes.auth import login_required
 
 screenshots_bp = Blueprint("screenshots", __name__)
@@ -14,7 +17,70 @@ screenshots_bp = Blueprint("screenshots", __name__)
 @login_required
 def serve_screenshot(filename):
     """Serve screenshot files. Path can be bill_title/item_name.png"""
-    return send_from_directory(screenshot_worker.SCREENSHOT_DIR, filename)
+    response = send_from_directory(screenshot_worker.SCREENSHOT_DIR, filename)
+    screenshot_worker.touch_screenshot(os.path.join(screenshot_worker.SCREENSHOT_DIR, filename))
+    return response
+
+
+# Thumbnail URLs carry the screenshot's mtime (?v=), so a matching response never changes
+THUMB_MAX_AGE = 365 * 24 * 3600
+
+
+@screenshots_bp.app_template_global()
+def thumbnail_url(filename: str, width: int = 160) -> str:
+    """URL of a preview of a screenshot, versioned by its mtime so browsers can cache it for good."""
+    try:
+        version = os.stat(os.path.join(screenshot_worker.SCREENSHOT_DIR, filename)).st_mtime_ns
+    except OSError:
+        version = None
+    return url_for("screenshots.serve_thumbnail", filename=filename, w=width, v=version)
+
+
+@screenshots_bp.route("/thumbnails/<path:filename>")
+@login_required
+def serve_thumbnail(filename):
+    """
+    Serve a downscaled copy of a screenshot (?w= width), WebP if the browser takes it,
+    JPEG otherwise. Generated on first request and cached on disk; the original is
+    served if it can't be thumbnailed.
+    """
+    source = safe_join(screenshot_worker.SCREENSHOT_DIR, filename)
+    if source is None:
+        abort(404)
+    try:
+        st = os.stat(source)
+    except OSError:
+        abort(404)
+
+    width = thumbnails.pick_width(request.args.get("w", type=int))
+    if not thumbnails.available():
+        fmt = None
+    elif "image/webp" in request.headers.get("Accept", "") and thumbnails.webp_supported():
+        fmt = "webp"
+    else:
+        fmt = "jpeg"
+    etag = f"{st.st_mtime_ns:x}-{st.st_size:x}-{width}-{fmt or 'full'}"
+    screenshot_worker.touch_screenshot(source)
+
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+    else:
+        path = thumbnails.thumbnail(source, filename, width, fmt, st.st_mtime_ns) if fmt else None
+        if path:
+            response = send_file(path, mimetype=thumbnails.MIMETYPES[fmt], etag=etag, conditional=True)
+        else:
+            response = send_file(source, etag=etag, conditional=True)
+
+    response.cache_control.private = True
+    if request.args.get("v") == str(st.st_mtime_ns):
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = THUMB_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True  # unversioned URL: revalidate (a cheap 304) each time
+    response.vary.add("Accept")
+    return response
 
 
 @screenshots_bp.route("/screenshot/queue/<item_id>", methods=["POST"])
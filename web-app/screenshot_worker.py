@@ -2,26 +2,33 @@ from __future__ import annotations
 """
 screenshot_worker.py - Background thread that takes headless Chrome screenshots of item URLs.
 
-Queue-based: add URLs, worker processes them sequentially using a reusable Chromium session.
+Queue-based: add URLs, a pool of SCREENSHOT_WORKERS threads captures them, each
+with its own reusable Chromium session. Jobs are kept in the shared SQLite store
+(state, attempts, timestamps), so queued and interrupted jobs are resumed when the
+worker restarts and job states can be read in bulk by every web worker.
+
+Interactive browser tasks (InteractiveBrowser: add-item link scraping, order price
+checks) run on the same pool ahead of queued jobs; single-item jobs run ahead of
+whole-bill runs. A thread's browser is replaced after a crash,
+after SCREENSHOT_PAGES_PER_BROWSER pages, or once it grows past SCREENSHOT_BROWSER_MAX_MB.
+
+Price parsing, the Graph autofill and the SharePoint upload + cleanup run as later
+pipeline stages with their own threads and bounded queues, so a browser moves on to
+the next URL as soon as its screenshot is saved.
 Screenshots saved as: screenshots/<bill_title>/<item_name>.png
 After capture, pushes to SharePoint via Graph API.
 """
 
 import os
 import sys
-import time
 import re
+import socket
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import time
 import threading
+from collections import deque
 from queue import Queue, Empty
 from pathlib import Path
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-except ImportError:
-    webdriver = None
-    Options = None
-    Service = None
 
 # Add parent directory for price_scraper import
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -29,9 +36,12 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 import price_scraper
+import browser_pool
+import graph_client
+import shared_cache
+import thumbnails
 
 SCREENSHOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "screenshots"))
-DELAY = 5  # seconds to wait after page load
 
 # rclone remote for screenshots on SharePoint
 RCLONE_SCREENSHOTS_REMOTE = os.environ.get(
@@ -41,19 +51,50 @@ RCLONE_SCREENSHOTS_REMOTE = os.environ.get(
 
 # Max total screenshot storage in MB (cleanup oldest when exceeded)
 MAX_STORAGE_MB = int(os.environ.get("MAX_SCREENSHOT_STORAGE_MB", "500"))
-
-# Job queue: each item is a dict with 'item_name', 'url', and 'bill_title'
-_queue: Queue = Queue()
-_worker_thread: threading.Thread | None = None
+# How often get_screenshot_path re-checks folder mtimes for files written by other processes
+INDEX_POLL_SECONDS = 2.0
+
+# Worker pool size and per-browser recycling limits
+WORKERS = max(1, int(os.environ.get("SCREENSHOT_WORKERS", "2")))
+PAGES_PER_BROWSER = int(os.environ.get("SCREENSHOT_PAGES_PER_BROWSER", "50"))
+BROWSER_MAX_MB = int(os.environ.get("SCREENSHOT_BROWSER_MAX_MB", "300"))
+# Captured pages waiting for each later stage (extract, autofill, upload) before capture blocks
+STAGE_QUEUE_SIZE = 20
+
+# Durable job queue in the shared store; each payload has 'item_name', 'url', 'bill_title', 'overwrite'
+_JOB_NS = "screenshot"
+# Captures are retried (with a fresh browser) this many times in all before a job is marked error
+JOB_MAX_ATTEMPTS = 3
+# Idle workers check the store this often for jobs queued by other processes
+JOB_POLL_SECONDS = 2.0
+# A job processing for longer than this is assumed abandoned and requeued on start
+JOB_LEASE_SECONDS = 15 * 60
+# Finished jobs are kept this long for status display
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# Priority lanes: interactive tasks first, then single-item jobs, then whole-bill runs
+PRIORITY_BULK = 0
+PRIORITY_ITEM = 10
+# After this many interactive tasks in a row a worker takes one queued job, so bulk work keeps moving
+INTERACTIVE_BURST = 3
+# An interactive task waits this long for a pool browser before starting its own
+INTERACTIVE_WAIT_SECONDS = 3.0
+INTERACTIVE_TIMEOUT = 120
+_wakeup = threading.Event()
+_worker_threads: list[threading.Thread] = []
 _running = False
 
-# Track status of jobs
-_status: dict[str, str] = {}  # item_name -> "queued" | "processing" | "done" | "error"
-_status_lock = threading.Lock()
-
-# Persistent browser driver
-_driver_instance = None
+# Persistent browser drivers: one per worker thread (.driver, .pages), all tracked in _drivers
+_browser = threading.local()
+_drivers: set = set()
 _driver_lock = threading.Lock()
+_cleanup_lock = threading.Lock()
+# Size / last-access index of SCREENSHOT_DIR in the shared store (see reconcile_screenshot_index)
+_INDEX_NS = "screenshots"
+_index_reconciled = False
+# Jobs for the same item are processed one at a time even with several workers. Items share a
+# fixed set of locks by hash, so the set doesn't grow with every item ever seen.
+_ITEM_LOCK_STRIPES = 64
+_item_locks = [threading.Lock() for _ in range(_ITEM_LOCK_STRIPES)]
 
 
 def _safe_filename(name: str) -> str:
@@ -72,87 +113,105 @@ _scrape_price = price_scraper.scrape_price_from_driver
 
 
 def _create_chrome_driver():
-    """Create a new headless Chrome webdriver instance."""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.binary_location = "/snap/chromium/current/usr/lib/chromium-browser/chrome"
-
-    service = Service("/snap/chromium/current/usr/lib/chromium-browser/chromedriver")
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.set_page_load_timeout(20)
-    return driver
+    """Create a new headless Chrome webdriver instance for a pool worker (recycled by _get_reusable_driver)."""
+    return browser_pool.create_driver()
+
+
+def _browser_rss_mb(driver) -> float | None:
+    """Resident memory of a driver's chromedriver + Chrome process tree in MB, from /proc (None where unavailable)."""
+    try:
+        pids = [driver.service.process.pid]
+    except AttributeError:
+        return None
+    total_kb = 0
+    seen = set()
+    while pids:
+        pid = pids.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            with open(f"/proc/{pid}/task/{pid}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024 if total_kb else None
 
 
 def _get_reusable_driver():
-    """Get existing driver or initialize a new one if missing/dead."""
-    global _driver_instance
+    """Get this thread's driver, launching a new one if missing, dead or due for recycling."""
+    driver = getattr(_browser, "driver", None)
+    if driver is not None:
+        pages = getattr(_browser, "pages", 0)
+        rss = _browser_rss_mb(driver) if BROWSER_MAX_MB > 0 else None
+        if PAGES_PER_BROWSER > 0 and pages >= PAGES_PER_BROWSER:
+            print(f"[screenshot worker] Recycling browser after {pages} pages")
+            _close_driver()
+        elif rss is not None and rss > BROWSER_MAX_MB:
+            print(f"[screenshot worker] Recycling browser using {rss:.0f} MB")
+            _close_driver()
+        else:
+            return driver
+
+    try:
+        driver = _create_chrome_driver()
+    except Exception as e:
+        print(f"[screenshot worker] Failed to launch Chrome driver: {e}")
+        return None
+    _browser.driver, _browser.pages = driver, 0
     with _driver_lock:
-        if _driver_instance is None:
-            try:
-                _driver_instance = _create_chrome_driver()
-            except Exception as e:
-                print(f"[screenshot worker] Failed to launch Chrome driver: {e}")
-                _driver_instance = None
-        return _driver_instance
+        _drivers.add(driver)
+    return driver
+
+
+def _quit(driver):
+    with _driver_lock:
+        _drivers.discard(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
 
 
 def _close_driver():
-    """Shutdown driver instance safely."""
-    global _driver_instance
+    """Shutdown this thread's driver safely."""
+    driver = getattr(_browser, "driver", None)
+    _browser.driver = None
+    if driver is not None:
+        _quit(driver)
+
+
+def _close_all_drivers():
+    """Shutdown every worker's driver (used when stopping the pool)."""
     with _driver_lock:
-        if _driver_instance is not None:
-            try:
-                _driver_instance.quit()
-            except Exception:
-                pass
-            _driver_instance = None
+        drivers = list(_drivers)
+    for driver in drivers:
+        _quit(driver)
 
 
 def _autofill_queue_item(item_name: str, price: float | None, vendor: str):
     """Update a queue item's price and vendor via Graph API after scraping."""
-    import configparser
-    import json as _json
-    import requests as _requests
-
-    rclone_conf = os.path.expanduser("~/.config/rclone/rclone.conf")
-    if not os.path.exists(rclone_conf):
-        return
-
-    config = configparser.ConfigParser()
-    config.read(rclone_conf)
-    if "onedrive" not in config:
-        return
+    import xlsx_manager
 
-    try:
-        token = _json.loads(config["onedrive"]["token"])
-        drive_id = config["onedrive"]["drive_id"]
-        access_token = token["access_token"]
-    except (KeyError, _json.JSONDecodeError):
+    creds = xlsx_manager._get_graph_token()
+    if not creds:
         return
-
-    file_id = os.environ.get("_GRAPH_FILE_ID", "")
-    if not file_id:
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/root:/OPS-1 Operations/FY27 Finances/FY27_Bills_Budget.xlsx"
-        resp = _requests.get(url, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
-        if resp.status_code == 200:
-            file_id = resp.json()["id"]
-            os.environ["_GRAPH_FILE_ID"] = file_id
-        else:
-            return
+    access_token, drive_id, file_id = creds
 
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
 
     rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows"
-    resp = _requests.get(rows_url, headers=headers, timeout=10)
+    resp = graph_client.get(rows_url, headers=headers, timeout=10)
     if resp.status_code != 200:
         return
 
     cols_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/columns"
-    cols_resp = _requests.get(cols_url, headers=headers, timeout=10)
+    cols_resp = graph_client.get(cols_url, headers=headers, timeout=10)
     if cols_resp.status_code != 200:
         return
 
@@ -179,36 +238,22 @@ def _autofill_queue_item(item_name: str, price: float | None, vendor: str):
                 changed = True
 
             if changed:
-                patch_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows/itemAt(index={row['index']})"
-                patch_resp = _requests.patch(patch_url, headers=headers, json={"values": [updated]}, timeout=10)
-                if patch_resp.status_code == 200:
+                batch = xlsx_manager.GraphWriteBatch(creds)
+                batch.update_table_row("TestTable", row["index"], updated)
+                batch.flush()
+                if batch.ok():
                     print(f"[autofill] ✅ Updated {item_name}: price=${price}, vendor={vendor}")
                 else:
-                    print(f"[autofill] ⚠️ Update failed: {patch_resp.status_code}")
+                    print(f"[autofill] ⚠️ Update failed: {batch.results[-1]['status']}")
             break
 
 
 def _upload_screenshot_to_sharepoint(bill_title: str, filepath: str):
     """Upload a screenshot to SharePoint via Graph API."""
-    import configparser
-    import json as _json
-    import requests as _requests
-
-    rclone_conf = os.path.expanduser("~/.config/rclone/rclone.conf")
-    if not os.path.exists(rclone_conf):
-        return
-
-    config = configparser.ConfigParser()
-    config.read(rclone_conf)
-    if "onedrive" not in config:
-        return
-
-    try:
-        token = _json.loads(config["onedrive"]["token"])
-        drive_id = config["onedrive"]["drive_id"]
-        access_token = token["access_token"]
-    except (KeyError, _json.JSONDecodeError):
+    token = graph_client.get_token()
+    if not token:
         return
+    access_token, drive_id = token
 
     safe_bill = _safe_dirname(bill_title) if bill_title else "_backlog"
     filename = os.path.basename(filepath)
@@ -218,7 +263,7 @@ def _upload_screenshot_to_sharepoint(bill_title: str, filepath: str):
 
     try:
         with open(filepath, "rb") as f:
-            resp = _requests.put(
+            resp = graph_client.put(
                 url,
                 headers={
                     "Authorization": f"Bearer {access_token}",
@@ -235,58 +280,128 @@ def _upload_screenshot_to_sharepoint(bill_title: str, filepath: str):
         print(f"[screenshot] ⚠️ SharePoint upload exception: {e}")
 
 
-def _cleanup_old_screenshots():
-    """Delete oldest screenshots if total storage exceeds MAX_STORAGE_MB."""
-    total_bytes = 0
-    all_files = []
+def _index_key(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), SCREENSHOT_DIR)
 
-    for root, dirs, files in os.walk(SCREENSHOT_DIR):
-        for f in files:
-            fp = os.path.join(root, f)
-            try:
-                stat = os.stat(fp)
-                total_bytes += stat.st_size
-                all_files.append((fp, stat.st_mtime))
-            except OSError:
-                pass
 
-    total_mb = total_bytes / (1024 * 1024)
-    if total_mb <= MAX_STORAGE_MB:
+def record_screenshot(path: str):
+    """Add a newly written screenshot (capture, copy to another bill) to the storage index."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
         return
+    shared_cache.get_store().record_file(_INDEX_NS, _index_key(path), size)
+    _index.add(path)
+
+
+def touch_screenshot(path: str):
+    """Note that a screenshot was just served, so cleanup evicts it last."""
+    shared_cache.get_store().touch_file(_INDEX_NS, _index_key(path))
+
+
+def reconcile_screenshot_index():
+    """
+    Walk SCREENSHOT_DIR once and make the storage index match it: picks up files
+    written outside the web app (mrg CLI, rclone) and drops ones deleted by hand.
+    Files already indexed keep their last access; new ones start at their mtime.
+    """
+    global _index_reconciled
+    store = shared_cache.get_store()
+    known = store.file_index(_INDEX_NS)
+    files = {}
+    for root, dirs, names in os.walk(SCREENSHOT_DIR):
+        for name in names:
+            fp = os.path.join(root, name)
+            try:
+                st = os.stat(fp)
+            except OSError:
+                continue
+            key = _index_key(fp)
+            files[key] = (st.st_size, known[key][1] if key in known else st.st_mtime)
+    store.replace_files(_INDEX_NS, files)
+    _index_reconciled = True
 
-    all_files.sort(key=lambda x: x[1])
 
-    while total_mb > MAX_STORAGE_MB * 0.8 and all_files:
-        fp, _ = all_files.pop(0)
-        try:
-            size = os.path.getsize(fp)
-            os.remove(fp)
-            total_mb -= size / (1024 * 1024)
-            print(f"[cleanup] Deleted old screenshot: {fp}")
-        except OSError:
-            pass
+def _cleanup_old_screenshots():
+    """Delete least recently used screenshots if total storage exceeds MAX_STORAGE_MB."""
+    # One sweep at a time; another worker finishing meanwhile doesn't need its own
+    if not _cleanup_lock.acquire(blocking=False):
+        return
+    try:
+        _cleanup_screenshot_dir()
+    finally:
+        _cleanup_lock.release()
+
+
+def _cleanup_screenshot_dir():
+    if not _index_reconciled:
+        reconcile_screenshot_index()
+    store = shared_cache.get_store()
+    limit = MAX_STORAGE_MB * 1024 * 1024
+    total = store.total_size(_INDEX_NS)
+    if total <= limit:
+        return
 
-    for root, dirs, files in os.walk(SCREENSHOT_DIR, topdown=False):
-        if root != SCREENSHOT_DIR and not os.listdir(root):
+    while total > limit * 0.8:
+        batch = store.oldest_files(_INDEX_NS, 20)
+        if not batch:
+            break
+        for key, size in batch:
+            fp = os.path.join(SCREENSHOT_DIR, key)
             try:
-                os.rmdir(root)
+                os.remove(fp)
+                print(f"[cleanup] Deleted old screenshot: {fp}")
             except OSError:
-                pass
+                pass  # already gone (or undeletable): drop it from the index either way
+            store.forget_file(_INDEX_NS, key)
+            _index.remove(fp)
+            thumbnails.discard(key)
+            total -= size
+            parent = os.path.dirname(fp)
+            if parent != SCREENSHOT_DIR:
+                try:
+                    os.rmdir(parent)  # only succeeds once the bill folder is empty
+                except OSError:
+                    pass
+            if total <= limit * 0.8:
+                break
+
+
+def _item_lock(item_name: str) -> threading.Lock:
+    return _item_locks[hash(item_name) % _ITEM_LOCK_STRIPES]
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _finish_job(job: dict, state: str, error: str | None = None):
+    shared_cache.get_store().update_job(job["id"], state, error)
+
+
+def _fail_job(job: dict, error: str):
+    """Queue the job again unless it has used up its attempts."""
+    if job.get("attempts", JOB_MAX_ATTEMPTS) < JOB_MAX_ATTEMPTS:
+        _finish_job(job, "queued", error)
+        _wakeup.set()
+    else:
+        _finish_job(job, "error", error)
 
 
 def _process_job(job: dict):
-    """Take a screenshot and scrape price for one item using reusable browser session."""
+    """Capture stage: take a screenshot and scrape the price text using this worker's browser session."""
+    with _item_lock(job["item_name"]):
+        return _capture(job)
+
+
+def _capture(job: dict):
     item_name = job["item_name"]
     url = job["url"]
     bill_title = job.get("bill_title", "")
 
-    with _status_lock:
-        _status[item_name] = "processing"
-
     driver = _get_reusable_driver()
     if not driver:
-        with _status_lock:
-            _status[item_name] = "error"
+        _finish_job(job, "error", "no browser available")
         return None
 
     safe_bill = _safe_dirname(bill_title) if bill_title else "_backlog"
@@ -297,8 +412,7 @@ def _process_job(job: dict):
 
     if not job.get("overwrite") and os.path.exists(filepath):
         print(f"[screenshot] ℹ️ Preserving ground-truth screenshot: {filepath}")
-        with _status_lock:
-            _status[item_name] = "done"
+        _finish_job(job, "done")
         return {"item_name": item_name, "screenshot": filepath}
 
     try:
@@ -307,135 +421,496 @@ def _process_job(job: dict):
         except Exception as load_err:
             print(f"[screenshot worker] Page load warning for {item_name}: {load_err}")
 
-        time.sleep(DELAY)
+        _browser.pages = getattr(_browser, "pages", 0) + 1
+        price_scraper.wait_for_page_ready(driver, url)
         price_scraper.dismiss_popups_and_interstitials(driver)
         driver.save_screenshot(filepath)
-
+        record_screenshot(filepath)
         price_text = price_scraper.scrape_price_from_driver(driver)
-        price = price_scraper.parse_price(price_text)
-        vendor = price_scraper.detect_vendor_from_url(url)
+    except Exception as e:
+        print(f"[screenshot] ❌ {item_name} failed: {e}")
+        # Close driver so next job recreates a fresh session if browser crashed
+        _close_driver()
+        _fail_job(job, str(e))
+        return None
+
+    # The browser is free for the next URL; the rest happens in the later stages
+    _stages["extract"].put({"id": job["id"], "item_name": item_name, "url": url, "bill_title": bill_title,
+                            "screenshot": filepath, "price_text": price_text})
+    return {"item_name": item_name, "screenshot": filepath}
+
+
+def _extract(result: dict):
+    """Extract stage: parse the scraped price, mark the job done, and hand off to autofill and upload."""
+    item_name = result["item_name"]
+    price = price_scraper.parse_price(result["price_text"])
+    vendor = price_scraper.detect_vendor_from_url(result["url"])
+
+    _finish_job(result, "done")
+
+    if price:
+        print(f"[screenshot] ✅ {item_name} - price: ${price:.2f}")
+    else:
+        print(f"[screenshot] ✅ {item_name} - no price found")
+
+    if price or vendor:
+        _stages["autofill"].put((item_name, price, vendor))
+    _stages["upload"].put((result["bill_title"], result["screenshot"]))
+
+
+def _autofill(args: tuple):
+    _autofill_queue_item(*args)
+
+
+def _upload(args: tuple):
+    _upload_screenshot_to_sharepoint(*args)
+    _cleanup_old_screenshots()
 
-        with _status_lock:
-            _status[item_name] = "done"
 
-        if price:
-            print(f"[screenshot] ✅ {item_name} - price: ${price:.2f}")
+class _Stage:
+    """One pipeline stage: a bounded queue drained by its own pool of threads."""
+
+    def __init__(self, name: str, handler, workers: int, maxsize: int = STAGE_QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: Queue = Queue(maxsize)
+        self.threads: list[threading.Thread] = []
+
+    def put(self, item):
+        """Hand item to the stage, blocking while its queue is full so a slow stage holds back capture."""
+        self.queue.put(item)
+
+    def start(self):
+        self.threads = [t for t in self.threads if t.is_alive()]
+        for i in range(len(self.threads), self.workers):
+            thread = threading.Thread(target=self._loop, name=f"screenshot-{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _loop(self):
+        while _running:
+            try:
+                item = self.queue.get(timeout=2)
+            except Empty:
+                continue
+            try:
+                self.handler(item)
+            except Exception as e:
+                print(f"[screenshot worker] {self.name} stage error: {e}")
+            finally:
+                self.queue.task_done()
+
+
+_stages = {
+    "extract": _Stage("extract", _extract, workers=1),
+    "autofill": _Stage("autofill", _autofill, workers=2),
+    "upload": _Stage("upload", _upload, workers=2),
+}
+
+
+class _Task:
+    """An interactive fn(driver) call, run by whichever side claims it first (a pool worker or the caller)."""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.result = None
+        self.error: Exception | None = None
+        self._claimed = False
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+            return True
+
+    def run(self, driver):
+        try:
+            self.result = self.fn(driver)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+_interactive: deque[_Task] = deque()
+_interactive_lock = threading.Lock()
+
+
+def _pop_interactive() -> _Task | None:
+    with _interactive_lock:
+        while _interactive:
+            task = _interactive.popleft()
+            if task.claim():
+                return task
+    return None
+
+
+def _withdraw(task: _Task):
+    """Take a task off the interactive queue; claiming it keeps a worker from starting it later."""
+    with _interactive_lock:
+        try:
+            _interactive.remove(task)
+        except ValueError:
+            pass
+    task.claim()
+
+
+def _run_task(task: _Task):
+    """Run an interactive task on this worker's browser."""
+    driver = _get_reusable_driver()
+    if not driver:
+        task.error = RuntimeError("no browser available")
+        task.done.set()
+        return
+    _browser.pages = getattr(_browser, "pages", 0) + 1
+    task.run(driver)
+    if task.error is not None:
+        _close_driver()  # the page may have taken the browser down with it
+
+
+def _pool_running() -> bool:
+    return _running and any(t.is_alive() for t in _worker_threads)
+
+
+class InteractiveBrowser:
+    """
+    Browser access for a request someone is waiting on:
+
+        browser = screenshot_worker.InteractiveBrowser()
+        title = browser.run(lambda driver: load_and_read_title(driver, url))
+
+    When this process runs the worker pool, each run() goes ahead of queued jobs on a
+    warm pool browser. If no worker frees up within INTERACTIVE_WAIT_SECONDS, or there
+    is no pool, that run() leases a browser from browser_pool and hands it back when
+    it returns, so a long session doesn't hold the process's only browser between
+    pages. Nothing is held between runs, so there is nothing to close.
+    """
+
+    def run(self, fn):
+        """Return fn(driver), re-raising anything it raised."""
+        task = _Task(fn)
+        if _pool_running():
+            with _interactive_lock:
+                _interactive.append(task)
+            _wakeup.set()
+            try:
+                if not task.done.wait(INTERACTIVE_WAIT_SECONDS) and task.claim():
+                    self._run_own(task)  # every worker is mid-capture
+                elif not task.done.wait(INTERACTIVE_TIMEOUT):
+                    raise TimeoutError("browser task timed out")
+            finally:
+                # Timed out or interrupted: don't leave it queued for a worker to run unasked
+                _withdraw(task)
         else:
-            print(f"[screenshot] ✅ {item_name} - no price found")
+            task.claim()
+            self._run_own(task)
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    @staticmethod
+    def _run_own(task: _Task):
+        pool = browser_pool.get_pool()
+        driver = pool.acquire()
+        try:
+            task.run(driver)
+        finally:
+            pool.release(driver, healthy=task.error is None)
 
-        if price or vendor:
-            _autofill_queue_item(item_name, price, vendor)
 
-        _upload_screenshot_to_sharepoint(bill_title, filepath)
-        _cleanup_old_screenshots()
+def wait_for_jobs(poll: float = 0.05):
+    """Block until no job is queued or being captured (later stages may still be busy)."""
+    while shared_cache.get_store().pending_jobs(_JOB_NS):
+        time.sleep(poll)
 
-        return {"item_name": item_name, "price": price, "screenshot": filepath}
 
-    except Exception as e:
-        print(f"[screenshot] ❌ {item_name} failed: {e}")
-        # Close driver so next job recreates a fresh session if browser crashed
-        _close_driver()
-        with _status_lock:
-            _status[item_name] = "error"
-        return None
+def drain():
+    """Block until every queued job has gone through capture and all later stages."""
+    wait_for_jobs()
+    for stage in _stages.values():
+        stage.queue.join()
 
 
 def _worker_loop():
-    """Main worker loop - processes jobs from queue."""
-    global _running
+    """Main worker loop - each pool thread claims jobs from the shared job store."""
+    owner = _owner()
+    streak = 0  # interactive tasks run since this worker last took a queued job
     while _running:
         try:
-            job = _queue.get(timeout=2)
-            _process_job(job)
-            _queue.task_done()
-        except Empty:
-            continue
+            task = _pop_interactive() if streak < INTERACTIVE_BURST else None
+            claimed = None if task else shared_cache.get_store().claim_job(_JOB_NS, owner)
+            if task is None and claimed is None:
+                streak = 0
+                task = _pop_interactive()
+            if task:
+                streak += 1
+                _run_task(task)
+            elif claimed:
+                streak = 0
+                _process_job({**claimed["payload"], "id": claimed["id"], "attempts": claimed["attempts"]})
+            else:
+                _wakeup.wait(JOB_POLL_SECONDS)
+                _wakeup.clear()
         except Exception as e:
             print(f"[screenshot worker] Loop Error: {e}")
     _close_driver()
 
 
-def start_worker():
-    """Start the background screenshot worker thread."""
-    global _worker_thread, _running
-    if _worker_thread and _worker_thread.is_alive():
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def resume_jobs() -> int:
+    """
+    Requeue jobs left processing by a worker that is gone (a restart or crash on this
+    host, or any job past JOB_LEASE_SECONDS) and drop old finished jobs. Returns the
+    number of jobs requeued.
+    """
+    store = shared_cache.get_store()
+    now = time.time()
+    store.prune_jobs(_JOB_NS, now - JOB_RETENTION_SECONDS)
+    host = socket.gethostname()
+    requeued = 0
+    for job_id, owner, updated in store.running_jobs(_JOB_NS):
+        owner_host, _, pid = (owner or "").rpartition(":")
+        # Our own pid can only appear here from an earlier run that reused it
+        gone = owner_host == host and pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid)))
+        if gone or now - updated > JOB_LEASE_SECONDS:
+            store.update_job(job_id, "queued", "interrupted")
+            requeued += 1
+    if requeued:
+        print(f"[screenshot worker] Resuming {requeued} interrupted job(s)")
+    return requeued
+
+
+def start_worker(workers: int | None = None):
+    """Start the background screenshot worker pool (SCREENSHOT_WORKERS threads by default)."""
+    global _worker_threads, _running
+    _worker_threads = [t for t in _worker_threads if t.is_alive()]
+    if _worker_threads:
         return
 
     _running = True
-    _worker_thread = threading.Thread(target=_worker_loop, daemon=True)
-    _worker_thread.start()
-    print("[screenshot worker] Started (reusable Chromium session)")
+    resume_jobs()
+    reconcile_screenshot_index()
+    for stage in _stages.values():
+        stage.start()
+    for i in range(workers or WORKERS):
+        thread = threading.Thread(target=_worker_loop, name=f"screenshot-worker-{i}", daemon=True)
+        thread.start()
+        _worker_threads.append(thread)
+    print(f"[screenshot worker] Started {len(_worker_threads)} worker(s) (one reusable Chromium session each)")
 
 
 def stop_worker():
-    """Stop the worker thread."""
+    """Stop the worker threads."""
     global _running
     _running = False
-    _close_driver()
+    _wakeup.set()
+    _close_all_drivers()
+
+
+def _normalize_url(url: str) -> str:
+    """URL with case-insensitive parts lowered and fragment, tracking params and trailing slash dropped."""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith("utm_")])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
 
+def job_key(item_name: str, url: str, bill_title: str = "") -> str:
+    """Dedup key of a screenshot job: the file it writes (bill folder + item file name) and the page."""
+    safe_bill = _safe_dirname(bill_title) if bill_title else "_backlog"
+    return "|".join((safe_bill.lower(), _safe_filename(item_name).lower(), _normalize_url(url)))
+
+
+def queue_screenshot(item_name: str, url: str, bill_title: str = "", overwrite: bool = False,
+                     priority: int = PRIORITY_ITEM) -> int | None:
+    """
+    Add a screenshot job to the durable queue and return its id. Skips (returns None)
+    if the screenshot already exists unless overwrite=True.
 
-def queue_screenshot(item_name: str, url: str, bill_title: str = "", overwrite: bool = False):
-    """Add a screenshot job to the queue. Skips if screenshot already exists unless overwrite=True."""
+    A request for the same item, bill and URL as a job still queued is merged into it
+    (overwrite if either asked for it, the higher priority) and that job's id returned;
+    likewise for a job already being captured that covers the request.
+    """
     if not url or not item_name:
-        return
+        return None
 
     # Protect existing ground-truth screenshots
     if not overwrite and has_screenshot(item_name, bill_title):
         print(f"[screenshot] ℹ️ Screenshot exists for '{item_name}' — preserving ground truth")
-        return
+        return None
+
+    job_id = shared_cache.get_store().add_job(
+        _JOB_NS, item_name, {"item_name": item_name, "url": url, "bill_title": bill_title, "overwrite": overwrite},
+        priority=priority, dedup=job_key(item_name, url, bill_title),
+    )
+    _wakeup.set()
+    return job_id
+
+
+def get_job(job_id: int) -> dict | None:
+    """State, attempts and payload of a job returned by queue_screenshot."""
+    return shared_cache.get_store().get_job(job_id)
 
-    with _status_lock:
-        _status[item_name] = "queued"
 
-    _queue.put({"item_name": item_name, "url": url, "bill_title": bill_title, "overwrite": overwrite})
+def get_statuses(item_names: list[str]) -> list[str]:
+    """Screenshot job status of each item: "queued" | "processing" | "done" | "error" | "none"."""
+    states = shared_cache.get_store().job_states(_JOB_NS)
+    return [states.get(name, ("none",))[0] for name in item_names]
 
 
 def get_status(item_name: str) -> str:
     """Get the screenshot status for an item."""
-    with _status_lock:
-        return _status.get(item_name, "none")
+    return get_statuses([item_name])[0]
 
 
-def get_screenshot_path(item_name: str, bill_title: str = "") -> str | None:
-    """Get the screenshot file path if it exists with flexible matching."""
-    if not item_name:
-        return None
+def _norm_filename(name: str) -> str:
+    return re.sub(r'\s+', ' ', name).lower()
 
-    dirs_to_check = []
-    if bill_title:
-        dirs_to_check.append(os.path.join(SCREENSHOT_DIR, _safe_dirname(bill_title)))
-        dirs_to_check.append(os.path.join(SCREENSHOT_DIR, bill_title))
 
-    # Add all subdirectories in SCREENSHOT_DIR
-    if os.path.isdir(SCREENSHOT_DIR):
-        for sub in os.listdir(SCREENSHOT_DIR):
-            sp = os.path.join(SCREENSHOT_DIR, sub)
-            if os.path.isdir(sp) and sp not in dirs_to_check:
-                dirs_to_check.append(sp)
+class _ScreenshotIndex:
+    """
+    In-memory map of SCREENSHOT_DIR and its bill folders, by normalized file name.
 
-    dirs_to_check.extend([
-        SCREENSHOT_DIR,
-        os.path.join(SCREENSHOT_DIR, "_queue"),
-        os.path.join(SCREENSHOT_DIR, "_backlog")
-    ])
+    Built on first lookup. The worker and the copy routes update it as they write
+    (record_screenshot) and cleanup as it deletes; folder mtimes are polled at most
+    every INDEX_POLL_SECONDS so files written by other gunicorn workers, the CLI or
+    rclone show up too. Only folders whose mtime changed are listed again.
+    """
 
-    safe_name = _safe_filename(item_name)
-    target_norm = re.sub(r'\s+', ' ', f"{safe_name}.png").lower()
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._root: str | None = None
+        self._dirs: dict[str, tuple[int, set[str]]] = {}  # folder ("" = root) -> (mtime_ns, file names)
+        self._where: dict[str, dict[str, list[str]]] = {}  # normalized name -> {folder: [file names]}
+        self._rank: dict[str, int] = {}  # bill folder -> position in the root listing
+        self._checked = 0.0
 
-    for d in dirs_to_check:
-        if not os.path.isdir(d):
-            continue
-        exact = os.path.join(d, f"{safe_name}.png")
-        if os.path.exists(exact):
-            return exact
+    def _set_dir(self, rel: str, mtime: int | None, names: list[str]):
+        _, old = self._dirs.pop(rel, (0, set()))
+        for name in old:
+            self._unlink(rel, name)
+        if mtime is None:
+            return
+        self._dirs[rel] = (mtime, set())
+        for name in names:
+            self._link(rel, name)
+
+    def _link(self, rel: str, name: str):
+        files = self._dirs[rel][1]
+        if name not in files:
+            files.add(name)
+            self._where.setdefault(_norm_filename(name), {}).setdefault(rel, []).append(name)
+
+    def _unlink(self, rel: str, name: str):
+        key = _norm_filename(name)
+        folders = self._where.get(key, {})
+        if name in folders.get(rel, []):
+            folders[rel].remove(name)
+            if not folders[rel]:
+                del folders[rel]
+            if not folders:
+                del self._where[key]
+
+    def _scan(self, rel: str) -> list[str]:
+        """List one folder into the index; returns its subfolders."""
+        path = os.path.join(self._root, rel) if rel else self._root
         try:
-            for f in os.listdir(d):
-                if re.sub(r'\s+', ' ', f).lower() == target_norm:
-                    return os.path.join(d, f)
-        except Exception:
-            pass
+            mtime = os.stat(path).st_mtime_ns
+            entries = list(os.scandir(path))
+        except OSError:
+            self._set_dir(rel, None, [])
+            return []
+        self._set_dir(rel, mtime, [e.name for e in entries if e.is_file()])
+        return [e.name for e in entries if e.is_dir()]
+
+    def _scan_root(self):
+        subdirs = self._scan("")
+        self._rank = {rel: i for i, rel in enumerate(subdirs)}
+        for rel in [d for d in self._dirs if d and d not in self._rank]:
+            self._set_dir(rel, None, [])
+        for rel in subdirs:
+            if rel not in self._dirs:
+                self._scan(rel)
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if self._root != SCREENSHOT_DIR:
+                self._root, self._dirs, self._where, self._rank = SCREENSHOT_DIR, {}, {}, {}
+            elif not force and now - self._checked < INDEX_POLL_SECONDS:
+                return
+            self._checked = now
+            for rel in [""] + [d for d in self._dirs if d]:
+                path = os.path.join(self._root, rel) if rel else self._root
+                try:
+                    changed = os.stat(path).st_mtime_ns != self._dirs.get(rel, (None,))[0]
+                except OSError:
+                    changed = True
+                if changed:
+                    self._scan_root() if rel == "" else self._scan(rel)
+
+    def add(self, path: str):
+        rel = os.path.relpath(os.path.dirname(os.path.abspath(path)), self._root or SCREENSHOT_DIR)
+        rel = "" if rel == "." else rel
+        with self._lock:
+            if self._root is None or os.sep in rel or rel.startswith(".."):
+                return
+            self._dirs.setdefault(rel, (0, set()))  # mtime 0: listed again on the next poll
+            self._link(rel, os.path.basename(path))
+
+    def remove(self, path: str):
+        rel = os.path.relpath(os.path.dirname(os.path.abspath(path)), self._root or SCREENSHOT_DIR)
+        rel = "" if rel == "." else rel
+        with self._lock:
+            if rel in self._dirs:
+                self._dirs[rel][1].discard(os.path.basename(path))
+                self._unlink(rel, os.path.basename(path))
+
+    def lookup(self, item_name: str, bill_title: str = "") -> str | None:
+        exact = f"{_safe_filename(item_name)}.png"
+        with self._lock:
+            folders = self._where.get(_norm_filename(exact))
+            if not folders:
+                return None
+            # Same order as always: the item's bill folder, any other bill folder, then the root
+            preferred = [_safe_dirname(bill_title), bill_title] if bill_title else []
+            others = sorted((rel for rel in folders if rel and rel not in preferred), key=lambda rel: self._rank.get(rel, len(self._rank)))
+            for rel in preferred + others + [""]:
+                names = folders.get(rel)
+                if names:
+                    name = exact if exact in names else names[0]
+                    return os.path.join(self._root, rel, name) if rel else os.path.join(self._root, name)
+        return None
 
-    return None
+
+_index = _ScreenshotIndex()
+
+
+def get_screenshot_path(item_name: str, bill_title: str = "") -> str | None:
+    """Get the screenshot file path if it exists with flexible matching."""
+    if not item_name:
+        return None
+    _index.refresh()
+    return _index.lookup(item_name, bill_title)
+
+
+def get_screenshot_paths(items: list[tuple[str, str]]) -> list[str | None]:
+    """get_screenshot_path for a page of (item_name, bill_title) pairs, checking the folders once."""
+    _index.refresh()
+    return [_index.lookup(name, bill) if name else None for name, bill in items]
 
 
 def has_screenshot(item_name: str, bill_title: str = "") -> bool:
@@ -0,0 +1,526 @@
+"""
+shared_cache.py - Cache state shared by all gunicorn workers (SQLite, WAL mode).
+
+gunicorn runs several worker processes, each with its own module globals. This
+store gives them one place for:
+  - generation counters: invalidating a cache bumps its generation, so every
+    worker sees that its copy is out of date
+  - pickled snapshots: a snapshot loaded by one worker is reused by the others
+  - small status values (e.g. screenshot job states)
+  - a size / last-access index of files (the screenshot archive), so cleanup
+    can evict least recently used files without walking the directory
+  - a durable job queue (screenshot jobs): state, attempts and timestamps per
+    job, so queued work survives a restart; jobs with the same dedup key are
+    coalesced instead of queued twice
+
+If the database can't be opened, an in-process store with the same interface
+is used instead (single-process behaviour, as before).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(
+        os.path.dirname(os.environ.get("LOCAL_XLSX_PATH", os.path.expanduser("~/mrg/finance/FY27_Bills_Budget.xlsx"))),
+        ".webapp_cache.sqlite3",
+    ),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    name TEXT PRIMARY KEY,
+    gen INTEGER NOT NULL,
+    must_wait INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    gen INTEGER NOT NULL,
+    loaded_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS status (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+);
+CREATE TABLE IF NOT EXISTS files (
+    ns TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (ns, path)
+);
+CREATE INDEX IF NOT EXISTS files_lru ON files (ns, last_access);
+CREATE TABLE IF NOT EXISTS file_totals (
+    ns TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    dedup TEXT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (ns, state, priority, id);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (ns, key, id);
+"""
+# Applied after _SCHEMA: columns added since a table was first created
+_MIGRATIONS = [
+    ("jobs", "dedup", "ALTER TABLE jobs ADD COLUMN dedup TEXT"),
+]
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (ns, dedup, state);
+"""
+
+# Job states: queued -> processing -> done | error (or back to queued for a retry)
+JOB_STATES = ("queued", "processing", "done", "error")
+FINISHED_STATES = ("done", "error")
+
+
+def merge_payload(old: dict, new: dict) -> dict:
+    """Payload of a coalesced job: new values win, but a set (truthy) flag is never cleared."""
+    return {**old, **{k: v for k, v in new.items() if v or k not in old}}
+
+
+class SQLiteStore:
+    """Shared store backed by one SQLite file in WAL mode (readers never block the writer)."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        for table, column, ddl in _MIGRATIONS:
+            if column not in {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}:
+                self._conn.execute(ddl)
+        self._conn.executescript(_INDEXES)
+        self._lock = threading.Lock()
+
+    def generation(self, name: str) -> tuple[int, bool]:
+        """
+        Current (generation, must_wait) of a cache. If the database can't be read
+        (e.g. locked past the timeout) it is (-1, True): no snapshot was loaded at
+        generation -1, so callers treat it as a miss and load.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT gen, must_wait FROM generations WHERE name = ?", (name,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"[cache] ⚠️ Could not read the {name} generation ({e}) — treating it as a miss")
+            return -1, True
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def bump(self, name: str, wait: bool = False) -> int:
+        """Invalidate a cache in every worker. Returns the new generation."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generations (name, gen, must_wait) VALUES (?, 1, ?) "
+                "ON CONFLICT(name) DO UPDATE SET gen = gen + 1, must_wait = must_wait OR excluded.must_wait",
+                (name, int(wait)),
+            )
+            return self._conn.execute("SELECT gen FROM generations WHERE name = ?", (name,)).fetchone()[0]
+
+    def clear_wait(self, name: str, gen: int):
+        """A fresh load for generation gen finished; stale reads are allowed again (best effort)."""
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE generations SET must_wait = 0 WHERE name = ? AND gen = ?", (name, gen))
+        except sqlite3.Error as e:
+            print(f"[cache] ⚠️ Could not clear the {name} wait flag ({e})")
+
+    def load(self, name: str, newer_than: float = 0.0) -> tuple[int, float, object] | None:
+        """(gen, loaded_at, data) of the stored snapshot, if it was loaded after newer_than (None if unreadable)."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT gen, loaded_at, data FROM snapshots WHERE name = ? AND loaded_at > ?", (name, newer_than)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[cache] ⚠️ Could not read the {name} snapshot ({e}) — treating it as a miss")
+            return None
+        if not row:
+            return None
+        try:
+            return row[0], row[1], pickle.loads(row[2])
+        except Exception:
+            return None
+
+    def save(self, name: str, gen: int, loaded_at: float, data):
+        """Publish a snapshot unless a newer one is already stored (best effort: other workers load their own)."""
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO snapshots (name, gen, loaded_at, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET gen = excluded.gen, loaded_at = excluded.loaded_at, data = excluded.data "
+                    "WHERE excluded.loaded_at >= snapshots.loaded_at",
+                    (name, gen, loaded_at, blob),
+                )
+        except sqlite3.Error as e:
+            print(f"[cache] ⚠️ Could not publish the {name} snapshot ({e})")
+
+    def set_status(self, ns: str, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO status (ns, key, value, updated) VALUES (?, ?, ?, ?)",
+                (ns, key, value, time.time()),
+            )
+
+    def get_status(self, ns: str, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM status WHERE ns = ? AND key = ?", (ns, key)).fetchone()
+        return row[0] if row else None
+
+    def _add_bytes(self, ns: str, delta: int):
+        self._conn.execute(
+            "INSERT INTO file_totals (ns, bytes) VALUES (?, ?) ON CONFLICT(ns) DO UPDATE SET bytes = bytes + excluded.bytes",
+            (ns, delta),
+        )
+
+    def record_file(self, ns: str, path: str, size: int, last_access: float | None = None):
+        """Add or update a file in the index (size in bytes, last_access defaults to now)."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT size FROM files WHERE ns = ? AND path = ?", (ns, path)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (ns, path, size, last_access) VALUES (?, ?, ?, ?)",
+                (ns, path, size, time.time() if last_access is None else last_access),
+            )
+            self._add_bytes(ns, size - (row[0] if row else 0))
+
+    def touch_file(self, ns: str, path: str):
+        """Mark an indexed file as just used."""
+        with self._lock:
+            self._conn.execute("UPDATE files SET last_access = ? WHERE ns = ? AND path = ?", (time.time(), ns, path))
+
+    def forget_file(self, ns: str, path: str):
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT size FROM files WHERE ns = ? AND path = ?", (ns, path)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM files WHERE ns = ? AND path = ?", (ns, path))
+                self._add_bytes(ns, -row[0])
+
+    def total_size(self, ns: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT bytes FROM file_totals WHERE ns = ?", (ns,)).fetchone()
+        return row[0] if row else 0
+
+    def oldest_files(self, ns: str, limit: int) -> list[tuple[str, int]]:
+        """(path, size) of the least recently used files."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, size FROM files WHERE ns = ? ORDER BY last_access LIMIT ?", (ns, limit)
+            ).fetchall()
+
+    def file_index(self, ns: str) -> dict[str, tuple[int, float]]:
+        """{path: (size, last_access)} for every indexed file."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, last_access FROM files WHERE ns = ?", (ns,)).fetchall()
+        return {path: (size, last_access) for path, size, last_access in rows}
+
+    def replace_files(self, ns: str, files: dict[str, tuple[int, float]]):
+        """Replace the whole index for ns with {path: (size, last_access)}."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM files WHERE ns = ?", (ns,))
+            self._conn.executemany(
+                "INSERT INTO files (ns, path, size, last_access) VALUES (?, ?, ?, ?)",
+                [(ns, path, size, last_access) for path, (size, last_access) in files.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_totals (ns, bytes) VALUES (?, ?)",
+                (ns, sum(size for size, _ in files.values())),
+            )
+
+    def add_job(self, ns: str, key: str, payload: dict, priority: int = 0, dedup: str | None = None) -> int:
+        """
+        Queue a job; key identifies what it works on (status lookups go by key). Returns the job id.
+
+        If a queued job has the same dedup key, it absorbs this one instead (payloads merged,
+        higher priority kept) and its id is returned. So is the id of a job already processing
+        whose payload covers this one.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if dedup is not None:
+                rows = self._conn.execute(
+                    "SELECT id, state, payload FROM jobs WHERE ns = ? AND dedup = ? AND state IN ('queued', 'processing') "
+                    "ORDER BY id DESC",
+                    (ns, dedup),
+                ).fetchall()
+                for job_id, state, old in rows:
+                    old = json.loads(old)
+                    merged = merge_payload(old, payload)
+                    if state == "queued":
+                        self._conn.execute(
+                            "UPDATE jobs SET payload = ?, priority = MAX(priority, ?), updated = ? WHERE id = ?",
+                            (json.dumps(merged), priority, now, job_id),
+                        )
+                        return job_id
+                    if merged == old:
+                        return job_id
+            cur = self._conn.execute(
+                "INSERT INTO jobs (ns, key, dedup, payload, state, priority, created, updated) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (ns, key, dedup, json.dumps(payload), priority, now, now),
+            )
+            return cur.lastrowid
+
+    def get_job(self, job_id: int) -> dict | None:
+        """A job's state, attempts, payload and last error."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, state, priority, attempts, payload, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"id": job_id, "key": row[0], "state": row[1], "priority": row[2], "attempts": row[3],
+                "payload": json.loads(row[4]), "error": row[5]}
+
+    def claim_job(self, ns: str, owner: str) -> dict | None:
+        """Take the next queued job (highest priority, then oldest) and mark it processing by owner."""
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT id, key, payload, attempts FROM jobs WHERE ns = ? AND state = 'queued' "
+                "ORDER BY priority DESC, id LIMIT 1",
+                (ns,),
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET state = 'processing', attempts = attempts + 1, owner = ?, updated = ? WHERE id = ?",
+                (owner, time.time(), row[0]),
+            )
+        return {"id": row[0], "key": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+    def update_job(self, job_id: int, state: str, error: str | None = None):
+        """Move a job to state (queued again for a retry, or finished)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated = ?, finished = ? WHERE id = ?",
+                (state, error, now, now if state in FINISHED_STATES else None, job_id),
+            )
+
+    def running_jobs(self, ns: str) -> list[tuple[int, str, float]]:
+        """(id, owner, updated) of jobs being processed."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, owner, updated FROM jobs WHERE ns = ? AND state = 'processing'", (ns,)
+            ).fetchall()
+
+    def pending_jobs(self, ns: str) -> int:
+        """Number of queued or processing jobs."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE ns = ? AND state IN ('queued', 'processing')", (ns,)
+            ).fetchone()[0]
+
+    def job_states(self, ns: str) -> dict[str, tuple[str, float]]:
+        """{key: (state, updated)} of each key's latest job."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, state, updated FROM jobs WHERE id IN (SELECT MAX(id) FROM jobs WHERE ns = ? GROUP BY key)",
+                (ns,),
+            ).fetchall()
+        return {key: (state, updated) for key, state, updated in rows}
+
+    def prune_jobs(self, ns: str, finished_before: float):
+        """Delete jobs that finished before the given time."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE ns = ? AND finished < ?", (ns, finished_before))
+
+
+class MemoryStore:
+    """In-process stand-in for SQLiteStore when no shared file is available."""
+
+    path = ""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gens: dict[str, list] = {}
+        self._snapshots: dict[str, tuple[int, float, object]] = {}
+        self._status: dict[tuple[str, str], str] = {}
+        self._files: dict[str, dict[str, tuple[int, float]]] = {}
+        self._jobs: dict[int, dict] = {}
+        self._next_job = 1
+
+    def generation(self, name: str) -> tuple[int, bool]:
+        with self._lock:
+            gen, must_wait = self._gens.get(name, (0, False))
+        return gen, must_wait
+
+    def bump(self, name: str, wait: bool = False) -> int:
+        with self._lock:
+            gen, must_wait = self._gens.get(name, (0, False))
+            self._gens[name] = (gen + 1, must_wait or wait)
+            return gen + 1
+
+    def clear_wait(self, name: str, gen: int):
+        with self._lock:
+            if self._gens.get(name, (0, False))[0] == gen:
+                self._gens[name] = (gen, False)
+
+    def load(self, name: str, newer_than: float = 0.0) -> tuple[int, float, object] | None:
+        with self._lock:
+            snap = self._snapshots.get(name)
+        return snap if snap and snap[1] > newer_than else None
+
+    def save(self, name: str, gen: int, loaded_at: float, data):
+        with self._lock:
+            current = self._snapshots.get(name)
+            if not current or loaded_at >= current[1]:
+                self._snapshots[name] = (gen, loaded_at, data)
+
+    def set_status(self, ns: str, key: str, value: str):
+        with self._lock:
+            self._status[(ns, key)] = value
+
+    def get_status(self, ns: str, key: str) -> str | None:
+        with self._lock:
+            return self._status.get((ns, key))
+
+    def record_file(self, ns: str, path: str, size: int, last_access: float | None = None):
+        with self._lock:
+            self._files.setdefault(ns, {})[path] = (size, time.time() if last_access is None else last_access)
+
+    def touch_file(self, ns: str, path: str):
+        with self._lock:
+            files = self._files.get(ns, {})
+            if path in files:
+                files[path] = (files[path][0], time.time())
+
+    def forget_file(self, ns: str, path: str):
+        with self._lock:
+            self._files.get(ns, {}).pop(path, None)
+
+    def total_size(self, ns: str) -> int:
+        with self._lock:
+            return sum(size for size, _ in self._files.get(ns, {}).values())
+
+    def oldest_files(self, ns: str, limit: int) -> list[tuple[str, int]]:
+        with self._lock:
+            files = sorted(self._files.get(ns, {}).items(), key=lambda f: f[1][1])[:limit]
+        return [(path, size) for path, (size, _) in files]
+
+    def file_index(self, ns: str) -> dict[str, tuple[int, float]]:
+        with self._lock:
+            return dict(self._files.get(ns, {}))
+
+    def replace_files(self, ns: str, files: dict[str, tuple[int, float]]):
+        with self._lock:
+            self._files[ns] = dict(files)
+
+    def add_job(self, ns: str, key: str, payload: dict, priority: int = 0, dedup: str | None = None) -> int:
+        now = time.time()
+        with self._lock:
+            if dedup is not None:
+                live = [(job_id, job) for job_id, job in self._jobs.items()
+                        if job["ns"] == ns and job["dedup"] == dedup and job["state"] in ("queued", "processing")]
+                for job_id, job in sorted(live, key=lambda j: -j[0]):
+                    merged = merge_payload(job["payload"], payload)
+                    if job["state"] == "queued":
+                        job.update(payload=merged, priority=max(job["priority"], priority), updated=now)
+                        return job_id
+                    if merged == job["payload"]:
+                        return job_id
+            job_id = self._next_job
+            self._next_job += 1
+            self._jobs[job_id] = {"ns": ns, "key": key, "dedup": dedup, "payload": dict(payload), "state": "queued",
+                                  "priority": priority, "attempts": 0, "owner": None, "error": None, "created": now,
+                                  "updated": now, "finished": None}
+            return job_id
+
+    def get_job(self, job_id: int) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {"id": job_id, "key": job["key"], "state": job["state"], "priority": job["priority"],
+                    "attempts": job["attempts"], "payload": dict(job["payload"]), "error": job["error"]}
+
+    def claim_job(self, ns: str, owner: str) -> dict | None:
+        with self._lock:
+            queued = [(-job["priority"], job_id) for job_id, job in self._jobs.items()
+                      if job["ns"] == ns and job["state"] == "queued"]
+            if not queued:
+                return None
+            job_id = min(queued)[1]
+            job = self._jobs[job_id]
+            job.update(state="processing", attempts=job["attempts"] + 1, owner=owner, updated=time.time())
+            return {"id": job_id, "key": job["key"], "payload": dict(job["payload"]), "attempts": job["attempts"]}
+
+    def update_job(self, job_id: int, state: str, error: str | None = None):
+        now = time.time()
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(state=state, error=error, updated=now,
+                                          finished=now if state in FINISHED_STATES else None)
+
+    def running_jobs(self, ns: str) -> list[tuple[int, str, float]]:
+        with self._lock:
+            return [(job_id, job["owner"], job["updated"]) for job_id, job in self._jobs.items()
+                    if job["ns"] == ns and job["state"] == "processing"]
+
+    def pending_jobs(self, ns: str) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["ns"] == ns and job["state"] in ("queued", "processing"))
+
+    def job_states(self, ns: str) -> dict[str, tuple[str, float]]:
+        with self._lock:
+            return {job["key"]: (job["state"], job["updated"]) for _, job in sorted(self._jobs.items()) if job["ns"] == ns}
+
+    def prune_jobs(self, ns: str, finished_before: float):
+        with self._lock:
+            for job_id in [i for i, job in self._jobs.items()
+                           if job["ns"] == ns and job["finished"] is not None and job["finished"] < finished_before]:
+                del self._jobs[job_id]
+
+
+_store: SQLiteStore | MemoryStore | None = None
+_store_pid = 0
+_store_lock = threading.Lock()
+
+
+def get_store() -> SQLiteStore | MemoryStore:
+    """Return this process's store. Reopened after fork (SQLite connections can't cross a fork)."""
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store is not None and _store_pid == pid:
+        return _store
+
+    with _store_lock:
+        if _store is None or _store_pid != pid:
+            store = None
+            if SHARED_CACHE_PATH:
+                try:
+                    store = SQLiteStore(SHARED_CACHE_PATH)
+                except (sqlite3.Error, OSError) as e:
+                    print(f"[cache] ⚠️ Shared cache unavailable ({e}) — using per-process cache")
+            _store = store or MemoryStore()
+            _store_pid = pid
+    return _store
@@ -0,0 +1,134 @@
+"""
+thumbnails.py - Downscaled screenshot previews for list views.
+
+Screenshots are full 1920x1080 PNGs, but the dashboard and review pages only show
+them as small previews. A thumbnail is generated on first request (WebP when the
+browser accepts it, JPEG otherwise) and kept under THUMB_DIR, named after the
+screenshot's path, mtime and the requested width. A retaken screenshot gets new
+thumbnails and its old ones are deleted when they are replaced.
+
+Thumbnails live outside the screenshots folder so they are never uploaded, looked
+up as screenshots or counted towards MAX_SCREENSHOT_STORAGE_MB.
+
+Pillow is optional: without it thumbnail() returns None and callers serve the
+original image.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+THUMB_DIR = os.environ.get(
+    "SCREENSHOT_THUMB_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".screenshot_thumbs")),
+)
+
+# Allowed widths; requests are rounded up to one of these so a URL can't make us store arbitrary sizes
+WIDTHS = (160, 480, 960)
+QUALITY = 75
+
+MIMETYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def webp_supported() -> bool:
+    return features is not None and features.check("webp")
+
+
+def pick_width(width: int | None) -> int:
+    """The smallest allowed width >= width (the largest if none is)."""
+    for w in WIDTHS:
+        if width is not None and width <= w:
+            return w
+    return WIDTHS[0] if width is None else WIDTHS[-1]
+
+
+def _key(rel: str) -> str:
+    return hashlib.sha1(rel.replace(os.sep, "/").encode()).hexdigest()[:20]
+
+
+def _variant_dir(rel: str) -> str:
+    key = _key(rel)
+    return os.path.join(THUMB_DIR, key[:2])
+
+
+def thumbnail_path(rel: str, mtime_ns: int, width: int, fmt: str) -> str:
+    return os.path.join(_variant_dir(rel), f"{_key(rel)}-{mtime_ns}-{width}.{fmt}")
+
+
+def _render(source: str, target: str, width: int, fmt: str):
+    with Image.open(source) as im:
+        im.thumbnail((width, width * 4))
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if fmt == "webp":
+                    im.save(f, "WEBP", quality=QUALITY, method=4)
+                else:
+                    im.save(f, "JPEG", quality=QUALITY, optimize=True, progressive=True)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def thumbnail(source: str, rel: str, width: int, fmt: str, mtime_ns: int | None = None) -> str | None:
+    """
+    Path of a width-px-wide fmt ("webp"/"jpeg") thumbnail of source, generating it if needed.
+
+    rel is source's path relative to the screenshots folder. Returns None when
+    Pillow is missing or the image can't be read.
+    """
+    if Image is None:
+        return None
+    if mtime_ns is None:
+        try:
+            mtime_ns = os.stat(source).st_mtime_ns
+        except OSError:
+            return None
+    target = thumbnail_path(rel, mtime_ns, width, fmt)
+    if os.path.exists(target):
+        return target
+
+    try:
+        _render(source, target, width, fmt)
+    except (OSError, ValueError) as e:
+        print(f"[thumbnails] Could not thumbnail {rel}: {e}")
+        return None
+    _remove_variants(rel, keep=f"{_key(rel)}-{mtime_ns}-")  # earlier versions of the screenshot
+    return target
+
+
+def _remove_variants(rel: str, keep: str | None = None):
+    key = _key(rel)
+    folder = _variant_dir(rel)
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(key + "-") and not (keep and name.startswith(keep)):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+def discard(rel: str):
+    """Remove every thumbnail of rel (its screenshot was deleted)."""
+    _remove_variants(rel)
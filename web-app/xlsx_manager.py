@@ -19,6 +19,9 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 import price_scraper
+import xlsx_reader
+import graph_client
+import shared_cache
 
 # Config from environment
 RCLONE_REMOTE = os.environ.get(
@@ -37,42 +40,220 @@ _last_pull_time = 0
 PULL_INTERVAL = int(os.environ.get("PULL_INTERVAL_SECONDS", "300"))  # 5 minutes
 
 # Cached data
-_cached_items: list[dict] = []
-_cached_items_time = 0
-_cached_queue: list[dict] = []
-_cached_queue_time = 0
-_cached_orders: list[dict] = []
-_cached_orders_time = 0
+_graph_file_id: tuple[str, str] = ("", "")  # (drive_id, file_id) of the budget workbook
 ITEMS_CACHE_TTL = 300  # 5 minutes — hit Sync to force refresh
+# Stale snapshots are served (while reloading in the background) up to this age
+CACHE_MAX_STALE = int(os.environ.get("CACHE_MAX_STALE_SECONDS", "1800"))
 
 
-def invalidate_items_cache():
-    """Invalidate items cache and reset pull timer."""
-    global _cached_items, _cached_items_time, _last_pull_time
-    _cached_items = []
-    _cached_items_time = 0
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller runs fn; callers arriving while it runs wait and get the
+    same result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, dict] = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+
+_flights = SingleFlight()
+
+
+class SnapshotCache:
+    """
+    Last good result of a slow read, served stale-while-revalidate and shared
+    between gunicorn workers through shared_cache.
+
+    Younger than ttl and still at the current generation: returned as is. A newer
+    snapshot published by another worker is adopted instead of reloading.
+    Expired or invalidated but younger than max_stale: returned immediately while
+    a background thread reloads it. Older than that, never loaded, or invalidated
+    with wait=True (in any worker): the caller blocks on the load. Loaders raise
+    when they can't read the data; the last good snapshot is then returned. An
+    empty result is a valid snapshot (the table really is empty).
+    """
+
+    def __init__(self, name: str, loader, ttl: int = ITEMS_CACHE_TTL, max_stale: int = CACHE_MAX_STALE):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.data: list[dict] = []
+        self.time = 0.0   # when data was loaded
+        self.gen = -1     # shared generation the data was loaded at
+        self.hits = 0
+        self.shared_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, gen: int, now: float) -> bool:
+        return bool(self.time) and self.gen == gen and now < self.time + self.ttl
+
+    def get(self) -> list[dict]:
+        import time as _time
+
+        store = shared_cache.get_store()
+        gen, must_wait = store.generation(self.name)
+        now = _time.time()
+        if self._is_fresh(gen, now):
+            self.hits += 1
+            return self.data
+
+        # Another worker may already have loaded this generation
+        shared = store.load(self.name, newer_than=self.time)
+        if shared:
+            with self._lock:
+                if shared[1] > self.time:
+                    self.gen, self.time, self.data = shared
+            if self._is_fresh(gen, now):
+                self.shared_hits += 1
+                return self.data
+
+        if self.time and not must_wait and now - self.time < self.max_stale:
+            self.stale_hits += 1
+            data = self.data
+            self._refresh_in_background()
+            return data
+        self.misses += 1
+        return self._load(gen)
+
+    def _load(self, min_gen: int = 0) -> list[dict]:
+        """Load through the single-flight group: concurrent callers share one load."""
+        key = f"cache:{self.name}"
+        result, gen = _flights.do(key, self._fetch)
+        if gen < min_gen:
+            # Joined a load that began before the last invalidation; it may miss that write
+            result, gen = _flights.do(key, self._fetch)
+        return result
+
+    def _fetch(self) -> tuple[list[dict], int]:
+        import time as _time
+
+        store = shared_cache.get_store()
+        gen, _ = store.generation(self.name)
+        started = _time.time()
+        try:
+            result = self.loader()
+        except Exception as e:
+            self.errors += 1
+            print(f"[cache] ⚠️ {self.name} reload failed: {e}")
+            return self.data, gen
+        with self._lock:
+            # Don't let a slow load overwrite a newer one
+            if started >= self.time:
+                self.data = result
+                self.time = started
+                self.gen = gen
+        store.save(self.name, gen, started, result)
+        store.clear_wait(self.name, gen)
+        return result, gen
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self._load()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def invalidate(self, wait: bool = False):
+        """Mark the snapshot expired in every worker. wait=True makes the next read
+        block on a reload (read-your-writes); otherwise it is served stale while reloading."""
+        shared_cache.get_store().bump(self.name, wait=wait)
+
+    def stats(self) -> dict:
+        import time as _time
+
+        gen, _ = shared_cache.get_store().generation(self.name)
+        return {
+            "age_s": round(_time.time() - self.time, 1) if self.time else None,
+            "fresh": self._is_fresh(gen, _time.time()),
+            "generation": gen,
+            "rows": len(self.data),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+_items_cache = SnapshotCache("items", lambda: _read_items_from_xlsx())
+_queue_cache = SnapshotCache("queue", lambda: _fetch_queue_items())
+_orders_cache = SnapshotCache("orders", lambda: _fetch_order_rows())
+
+
+def invalidate_items_cache(wait: bool = False):
+    """Invalidate items cache and reset pull timer.
+    Graph writes don't change the local xlsx until the next pull, so by default the
+    old snapshot keeps being served while it reloads; pass wait=True after local writes."""
+    global _last_pull_time
+    _items_cache.invalidate(wait=wait)
     _last_pull_time = 0
 
 
 def invalidate_queue_cache():
-    """Invalidate test queue cache."""
-    global _cached_queue, _cached_queue_time
-    _cached_queue = []
-    _cached_queue_time = 0
+    """Invalidate test queue cache. The next read waits for fresh Graph data."""
+    _queue_cache.invalidate(wait=True)
 
 
 def invalidate_orders_cache():
-    """Invalidate orders cache."""
-    global _cached_orders, _cached_orders_time
-    _cached_orders = []
-    _cached_orders_time = 0
+    """Invalidate orders cache. The next read waits for fresh Graph data."""
+    _orders_cache.invalidate(wait=True)
 
 
 def invalidate_all_caches():
-    """Invalidate all cached items, queue, and orders data."""
-    invalidate_items_cache()
+    """Invalidate all cached items, queue, and orders data (next reads block on fresh data)."""
+    invalidate_items_cache(wait=True)
     invalidate_queue_cache()
     invalidate_orders_cache()
+    invalidate_row_index()
+
+
+def cache_stats() -> dict:
+    """Age and hit/miss counters of the read caches, for /status."""
+    return {c.name: c.stats() for c in (_items_cache, _queue_cache, _orders_cache)}
 
 
 # Column mapping (xlsx columns in the Bills sheet)
@@ -128,94 +309,392 @@ def sync_pull(force: bool = False) -> bool:
     local_dir = str(Path(LOCAL_XLSX).parent)
     os.makedirs(local_dir, exist_ok=True)
 
-    if force:
-        return _run_rclone(["copy", "--ignore-checksum", "--ignore-size", "--update", RCLONE_REMOTE, local_dir])
-
+    # Overlapping pulls share one rclone process
     def _do_pull():
-        _run_rclone(["copy", "--ignore-checksum", "--ignore-size", "--update", RCLONE_REMOTE, local_dir])
+        return _flights.do("rclone-pull", lambda: _run_rclone(
+            ["copy", "--ignore-checksum", "--ignore-size", "--update", RCLONE_REMOTE, local_dir]
+        ))
+
+    if force:
+        return _do_pull()
 
     # Trigger pull in background thread so HTTP request does not wait on rclone
-    threading.Thread(target=_do_pull, daemon=True).start()
+    if not _flights.in_flight("rclone-pull"):
+        threading.Thread(target=_do_pull, daemon=True).start()
     return True
 
 
 def _get_graph_token() -> tuple[str, str, str] | None:
-    """Read access token, drive_id, and file_id from rclone config / cache."""
-    import configparser
-    import json as _json
-
-    rclone_conf = os.path.expanduser("~/.config/rclone/rclone.conf")
-    if not os.path.exists(rclone_conf):
+    """Return (access_token, drive_id, file_id) from the cached rclone credentials."""
+    global _graph_file_id
+    token = graph_client.get_token()
+    if not token:
         return None
+    access_token, drive_id = token
 
-    config = configparser.ConfigParser()
-    config.read(rclone_conf)
+    # Look the file ID up once per drive
+    if _graph_file_id[0] != drive_id:
+        url = f"{graph_client.GRAPH_ROOT}/drives/{drive_id}/root:/OPS-1 Operations/FY27 Finances/FY27_Bills_Budget.xlsx"
+        resp = graph_client.get(url, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
+        if resp.status_code != 200:
+            return None
+        _graph_file_id = (drive_id, resp.json()["id"])
 
-    if "onedrive" not in config:
-        return None
+    return access_token, drive_id, _graph_file_id[1]
 
-    try:
-        token_str = config["onedrive"]["token"]
-        token = _json.loads(token_str)
-        drive_id = config["onedrive"]["drive_id"]
-        access_token = token["access_token"]
-    except (KeyError, _json.JSONDecodeError):
-        return None
 
-    # Get file ID (cache it after first lookup)
-    file_id = os.environ.get("_GRAPH_FILE_ID", "")
-    if not file_id:
-        import requests as _requests
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/root:/OPS-1 Operations/FY27 Finances/FY27_Bills_Budget.xlsx"
-        resp = _requests.get(url, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
-        if resp.status_code == 200:
-            file_id = resp.json()["id"]
-            os.environ["_GRAPH_FILE_ID"] = file_id
+GRAPH_ROOT = graph_client.GRAPH_ROOT
+GRAPH_BATCH_LIMIT = 20  # Graph JSON $batch accepts at most 20 sub-requests
+# Excel answers concurrent writes to one workbook with these when busy; such writes are sent again
+GRAPH_RETRY_STATUSES = {409, 429, 503, 504}
+GRAPH_WRITE_RETRIES = 2
+GRAPH_RETRY_MAX_WAIT = 10.0  # seconds, caps Retry-After
+
+# Worksheet and sheet row of table index 0 for tables written cell-by-cell
+TABLE_SHEETS = {
+    "BillsT": ("Bills", 2),      # row 1 = header
+    "OrderT": ("Ordering", 3),   # row 1 = TOTALS, row 2 = header
+}
+SHEET_TABLES = {sheet: (table, first_row) for table, (sheet, first_row) in TABLE_SHEETS.items()}
+
+# BillsT input columns cleared when removing an item: B-J and L-P (A and K hold formulas)
+BILLS_CLEAR_COLUMNS = [*range(1, 10), *range(11, 16)]
+
+
+def _table_sheet(table: str) -> str:
+    """
+    The worksheet a table's row adds/deletes shift, for ordering batched writes.
+
+    Tables outside TABLE_SHEETS (TestTable) map to their own name: their row writes
+    are ordered against each other but never against range writes on their sheet,
+    which the app doesn't make.
+    """
+    return TABLE_SHEETS.get(table, (table,))[0]
+
+
+def _col_letter(idx: int) -> str:
+    """Convert a 0-based column index to an Excel column letter (0 -> A, 26 -> AA)."""
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+class GraphWriteBatch:
+    """
+    Collect workbook writes for one request and send them together.
+
+    Cell writes on the same sheet row are merged into contiguous range PATCHes.
+    Everything queued is sent as Graph JSON $batch calls of up to 20 sub-requests.
+    Only writes whose order matters are chained with dependsOn: a row add/delete
+    runs after the writes queued before it on the same sheet, and later writes on
+    that sheet run after it. Other writes run independently, so one failed cell
+    doesn't fail the rest of the chunk. Writes Excel turns away as busy or
+    throttled (GRAPH_RETRY_STATUSES), and the writes chained behind them, are sent
+    again up to GRAPH_WRITE_RETRIES times after Retry-After. A flush with a single
+    sub-request skips the $batch envelope.
+
+    Every write can carry a tag; after flush(), ok(tag) says whether all
+    sub-requests carrying that tag succeeded. Successful cell writes are applied
+    to the row index; row adds/deletes drop it.
+    """
+
+    def __init__(self, creds: tuple[str, str, str] | None = None):
+        self.creds = creds or _get_graph_token()
+        self.results: list[dict] = []
+        self._pending: list[tuple[str, object]] = []  # ("cells", (sheet, row)) or ("request", dict)
+        self._cells: dict[tuple[str, int], dict[int, tuple]] = {}
+        self._retry_after: float | None = None  # longest Retry-After seen in the last send
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def set_cell(self, sheet: str, row: int, col_idx: int, value, tag: str = ""):
+        """Queue a single cell write (row is the 1-indexed sheet row)."""
+        key = (sheet, row)
+        if key not in self._cells:
+            self._cells[key] = {}
+            self._pending.append(("cells", key))
+        self._cells[key][col_idx] = (value, tag)
+
+    def set_table_cell(self, table: str, row_index: int, col_idx: int, value, tag: str = ""):
+        """Queue a cell write addressed by Graph table row index (see TABLE_SHEETS)."""
+        sheet, first_row = TABLE_SHEETS[table]
+        self.set_cell(sheet, row_index + first_row, col_idx, value, tag)
+
+    def set_range(self, sheet: str, address: str, values: list[list], tag: str = ""):
+        """Queue a PATCH of an explicit range address such as 'B5:J5'."""
+        self.add_request(
+            "PATCH", f"/worksheets('{sheet}')/range(address='{address}')",
+            {"values": values}, tag=tag, label=f"{sheet}!{address}", sheet=sheet,
+        )
+
+    def add_table_row(self, table: str, values: list, index: int | None = None, tag: str = ""):
+        """Queue a rows/add on a table. Appends unless index is given."""
+        payload = {"values": [values]}
+        if index is not None:
+            payload["index"] = index
+        self.add_request(
+            "POST", f"/tables/{table}/rows/add", payload,
+            tag=tag, label=f"{table} rows/add", reindex=table, sheet=_table_sheet(table),
+        )
+
+    def update_table_row(self, table: str, index: int, values: list, tag: str = ""):
+        """Queue a whole-row PATCH on a table row."""
+        self.add_request(
+            "PATCH", f"/tables/{table}/rows/itemAt(index={index})",
+            {"values": [values]}, tag=tag, label=f"{table} row {index}", sheet=_table_sheet(table),
+        )
+
+    def delete_table_row(self, table: str, index: int, tag: str = ""):
+        """Queue a table row delete. Queue deletes in descending index order."""
+        self.add_request(
+            "DELETE", f"/tables/{table}/rows/itemAt(index={index})",
+            tag=tag, label=f"{table} row {index}", reindex=table, sheet=_table_sheet(table),
+        )
+
+    def add_request(self, method: str, path: str, body: dict | None = None, tag: str = "", label: str = "",
+                    reindex: str = "", sheet: str = ""):
+        """Queue a raw sub-request. path is relative to the workbook, e.g. '/tables/OrderT/rows/add'.
+        reindex names a table whose row index must be dropped once this succeeds (a row add/delete);
+        sheet is the worksheet the request touches, used to order it against row adds/deletes."""
+        self._pending.append(("request", {
+            "method": method, "path": path, "body": body, "tags": {tag}, "label": label or path,
+            "reindex": reindex, "sheet": sheet,
+        }))
+
+    def _build_requests(self) -> list[dict]:
+        """Expand queued cells into contiguous range PATCHes, keeping queue order."""
+        reqs = []
+        for kind, entry in self._pending:
+            if kind == "request":
+                reqs.append(entry)
+                continue
+
+            sheet, row = entry
+            cells = self._cells[entry]
+            table, first_row = SHEET_TABLES.get(sheet, (None, 0))
+            cols = sorted(cells)
+            run = [cols[0]]
+            for col in cols[1:] + [None]:
+                if col is not None and col == run[-1] + 1:
+                    run.append(col)
+                    continue
+                address = f"{_col_letter(run[0])}{row}"
+                if len(run) > 1:
+                    address += f":{_col_letter(run[-1])}{row}"
+                reqs.append({
+                    "method": "PATCH",
+                    "path": f"/worksheets('{sheet}')/range(address='{address}')",
+                    "body": {"values": [[cells[c][0] for c in run]]},
+                    "tags": {cells[c][1] for c in run},
+                    "label": f"{sheet}!{address}",
+                    "sheet": sheet,
+                    "index": (table, row - first_row, {c: cells[c][0] for c in run}) if table else None,
+                })
+                if col is not None:
+                    run = [col]
+        return reqs
+
+    @staticmethod
+    def _result(req: dict, status: int, error: str = "") -> dict:
+        return {
+            "method": req["method"],
+            "label": req["label"],
+            "tags": req["tags"],
+            "status": status,
+            "ok": 200 <= status < 300,
+            "error": error,
+        }
+
+    @staticmethod
+    def _dependencies(chunk: list[dict]) -> list[int | None]:
+        """
+        For each request, the 0-based position in chunk of the one it must wait for.
+
+        Row adds/deletes shift the rows of their sheet, so on a sheet with one, the
+        requests up to its last add/delete form a chain and later requests on that
+        sheet wait for that last add/delete. Everything else has no dependency.
+        """
+        last_reindex = {}
+        for n, req in enumerate(chunk):
+            if req.get("reindex") and req.get("sheet"):
+                last_reindex[req["sheet"]] = n
+
+        deps: list[int | None] = []
+        previous = {}  # sheet -> position of the last request chained on it
+        for n, req in enumerate(chunk):
+            sheet = req.get("sheet")
+            if sheet not in last_reindex:
+                deps.append(None)
+                continue
+            deps.append(previous.get(sheet))
+            if n <= last_reindex[sheet]:
+                previous[sheet] = n
+        return deps
+
+    def _send_single(self, req: dict) -> dict:
+        access_token, drive_id, file_id = self.creds
+        url = f"{GRAPH_ROOT}/drives/{drive_id}/items/{file_id}/workbook{req['path']}"
+        try:
+            resp = graph_client.request(
+                req["method"], url,
+                headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
+                json=req["body"],
+                timeout=15,
+            )
+        except graph_client.RequestException as e:
+            return self._result(req, 0, str(e))
+        self._note_retry_after(resp.headers)
+        return self._result(req, resp.status_code, "" if resp.ok else resp.text[:150])
+
+    def _note_retry_after(self, headers):
+        try:
+            wait = float((headers or {}).get("Retry-After"))
+        except (TypeError, ValueError):
+            return
+        self._retry_after = max(self._retry_after or 0.0, wait)
+
+    def _send_batch(self, chunk: list[dict]) -> list[dict]:
+        access_token, drive_id, file_id = self.creds
+        sub_requests = []
+        for n, (req, dep) in enumerate(zip(chunk, self._dependencies(chunk)), start=1):
+            sub = {
+                "id": str(n),
+                "method": req["method"],
+                "url": f"/drives/{drive_id}/items/{file_id}/workbook{req['path']}",
+            }
+            if req["body"] is not None:
+                sub["body"] = req["body"]
+                sub["headers"] = {"Content-Type": "application/json"}
+            if dep is not None:
+                sub["dependsOn"] = [str(dep + 1)]
+            sub_requests.append(sub)
+
+        try:
+            resp = graph_client.post(
+                f"{GRAPH_ROOT}/$batch",
+                headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
+                json={"requests": sub_requests},
+                timeout=30,
+            )
+        except graph_client.RequestException as e:
+            return [self._result(req, 0, str(e)) for req in chunk]
+
+        if resp.status_code != 200:
+            self._note_retry_after(resp.headers)
+            return [self._result(req, resp.status_code, resp.text[:150]) for req in chunk]
+
+        responses = {r.get("id"): r for r in resp.json().get("responses", [])}
+        results = []
+        for n, req in enumerate(chunk, start=1):
+            sub_resp = responses.get(str(n), {})
+            status = int(sub_resp.get("status", 0))
+            if status in GRAPH_RETRY_STATUSES:
+                self._note_retry_after(sub_resp.get("headers"))
+            error = ""
+            if not 200 <= status < 300:
+                body = sub_resp.get("body") or {}
+                error = body.get("error", {}).get("message", "") if isinstance(body, dict) else str(body)[:150]
+            results.append(self._result(req, status, error))
+        return results
+
+    def _send(self, reqs: list[dict]) -> tuple[list[dict], list[int | None]]:
+        """Send reqs; returns their results and, for each, the position in reqs it was chained behind."""
+        if len(reqs) == 1:
+            return [self._send_single(reqs[0])], [None]
+        results, deps = [], []
+        for start in range(0, len(reqs), GRAPH_BATCH_LIMIT):
+            chunk = reqs[start:start + GRAPH_BATCH_LIMIT]
+            results.extend(self._send_batch(chunk))
+            deps.extend(None if dep is None else start + dep for dep in self._dependencies(chunk))
+        return results, deps
+
+    def _send_with_retries(self, reqs: list[dict]) -> list[dict]:
+        """Send reqs, then resend the busy/throttled ones and the ones that failed (424) only because of them."""
+        import time as _time
+
+        results: list[dict | None] = [None] * len(reqs)
+        pending = list(range(len(reqs)))
+        for attempt in range(GRAPH_WRITE_RETRIES + 1):
+            if attempt:
+                _time.sleep(min(self._retry_after if self._retry_after is not None else attempt, GRAPH_RETRY_MAX_WAIT))
+            self._retry_after = None
+            sent, deps = self._send([reqs[n] for n in pending])
+            retry = []
+            for i, (n, res) in enumerate(zip(pending, sent)):
+                results[n] = res
+                blocked = res["status"] == 424 and deps[i] is not None and pending[deps[i]] in retry
+                if res["status"] in GRAPH_RETRY_STATUSES or blocked:
+                    retry.append(n)
+            if not retry:
+                break
+            pending = retry
+        return results
+
+    def flush(self) -> list[dict]:
+        """Send all queued writes. Returns one result dict per sub-request sent."""
+        reqs = self._build_requests()
+        self._pending = []
+        self._cells = {}
+        if not reqs:
+            return []
+
+        if not self.creds:
+            results = [self._result(req, 0, "no Graph credentials") for req in reqs]
         else:
-            return None
+            results = self._send_with_retries(reqs)
+
+        for req, res in zip(reqs, results):
+            if not res["ok"]:
+                print(f"[graph] ⚠️ {res['method']} {res['label']} failed: {res['status']} {res['error']}")
+            elif req.get("reindex"):
+                invalidate_row_index(req["reindex"])
+            elif req.get("index"):
+                _index_apply_cells(*req["index"])
+        self.results.extend(results)
+        return results
 
-    return access_token, drive_id, file_id
+    def ok(self, tag: str | None = None) -> bool:
+        """True if every flushed sub-request (or every one carrying tag) succeeded."""
+        matched = [r for r in self.results if tag is None or tag in r["tags"]]
+        return bool(matched) and all(r["ok"] for r in matched)
+
+    def ok_count(self) -> int:
+        """Number of flushed sub-requests that succeeded."""
+        return sum(1 for r in self.results if r["ok"])
 
 
 def graph_add_row(sheet_table: str, row_values: list, index: int | None = None) -> bool:
     """Add a row to a table via Graph API Excel workbook endpoint.
     If index is provided, inserts at that position. Otherwise appends to end.
     """
-    import requests as _requests
-
-    creds = _get_graph_token()
-    if not creds:
+    batch = GraphWriteBatch()
+    if not batch.creds:
         print("[graph] No credentials - skipping")
         return False
 
-    access_token, drive_id, file_id = creds
+    batch.add_table_row(sheet_table, row_values, index=index)
+    batch.flush()
 
-    url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/{sheet_table}/rows/add"
-    payload = {"values": [row_values]}
-    if index is not None:
-        payload["index"] = index
-
-    resp = _requests.post(
-        url,
-        headers={
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=15,
-    )
-
-    if resp.status_code in (200, 201):
+    if batch.ok():
         print(f"[graph] ✅ Row added to {sheet_table}" + (f" at index {index}" if index is not None else ""))
         return True
     else:
-        print(f"[graph] ❌ Failed to add row: {resp.status_code} {resp.text[:150]}")
+        print(f"[graph] ❌ Failed to add row to {sheet_table}")
         return False
 
 
 def _get_last_data_index(sheet_table: str) -> int:
     """Find the index of the last non-empty row in a table."""
-    import requests as _requests
+    if sheet_table in INDEXED_TABLES:
+        index = get_row_index(sheet_table)
+        if not index:
+            return -1
+        filled = [i for i, vals in index["rows"].items() if _row_has_data(vals)]
+        return max(filled, default=-1)
 
     creds = _get_graph_token()
     if not creds:
@@ -225,7 +704,7 @@ def _get_last_data_index(sheet_table: str) -> int:
     headers = {"Authorization": f"Bearer {access_token}"}
 
     rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/{sheet_table}/rows"
-    resp = _requests.get(rows_url, headers=headers, timeout=15)
+    resp = graph_client.get(rows_url, headers=headers, timeout=15)
 
     if resp.status_code != 200:
         return -1
@@ -239,39 +718,22 @@ def _get_last_data_index(sheet_table: str) -> int:
     return last_data_index
 
 
-def _patch_row_values(sheet_table: str, row_index: int, values: list, columns: list, skip_columns: set, headers: dict, drive_id: str, file_id: str) -> bool:
+def _patch_row_values(batch: GraphWriteBatch, sheet_table: str, row_index: int, values: list, columns: list, skip_columns: set, tag: str = "") -> int:
     """
-    Write values to specific cells in an existing row, SKIPPING formula columns entirely.
-    Uses cell-level updates so formulas in other columns are never touched.
+    Queue values for specific cells in an existing row, SKIPPING formula columns entirely.
+    Uses cell-level updates so formulas in other columns are never touched; the batch
+    merges adjacent cells into range writes. Returns the number of cells queued.
     """
-    import requests as _requests
-
-    # Table data starts at sheet row 2 (row 1 = header)
-    sheet_row = row_index + 2
-
-    # Map column names to Excel column letters
-    col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T']
-
-    # Build updates for non-formula columns only
-    cells_to_update = {}
+    queued = 0
     for i, col in enumerate(columns):
         if col in skip_columns:
             continue  # Don't touch formula columns at all
-        if i < len(values) and i < len(col_letters):
+        if i < len(values):
             val = values[i]
             if val or val == 0:  # Write value (including 0)
-                cells_to_update[f"{col_letters[i]}{sheet_row}"] = val
-
-    # Batch update using range PATCH for each cell
-    for cell_addr, val in cells_to_update.items():
-        url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='{cell_addr}')"
-        resp = _requests.patch(url, headers=headers, json={"values": [[val]]}, timeout=10)
-        if resp.status_code != 200:
-            print(f"[graph] ⚠️ Failed to write {cell_addr}: {resp.status_code}")
-            return False
-
-    print(f"[graph] ✅ Wrote {len(cells_to_update)} cells to row {sheet_row}")
-    return True
+                batch.set_table_cell(sheet_table, row_index, i, val, tag=tag)
+                queued += 1
+    return queued
 
 
 _cached_table_columns: dict[str, list[str]] = {}
@@ -299,7 +761,6 @@ def graph_get_table_columns(sheet_table: str) -> list[str]:
     if sheet_table in _cached_table_columns and _cached_table_columns[sheet_table]:
         return _cached_table_columns[sheet_table]
 
-    import requests as _requests
 
     creds = _get_graph_token()
     if not creds:
@@ -309,7 +770,7 @@ def graph_get_table_columns(sheet_table: str) -> list[str]:
     url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/{sheet_table}/columns"
 
     try:
-        resp = _requests.get(
+        resp = graph_client.get(
             url,
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=15,
@@ -324,6 +785,221 @@ def graph_get_table_columns(sheet_table: str) -> list[str]:
     return FALLBACK_COLUMNS.get(sheet_table, [])
 
 
+# Row index: key column value -> Graph table row indices. Built from one rows fetch
+# and kept current by GraphWriteBatch as our own writes succeed.
+INDEXED_TABLES = {
+    "BillsT": {"keys": ("Bill Item ID", "Bill Title"), "formula_keys": ("Bill Item ID",)},
+    "OrderT": {"keys": ("Bill Item ID", "Order ID"), "formula_keys": ()},
+}
+ROW_INDEX_TTL = ITEMS_CACHE_TTL
+_row_index: dict[str, dict] = {}  # table -> {"columns", "rows", "key_cols", "keys", "time", "stale"}
+_row_index_lock = threading.Lock()
+
+
+def _cell_key(val) -> str:
+    """Normalize a cell value for index lookups (101.0 and "101" both -> "101")."""
+    if isinstance(val, float) and val.is_integer():
+        val = int(val)
+    return str(val).strip() if val is not None else ""
+
+
+def _key_column(columns: list[str], name: str) -> int | None:
+    """Index of the column named name, else the first whose header contains it."""
+    if name in columns:
+        return columns.index(name)
+    return next((i for i, c in enumerate(columns) if name in c), None)
+
+
+def _build_row_index(sheet_table: str, gen: int) -> dict | None:
+    """Fetch all rows of an indexed table once and build its key maps (at shared generation gen)."""
+    import time as _time
+
+    creds = _get_graph_token()
+    if not creds:
+        return None
+    columns = graph_get_table_columns(sheet_table)
+    access_token, drive_id, file_id = creds
+    rows_url = f"{GRAPH_ROOT}/drives/{drive_id}/items/{file_id}/workbook/tables/{sheet_table}/rows"
+    try:
+        resp = graph_client.get(rows_url, headers={"Authorization": f"Bearer {access_token}"}, timeout=15)
+    except graph_client.RequestException as e:
+        print(f"[graph] ⚠️ Could not index {sheet_table}: {e}")
+        return None
+    if resp.status_code != 200:
+        return None
+
+    index = {
+        "columns": columns,
+        "rows": {},
+        "key_cols": {},
+        "keys": {},
+        "time": _time.time(),
+        "stale": False,
+        "gen": gen,
+    }
+    for name in INDEXED_TABLES[sheet_table]["keys"]:
+        col = _key_column(columns, name)
+        if col is not None:
+            index["key_cols"][name] = col
+            index["keys"][name] = {}
+    for row in resp.json().get("value", []):
+        index["rows"][row["index"]] = list(row["values"][0]) if row.get("values") else []
+        _index_add_keys(index, row["index"])
+    return index
+
+
+def _index_add_keys(index: dict, row_index: int):
+    vals = index["rows"][row_index]
+    for name, col in index["key_cols"].items():
+        key = _cell_key(vals[col]) if col < len(vals) else ""
+        if key:
+            index["keys"][name].setdefault(key, []).append(row_index)
+
+
+def _index_remove_keys(index: dict, row_index: int):
+    vals = index["rows"][row_index]
+    for name, col in index["key_cols"].items():
+        key = _cell_key(vals[col]) if col < len(vals) else ""
+        rows = index["keys"][name].get(key)
+        if rows and row_index in rows:
+            rows.remove(row_index)
+            if not rows:
+                del index["keys"][name][key]
+
+
+def get_row_index(sheet_table: str) -> dict | None:
+    """Return the row index for BillsT/OrderT, building it if missing, stale or expired."""
+    import time as _time
+
+    with _row_index_lock:
+        index = _row_index.get(sheet_table)
+        gen, _ = shared_cache.get_store().generation(f"rows:{sheet_table}")
+        if index and not index["stale"] and index["gen"] == gen and _time.time() - index["time"] < ROW_INDEX_TTL:
+            return index
+        index = _build_row_index(sheet_table, gen)
+        if index is None:
+            _row_index.pop(sheet_table, None)
+        else:
+            _row_index[sheet_table] = index
+        return index
+
+
+def find_table_rows(sheet_table: str, key_name: str, value) -> list[int]:
+    """Table row indices whose key_name column equals value (e.g. "Bill Item ID", "101")."""
+    index = get_row_index(sheet_table)
+    if not index:
+        return []
+    return sorted(index["keys"].get(key_name, {}).get(_cell_key(value), []))
+
+
+def _row_has_data(vals) -> bool:
+    return any(str(v).strip() for v in vals if v)
+
+
+def read_table_rows(sheet_table: str, start: int, count: int) -> list[list] | None:
+    """
+    Current values of count rows of BillsT/OrderT from table row start, read live with
+    one range GET (never the whole table). None if Graph can't be reached.
+    """
+    creds = _get_graph_token()
+    columns = graph_get_table_columns(sheet_table)
+    if not creds or not columns or count <= 0:
+        return None
+    access_token, drive_id, file_id = creds
+    sheet, first_row = TABLE_SHEETS[sheet_table]
+    address = f"A{start + first_row}:{_col_letter(len(columns) - 1)}{start + first_row + count - 1}"
+    url = f"{GRAPH_ROOT}/drives/{drive_id}/items/{file_id}/workbook/worksheets('{sheet}')/range(address='{address}')"
+    try:
+        resp = graph_client.get(url, headers={"Authorization": f"Bearer {access_token}"},
+                                params={"$select": "values"}, timeout=10)
+    except graph_client.RequestException as e:
+        print(f"[graph] ⚠️ Could not read {sheet}!{address}: {e}")
+        return None
+    if resp.status_code != 200:
+        return None
+    return resp.json().get("values", [])
+
+
+def rows_still_match(sheet_table: str, row_indices: list[int], key_name: str | None = None,
+                     value=None, empty: bool = False) -> bool:
+    """
+    Confirm live, before a write that fills or clears them, that rows picked from the
+    row index are still what it says: each row's key_name column still equals value,
+    or (empty=True) the rows hold no data. The index only follows this app's writes,
+    so someone editing in Excel can make it wrong. On a mismatch (or if the rows can't
+    be read) the index is dropped and False is returned.
+    """
+    if not row_indices:
+        return True
+    start = min(row_indices)
+    rows = read_table_rows(sheet_table, start, max(row_indices) - start + 1)
+    index = get_row_index(sheet_table) if key_name else None
+    col = index["key_cols"].get(key_name) if index else None
+    ok = rows is not None and (key_name is None or col is not None)
+    for row_index in row_indices if ok else ():
+        vals = rows[row_index - start] if row_index - start < len(rows) else []
+        if empty and _row_has_data(vals):
+            ok = False
+        elif key_name and _cell_key(vals[col] if col < len(vals) else "") != _cell_key(value):
+            ok = False
+    if not ok:
+        print(f"[graph] {sheet_table} changed since it was indexed; re-reading it")
+        invalidate_row_index(sheet_table)
+    return ok
+
+
+def find_current_rows(sheet_table: str, key_name: str, value) -> list[int]:
+    """find_table_rows, confirmed live with rows_still_match (re-indexing once if they moved)."""
+    for _ in range(2):
+        rows = find_table_rows(sheet_table, key_name, value)
+        if not rows or rows_still_match(sheet_table, rows, key_name, value):
+            return rows
+    return []
+
+
+def _index_apply_cells(sheet_table: str, row_index: int, cells: dict[int, object]):
+    """Record a successful cell write in the row index (and tell other workers theirs is out of date)."""
+    new_gen = shared_cache.get_store().bump(f"rows:{sheet_table}")
+    with _row_index_lock:
+        index = _row_index.get(sheet_table)
+        if not index or index["stale"]:
+            return
+        if new_gen != index["gen"] + 1:
+            index["stale"] = True  # another worker wrote too; rebuild on next lookup
+            return
+        index["gen"] = new_gen
+        vals = index["rows"].setdefault(row_index, [])
+        formula_cols = {index["key_cols"][k] for k in INDEXED_TABLES[sheet_table]["formula_keys"] if k in index["key_cols"]}
+
+        def has_content(v):
+            return any(_cell_key(x) for i, x in enumerate(v) if i not in formula_cols)
+
+        had_content = has_content(vals)
+        _index_remove_keys(index, row_index)
+        width = max(cells) + 1
+        if len(vals) < width:
+            vals.extend([""] * (width - len(vals)))
+        for col, value in cells.items():
+            vals[col] = value
+        _index_add_keys(index, row_index)
+
+        # Filling or clearing a row changes formula-derived keys we can't compute locally
+        if formula_cols and had_content != has_content(vals):
+            index["stale"] = True
+
+
+def invalidate_row_index(sheet_table: str | None = None):
+    """Drop the row index for one table (or all) in every worker, e.g. after rows are added or deleted."""
+    store = shared_cache.get_store()
+    for table in INDEXED_TABLES if sheet_table is None else (sheet_table,):
+        store.bump(f"rows:{table}")
+    with _row_index_lock:
+        if sheet_table is None:
+            _row_index.clear()
+        else:
+            _row_index.pop(sheet_table, None)
+
+
 def sync_push() -> bool:
     """No-op — writes now go directly via Graph API."""
     return True
@@ -340,19 +1016,9 @@ SKIP_TITLE_PREFIXES = ("nan", "request", "liquid", "misc")
 
 def read_items() -> list[dict]:
     """
-    Read all items from the Bills sheet. Cached for 60s.
+    Read all items from the Bills sheet. Cached for ITEMS_CACHE_TTL, stale-while-revalidate.
     """
-    global _cached_items, _cached_items_time
-    import time as _time
-
-    now = _time.time()
-    if _cached_items and (now - _cached_items_time < ITEMS_CACHE_TTL):
-        return _cached_items
-
-    items = _read_items_from_xlsx()
-    _cached_items = items
-    _cached_items_time = now
-    return items
+    return _items_cache.get()
 
 
 def _read_items_from_xlsx() -> list[dict]:
@@ -361,69 +1027,114 @@ def _read_items_from_xlsx() -> list[dict]:
     Pulls latest from SharePoint first.
     Auto-detects header row by scanning for 'Item Name' column.
     Skips non-bill items (Liquid, Misc, etc.) same as automation.py.
-    Returns list of dicts with normalized keys.
+    Returns list of dicts with normalized keys. Raises if the workbook or its
+    header row can't be read.
     """
-    try:
-        with _lock:
-            sync_pull()
+    with _lock:
+        sync_pull()
 
-        if not os.path.exists(LOCAL_XLSX):
-            return []
+    if not os.path.exists(LOCAL_XLSX):
+        raise FileNotFoundError(f"{LOCAL_XLSX} not found")
+
+    header_row, rows = _read_local_sheet(SHEET_NAME)
+    if header_row is None:
+        raise RuntimeError(f"no header row in sheet {SHEET_NAME!r}")
+
+    items = []
+    for _, item in rows:
+        # Only include rows that have an Item Name
+        if not item.get("Item Name"):
+            continue
+        # Skip non-bill items (same filter as automation.py)
+        bill_title = str(item.get("Bill Title", "")).strip().lower()
+        if any(bill_title.startswith(prefix) for prefix in SKIP_TITLE_PREFIXES):
+            continue
+        # Skip items with negative Bill Item IDs (metadata rows)
+        try:
+            item_id = float(str(item.get("Bill Item ID", 0)))
+            if item_id < 0:
+                continue
+        except (ValueError, TypeError):
+            pass
+        items.append(item)
+
+    return items
 
-        wb = load_workbook(LOCAL_XLSX, read_only=True, data_only=True)
-        ws = wb[SHEET_NAME]
 
-        # Auto-detect header row by finding the row containing "Item Name"
-        header_row = None
-        headers = []
+def _header_values(row) -> list[str]:
+    return [str(cell).strip() if cell else "" for cell in row]
+
+
+def _read_local_sheet(sheet_name: str, engine: str | None = None,
+                      default_header: bool = False) -> tuple[int | None, list[tuple[int, dict]]]:
+    """
+    Read a sheet of the local xlsx as records keyed by its header row.
+
+    The header row is the first row containing "Item Name" (row 1 if none does and
+    default_header is set). Returns (header_row, [(row_number, record)]) with
+    whitespace in strings normalized and empty rows skipped; header_row is None if
+    the sheet or header is missing.
+
+    engine is an xlsx_reader engine ("fast" streams only the header columns out of
+    the sheet XML; "openpyxl" uses load_workbook(read_only=True)).
+    """
+    if xlsx_reader.resolve_engine(engine) == "fast":
+        with xlsx_reader.XlsxReader(LOCAL_XLSX) as book:
+            if sheet_name not in book.sheetnames:
+                return None, []
+            headers, header_row = [], None
+            for row_num, row in book.iter_rows(sheet_name):
+                if "Item Name" in _header_values(row):
+                    headers, header_row = _header_values(row), row_num
+                    break
+            if header_row is None:
+                if not default_header:
+                    return None, []
+                first = next(book.iter_rows(sheet_name, max_row=1), (1, ()))[1]
+                headers, header_row = _header_values(first), 1
+            named = [(i, h) for i, h in enumerate(headers) if h]
+            raw_rows = book.iter_rows(sheet_name, min_row=header_row + 1, columns=[i for i, _ in named])
+            return header_row, _records(raw_rows, [h for _, h in named])
+
+    wb = load_workbook(LOCAL_XLSX, read_only=True, data_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            return None, []
+        ws = wb[sheet_name]
+        headers, header_row = [], None
         for row_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
-            row_values = [str(cell).strip() if cell else "" for cell in row]
-            if "Item Name" in row_values:
-                header_row = row_idx
-                headers = row_values
+            if "Item Name" in _header_values(row):
+                headers, header_row = _header_values(row), row_idx
                 break
-
         if header_row is None:
-            wb.close()
-            return []
+            if not default_header:
+                return None, []
+            headers, header_row = _get_headers(ws)
+        named = [(i, h) for i, h in enumerate(headers) if h]
+        raw_rows = (
+            (row_idx, tuple(row[i] if i < len(row) else None for i, _ in named))
+            for row_idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), start=header_row + 1)
+        )
+        return header_row, _records(raw_rows, [h for _, h in named])
+    finally:
+        wb.close()
 
-        items = []
-        for row in ws.iter_rows(min_row=header_row + 1, values_only=True):
-            if not any(row):
-                continue
-            item = {}
-            for i, col in enumerate(headers):
-                if not col:
-                    continue
-                if i < len(row):
-                    val = row[i]
-                    # Normalize whitespace in strings
-                    if isinstance(val, str):
-                        val = " ".join(val.split())
-                    item[col] = val if val is not None else ""
-                else:
-                    item[col] = ""
-            # Only include rows that have an Item Name
-            if not item.get("Item Name"):
-                continue
-            # Skip non-bill items (same filter as automation.py)
-            bill_title = str(item.get("Bill Title", "")).strip().lower()
-            if any(bill_title.startswith(prefix) for prefix in SKIP_TITLE_PREFIXES):
-                continue
-            # Skip items with negative Bill Item IDs (metadata rows)
-            try:
-                item_id = float(str(item.get("Bill Item ID", 0)))
-                if item_id < 0:
-                    continue
-            except (ValueError, TypeError):
-                pass
-            items.append(item)
 
-        wb.close()
-        return items
-    except Exception as e:
-        print(f"[read_items] Error: {e}")
-        return []
+def _records(raw_rows, headers: list[str]) -> list[tuple[int, dict]]:
+    """Turn (row_number, values) rows into (row_number, {header: value}), skipping empty rows."""
+    records = []
+    for row_num, row in raw_rows:
+        if not any(row):
+            continue
+        item = {}
+        for i, col in enumerate(headers):
+            val = row[i] if i < len(row) else None
+            # Normalize whitespace in strings
+            if isinstance(val, str):
+                val = " ".join(val.split())
+            item[col] = val if val is not None else ""
+        records.append((row_num, item))
+    return records
 
 
 def get_bills() -> list[str]:
@@ -546,26 +1257,14 @@ def add_item(item_data: dict) -> bool:
 def read_queue_items() -> list[dict]:
     """
     Read all items from the Queue (TestTable) via Graph API.
-    Cached for ITEMS_CACHE_TTL seconds.
+    Cached for ITEMS_CACHE_TTL seconds, stale-while-revalidate.
     Falls back to local xlsx if Graph API unavailable.
     """
-    global _cached_queue, _cached_queue_time
-    import time as _time
-    import requests as _requests
-
-    now = _time.time()
-    if _cached_queue and (now - _cached_queue_time < ITEMS_CACHE_TTL):
-        return _cached_queue
-
-    result = _fetch_queue_items()
-    _cached_queue = result
-    _cached_queue_time = now
-    return result
+    return _queue_cache.get()
 
 
 def _fetch_queue_items() -> list[dict]:
-    """Fetch queue items from Graph API or local xlsx."""
-    import requests as _requests
+    """Fetch queue items from Graph API or local xlsx. Raises if neither can be read."""
 
     creds = _get_graph_token()
     if creds:
@@ -575,11 +1274,11 @@ def _fetch_queue_items() -> list[dict]:
         try:
             # Get columns
             cols_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/columns"
-            cols_resp = _requests.get(cols_url, headers=headers, timeout=10)
+            cols_resp = graph_client.get(cols_url, headers=headers, timeout=10)
 
             # Get rows
             rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows"
-            rows_resp = _requests.get(rows_url, headers=headers, timeout=10)
+            rows_resp = graph_client.get(rows_url, headers=headers, timeout=10)
 
             if cols_resp.status_code == 200 and rows_resp.status_code == 200:
                 columns = [c["name"] for c in cols_resp.json()["value"]]
@@ -599,42 +1298,22 @@ def _fetch_queue_items() -> list[dict]:
                         item["_table_index"] = row["index"]
                         items.append(item)
                 return items
-        except _requests.exceptions.RequestException as req_err:
+        except graph_client.RequestException as req_err:
             print(f"[xlsx] ⚠️ Queue Graph API request timed out: {req_err}")
 
     # Fallback to local xlsx
     with _lock:
         sync_pull()
         if not os.path.exists(LOCAL_XLSX):
-            return []
+            raise FileNotFoundError(f"{LOCAL_XLSX} not found")
 
-        wb = load_workbook(LOCAL_XLSX, read_only=True, data_only=True)
-        if QUEUE_SHEET_NAME not in wb.sheetnames:
-            wb.close()
-            return []
-        ws = wb[QUEUE_SHEET_NAME]
-        headers_list, header_row = _get_headers(ws)
+        header_row, rows = _read_local_sheet(QUEUE_SHEET_NAME, default_header=True)
 
         items = []
-        for row_idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), start=header_row + 1):
-            if not any(row):
-                continue
-            item = {}
-            for i, col in enumerate(headers_list):
-                if not col:
-                    continue
-                if i < len(row):
-                    val = row[i]
-                    if isinstance(val, str):
-                        val = " ".join(val.split())
-                    item[col] = val if val is not None else ""
-                else:
-                    item[col] = ""
+        for row_idx, item in rows:
             if item.get("Item Name"):
                 item["_table_index"] = row_idx - header_row - 1  # 0-indexed for Graph API
                 items.append(item)
-
-        wb.close()
         return items
 
 
@@ -660,19 +1339,12 @@ def move_to_bill(queue_items: list[dict], bill_title: str, add_separator: bool =
     - Deletes them from TestTable
     - Returns number of items successfully moved.
     """
-    import requests as _requests
 
     creds = _get_graph_token()
     if not creds:
         print("[graph] No credentials")
         return 0
 
-    access_token, drive_id, file_id = creds
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
-
     # Get BillsT columns
     bills_columns = graph_get_table_columns("BillsT")
     if not bills_columns:
@@ -680,26 +1352,30 @@ def move_to_bill(queue_items: list[dict], bill_title: str, add_separator: bool =
                          "Budget Section", "Vendor", "Description", "Quantity", "Cost",
                          "Total Cost", "Link", "File URL", "Person Requesting", "Remaining Allocation", "Column1"]
 
-    # Get existing rows to find next Request number
-    url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/BillsT/rows"
-    resp = _requests.get(url, headers=headers, timeout=15)
+    # Find next Request number from existing separator titles
+    index = get_row_index("BillsT")
     max_request_num = 0
-    if resp.status_code == 200:
-        for row in resp.json().get("value", []):
-            vals = row["values"][0]
-            bill_col = str(vals[2]) if vals[2] else ""
-            if bill_col.startswith("Request"):
-                try:
-                    num = int(bill_col.replace("Request", "").strip())
-                    if num > max_request_num:
-                        max_request_num = num
-                except ValueError:
-                    pass
+    for title in (index["keys"].get("Bill Title", {}) if index else {}):
+        if title.startswith("Request"):
+            try:
+                num = int(title.replace("Request", "").strip())
+                if num > max_request_num:
+                    max_request_num = num
+            except ValueError:
+                pass
 
     next_request = max_request_num + 1
 
-    # Find the first empty row to write to (formulas already exist there)
-    insert_at = _get_last_data_index("BillsT") + 1
+    # Find the first empty rows to write to (formulas already exist there), checking
+    # they are still empty in case someone filled them in Excel since the last index
+    needed = len(queue_items) + (1 if add_separator else 0)
+    for _ in range(2):
+        insert_at = _get_last_data_index("BillsT") + 1
+        if rows_still_match("BillsT", list(range(insert_at, insert_at + needed)), empty=True):
+            break
+    else:
+        print("[graph] ❌ Could not find empty BillsT rows to move the items into")
+        return 0
 
     # Columns with formulas — don't overwrite these
     FORMULA_COLUMNS = {"Bill Item ID", "Total Cost"}
@@ -710,10 +1386,9 @@ def move_to_bill(queue_items: list[dict], bill_title: str, add_separator: bool =
         separator_row_idx = insert_at
         insert_at += 1  # Items start after the separator slot
 
-    moved = 0
-    rows_to_delete = []
-
-    for item in queue_items:
+    # PATCH existing empty rows — preserves formulas in Bill Item ID and Total Cost
+    batch = GraphWriteBatch(creds)
+    for n, item in enumerate(queue_items):
         item_data = dict(item)
         item_data["Bill Title"] = bill_title
         item_data["Status"] = "bill requested"
@@ -725,30 +1400,34 @@ def move_to_bill(queue_items: list[dict], bill_title: str, add_separator: bool =
             val = item_data.get(col, "")
             row_values.append(val if val else "")
 
-        # PATCH existing empty row — preserves formulas in Bill Item ID and Total Cost
-        success = _patch_row_values("BillsT", insert_at, row_values, bills_columns, FORMULA_COLUMNS, headers, drive_id, file_id)
-        if success:
+        _patch_row_values(batch, "BillsT", insert_at + n, row_values, bills_columns, FORMULA_COLUMNS, tag=f"item{n}")
+    batch.flush()
+
+    moved = 0
+    rows_to_delete = []
+    for n, item in enumerate(queue_items):
+        if batch.ok(f"item{n}"):
             moved += 1
-            insert_at += 1
             if "_table_index" in item:
                 rows_to_delete.append(item["_table_index"])
+    print(f"[graph] ✅ Wrote {moved}/{len(queue_items)} items to BillsT")
+
+    # Delete from TestTable (in reverse order so indices don't shift), then write
+    # the separator row ONLY if items were successfully added
+    cleanup = GraphWriteBatch(creds)
+    for idx in sorted(rows_to_delete, reverse=True):
+        cleanup.delete_table_row("TestTable", idx, tag=f"del{idx}")
 
-    # Write separator row ONLY if items were successfully added
     if moved > 0 and separator_row_idx is not None:
         sep_values = [""] * len(bills_columns)
         bill_title_idx = bills_columns.index("Bill Title") if "Bill Title" in bills_columns else 2
         sep_values[bill_title_idx] = f"Request {next_request}"
-        _patch_row_values("BillsT", separator_row_idx, sep_values, bills_columns, FORMULA_COLUMNS, headers, drive_id, file_id)
+        _patch_row_values(cleanup, "BillsT", separator_row_idx, sep_values, bills_columns, FORMULA_COLUMNS)
+    cleanup.flush()
 
-    # Delete from TestTable (in reverse order so indices don't shift)
-    rows_to_delete.sort(reverse=True)
     for idx in rows_to_delete:
-        del_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/TestTable/rows/itemAt(index={idx})"
-        resp = _requests.delete(del_url, headers=headers, timeout=10)
-        if resp.status_code == 204:
+        if cleanup.ok(f"del{idx}"):
             print(f"[graph] Deleted queue row index {idx}")
-        else:
-            print(f"[graph] Failed to delete row {idx}: {resp.status_code}")
 
     # Also sync local file
     sync_pull()
@@ -769,44 +1448,23 @@ def update_item(item_id: str, updates: dict) -> bool:
 
     creds = _get_graph_token()
     if creds:
-        access_token, drive_id, file_id = creds
-        headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-
-        # Read rows to find row matching Bill Item ID
-        rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/BillsT/rows"
-        import requests as _requests
-        resp = _requests.get(rows_url, headers=headers, timeout=15)
-
-        if resp.status_code == 200:
-            target_idx = None
-            for row in resp.json().get("value", []):
-                vals = row["values"][0] if row.get("values") else []
-                if vals and str(vals[0]).strip() == str(item_id).strip():
-                    target_idx = row["index"]
-                    break
+        # Find the row matching Bill Item ID
+        matches = find_current_rows("BillsT", "Bill Item ID", item_id)
+        if matches:
+            bills_columns = graph_get_table_columns("BillsT")
+
+            FORMULA_COLUMNS = {"Bill Item ID", "Total Cost"}
+            batch = GraphWriteBatch(creds)
+            for field_name, value in updates.items():
+                if field_name in FORMULA_COLUMNS:
+                    continue
+                if field_name in bills_columns:
+                    batch.set_table_cell("BillsT", matches[0], bills_columns.index(field_name), value)
+            batch.flush()
 
-            if target_idx is not None:
-                bills_columns = graph_get_table_columns("BillsT")
-                sheet_row = target_idx + 2
-                col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T']
-
-                FORMULA_COLUMNS = {"Bill Item ID", "Total Cost"}
-                updated_count = 0
-                for field_name, value in updates.items():
-                    if field_name in FORMULA_COLUMNS:
-                        continue
-                    if field_name in bills_columns:
-                        c_idx = bills_columns.index(field_name)
-                        if c_idx < len(col_letters):
-                            cell_addr = f"{col_letters[c_idx]}{sheet_row}"
-                            url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='{cell_addr}')"
-                            patch_resp = _requests.patch(url, headers=headers, json={"values": [[value]]}, timeout=10)
-                            if patch_resp.status_code == 200:
-                                updated_count += 1
-
-                if updated_count > 0:
-                    invalidate_items_cache()
-                    return True
+            if batch.ok_count() > 0:
+                invalidate_items_cache()
+                return True
 
     # Fallback: update local xlsx
     with _lock:
@@ -847,23 +1505,13 @@ def update_item(item_id: str, updates: dict) -> bool:
 
         wb.save(LOCAL_XLSX)
         wb.close()
-        invalidate_items_cache()
+        invalidate_items_cache(wait=True)  # local file changed
         return True
 
 
 def graph_get_order_rows() -> list[dict]:
-    """Read all rows from OrderT via Graph API. Cached for ITEMS_CACHE_TTL seconds."""
-    global _cached_orders, _cached_orders_time
-    import time as _time
-
-    now = _time.time()
-    if _cached_orders and (now - _cached_orders_time < ITEMS_CACHE_TTL):
-        return _cached_orders
-
-    result = _fetch_order_rows()
-    _cached_orders = result
-    _cached_orders_time = now
-    return result
+    """Read all rows from OrderT via Graph API. Cached for ITEMS_CACHE_TTL seconds, stale-while-revalidate."""
+    return _orders_cache.get()
 
 
 def graph_update_order_item(table_index: int, updates: dict) -> bool:
@@ -871,23 +1519,15 @@ def graph_update_order_item(table_index: int, updates: dict) -> bool:
     Update fields of a single item row in OrderT by table_index via Graph API.
     Updates matching columns and invalidates orders cache.
     """
-    import requests as _requests
-
     creds = _get_graph_token()
     if not creds:
         return False
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-
     order_columns = graph_get_table_columns("OrderT")
     if not order_columns:
         return False
 
-    sheet_row = table_index + 3  # +3 because row 1=TOTALS, row 2=header, 0-based index
-    col_letters = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R']
-
-    success_count = 0
+    batch = GraphWriteBatch(creds)
     for field, value in updates.items():
         matched_idx = None
         for i, c_name in enumerate(order_columns):
@@ -895,15 +1535,10 @@ def graph_update_order_item(table_index: int, updates: dict) -> bool:
                 matched_idx = i
                 break
 
-        if matched_idx is not None and matched_idx < len(col_letters):
-            col_letter = col_letters[matched_idx]
-            cell_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{col_letter}{sheet_row}')"
-            try:
-                r = _requests.patch(cell_url, headers=headers, json={"values": [[value]]}, timeout=10)
-                if r.status_code == 200:
-                    success_count += 1
-            except Exception as e:
-                print(f"[graph] ⚠️ Error updating cell {col_letter}{sheet_row}: {e}")
+        if matched_idx is not None:
+            batch.set_table_cell("OrderT", table_index, matched_idx, value)
+    batch.flush()
+    success_count = batch.ok_count()
 
     if success_count > 0:
         invalidate_orders_cache()
@@ -912,24 +1547,23 @@ def graph_update_order_item(table_index: int, updates: dict) -> bool:
 
 
 def _fetch_order_rows() -> list[dict]:
-    """Fetch order rows directly from Graph API."""
-    import requests as _requests
+    """Fetch order rows directly from Graph API. Raises RuntimeError if they can't be read."""
 
     creds = _get_graph_token()
     if not creds:
-        return []
+        raise RuntimeError("no Graph credentials")
 
     access_token, drive_id, file_id = creds
     headers = {"Authorization": f"Bearer {access_token}"}
 
     cols_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/OrderT/columns"
-    cols_resp = _requests.get(cols_url, headers=headers, timeout=10)
+    cols_resp = graph_client.get(cols_url, headers=headers, timeout=10)
 
     rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/OrderT/rows"
-    rows_resp = _requests.get(rows_url, headers=headers, timeout=15)
+    rows_resp = graph_client.get(rows_url, headers=headers, timeout=15)
 
     if cols_resp.status_code != 200 or rows_resp.status_code != 200:
-        return []
+        raise RuntimeError(f"OrderT read failed: {cols_resp.status_code}/{rows_resp.status_code}")
 
     columns = [c["name"] for c in cols_resp.json()["value"]]
     items = []
@@ -952,45 +1586,24 @@ def _fetch_order_rows() -> list[dict]:
     return items
 
 
-def graph_update_order_status(order_id_col_name: str, order_id: str, status: str, columns: list[str]) -> bool:
+def graph_update_order_status(order_id: str, status: str, columns: list[str]) -> bool:
     """Update the Status column for all rows matching an Order ID in OrderT."""
-    import requests as _requests
 
     creds = _get_graph_token()
     if not creds:
         return False
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-
-    # Get rows
-    rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/OrderT/rows"
-    resp = _requests.get(rows_url, headers=headers, timeout=15)
-    if resp.status_code != 200:
+    status_col_idx = columns.index("Status") if "Status" in columns else None
+    if status_col_idx is None:
         return False
 
-    # Find order ID column index and status column index
-    order_col_idx = None
-    status_col_idx = None
-    for i, col in enumerate(columns):
-        if "Order ID" in col:
-            order_col_idx = i
-        if col == "Status":
-            status_col_idx = i
-
-    if order_col_idx is None or status_col_idx is None:
-        return False
+    # Queue a Status cell write for each row of the order
+    batch = GraphWriteBatch(creds)
+    for row_index in find_current_rows("OrderT", "Order ID", order_id):
+        batch.set_table_cell("OrderT", row_index, status_col_idx, status)
+    batch.flush()
+    updated = batch.ok_count()
 
-    # Find matching rows and update status
-    updated = 0
-    for row in resp.json().get("value", []):
-        vals = row["values"][0]
-        row_order_id = str(vals[order_col_idx]).strip() if order_col_idx < len(vals) and vals[order_col_idx] else ""
-        if row_order_id == order_id:
-            # Update status cell: OrderT header is row 2, data starts row 3
-            sheet_row = row["index"] + 3  # +3 because row 1=TOTALS, row 2=header, index is 0-based
-            col_letter = chr(65 + status_col_idx)
-            url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{col_letter}{sheet_row}')"
     if updated > 0:
         invalidate_orders_cache()
         return True
@@ -1006,7 +1619,6 @@ def graph_apply_spacer_formatting() -> bool:
     Note: The Graph API ConditionalFormat endpoint is available but has limitations.
     This function creates a custom conditional format on the OrderT data range.
     """
-    import requests as _requests
 
     creds = _get_graph_token()
     if not creds:
@@ -1021,7 +1633,7 @@ def graph_apply_spacer_formatting() -> bool:
 
     # Get the used range on the Ordering sheet to know the extent
     range_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/usedRange"
-    resp = _requests.get(range_url, headers=headers, timeout=10)
+    resp = graph_client.get(range_url, headers=headers, timeout=10)
     if resp.status_code != 200:
         print(f"[graph] Failed to get used range: {resp.status_code}")
         return False
@@ -1039,8 +1651,6 @@ def graph_apply_spacer_formatting() -> bool:
     format_range = f"A3:{last_col}{last_row}"
 
     # Create conditional format via Graph API
-    cf_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Ordering')/range(address='{format_range}')/conditionalFormats/add"
-
     payload = {
         "type": "custom",
         "rule": {
@@ -1053,46 +1663,38 @@ def graph_apply_spacer_formatting() -> bool:
         }
     }
 
-    resp = _requests.post(cf_url, headers=headers, json=payload, timeout=15)
+    batch = GraphWriteBatch(creds)
+    batch.add_request(
+        "POST", f"/worksheets('Ordering')/range(address='{format_range}')/conditionalFormats/add",
+        payload, label="conditionalFormats/add",
+    )
+    batch.flush()
 
-    if resp.status_code in (200, 201):
+    if batch.ok():
         print(f"[graph] ✅ Applied pink conditional formatting to spacer rows on Ordering!{format_range}")
         return True
     else:
-        print(f"[graph] ❌ Failed to apply conditional formatting: {resp.status_code} {resp.text[:200]}")
+        print("[graph] ❌ Failed to apply conditional formatting")
         return False
 
 
 def delete_item(item_id: str) -> bool:
     """Clear an item row by Bill Item ID via Graph API (preserves table structure)."""
-    import requests as _requests
 
     creds = _get_graph_token()
     if not creds:
         return False
 
-    access_token, drive_id, file_id = creds
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
-
     # Find the row with this Bill Item ID
-    rows_url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/tables/BillsT/rows"
-    resp = _requests.get(rows_url, headers=headers, timeout=15)
-    if resp.status_code != 200:
-        return False
-
-    target_idx = None
-    for row in resp.json().get("value", []):
-        vals = row["values"][0]
-        row_id = str(vals[0]).strip() if vals[0] else ""
-        if row_id and row_id == str(item_id).strip():
-            target_idx = row["index"]
-            break
+    matches = find_current_rows("BillsT", "Bill Item ID", item_id)
+    target_idx = matches[0] if matches else None
 
     if target_idx is None:
         # Fallback: try matching by index directly (item_id might be the table index)
+        index = get_row_index("BillsT")
         try:
             idx = int(item_id)
-            if 0 <= idx < len(resp.json().get("value", [])):
+            if index and idx in index["rows"]:
                 target_idx = idx
         except (ValueError, TypeError):
             pass
@@ -1103,16 +1705,13 @@ def delete_item(item_id: str) -> bool:
 
     # Clear the row (columns B through J and L through P, skip A and K which have formulas)
     sheet_row = target_idx + 2
-    url = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='B{sheet_row}:J{sheet_row}')"
-    resp = _requests.patch(url, headers=headers, json={"values": [[""] * 9]}, timeout=10)
-    url2 = f"https://graph.microsoft.com/v1.0/drives/{drive_id}/items/{file_id}/workbook/worksheets('Bills')/range(address='L{sheet_row}:P{sheet_row}')"
-    resp2 = _requests.patch(url2, headers=headers, json={"values": [[""] * 5]}, timeout=10)
-
-    if resp.status_code == 200 and resp2.status_code == 200:
-        # Reset cache
-        global _cached_items, _cached_items_time
-        _cached_items = []
-        _cached_items_time = 0
+    batch = GraphWriteBatch(creds)
+    for col in BILLS_CLEAR_COLUMNS:
+        batch.set_table_cell("BillsT", target_idx, col, "")
+    batch.flush()
+
+    if batch.ok():
+        invalidate_items_cache()
         print(f"[graph] ✅ Cleared row {sheet_row} (item ID {item_id})")
         return True
 
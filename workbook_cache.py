@@ -0,0 +1,135 @@
+"""
+workbook_cache.py - On-disk snapshots of parsed sheets for the CLI scripts.
+
+Every mrg-finance command re-reads FY27_Bills_Budget.xlsx, often several times
+per run. Parsed DataFrames are pickled under ~/.cache/mrg-finance, keyed by the
+workbook's content hash, so repeated runs against an unchanged workbook skip
+parsing entirely.
+
+The hash is only recomputed when the file's size or mtime changes; an rclone
+copy that rewrites identical bytes still hits the cache.
+
+Set MRG_SNAPSHOT_CACHE=0 to disable, MRG_CACHE_DIR to move it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+CACHE_DIR = os.environ.get("MRG_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mrg-finance"))
+ENABLED = os.environ.get("MRG_SNAPSHOT_CACHE", "1").lower() not in ("0", "false", "no", "off")
+# Bump when the shape of cached frames changes so old pickles are ignored
+FORMAT_VERSION = 1
+
+# In-process copy so one run reading the same sheet twice doesn't even unpickle twice
+_memory: dict[tuple[str, str], object] = {}
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _slot(path: str) -> str:
+    """Cache file prefix for a workbook path (one snapshot file per workbook)."""
+    return os.path.join(CACHE_DIR, hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12])
+
+
+def sidecar_path(path: str, suffix: str) -> str:
+    """Path in the cache dir for extra per-workbook state, e.g. sidecar_path(xlsx, "doctor.json")."""
+    return f"{_slot(path)}.{suffix}"
+
+
+def fingerprint(path: str) -> str:
+    """Content hash of path, reusing the stored hash while size and mtime are unchanged."""
+    st = os.stat(path)
+    stamp_file = _slot(path) + ".json"
+    try:
+        with open(stamp_file) as f:
+            stamp = json.load(f)
+        if stamp["size"] == st.st_size and stamp["mtime_ns"] == st.st_mtime_ns:
+            return stamp["hash"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = _file_hash(path)
+    write_atomic(stamp_file, json.dumps({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}).encode())
+    return digest
+
+
+def write_atomic(target: str, data: bytes):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _load_snapshot(path: str, digest: str) -> dict:
+    try:
+        with open(_slot(path) + ".pkl", "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return {}
+    if snapshot.get("hash") != digest or snapshot.get("version") != FORMAT_VERSION:
+        return {}
+    return snapshot["frames"]
+
+
+def cached(path: str, key: str, loader):
+    """
+    Return loader() for workbook path, from the snapshot cache when the workbook is unchanged.
+
+    key identifies what loader parses (sheet, header row, engine...). The result must
+    be picklable; callers get their own copy of DataFrames.
+    """
+    if not ENABLED or not os.path.exists(path):
+        return loader()
+    try:
+        digest = fingerprint(path)
+    except OSError:
+        return loader()
+
+    mem_key = (os.path.abspath(path), digest + ":" + key)
+    if mem_key in _memory:
+        return _copy(_memory[mem_key])
+
+    frames = _load_snapshot(path, digest)
+    if key in frames:
+        _memory[mem_key] = frames[key]
+        return _copy(frames[key])
+
+    value = loader()
+    frames[key] = value
+    try:
+        blob = pickle.dumps({"version": FORMAT_VERSION, "hash": digest, "frames": frames}, protocol=pickle.HIGHEST_PROTOCOL)
+        write_atomic(_slot(path) + ".pkl", blob)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"⚠️ Could not save spreadsheet snapshot: {e}")
+    _memory[mem_key] = value
+    return _copy(value)
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, "copy") else value
+
+
+def clear():
+    """Delete all snapshots."""
+    _memory.clear()
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith((".pkl", ".json")):
+                os.remove(os.path.join(CACHE_DIR, name))
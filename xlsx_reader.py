@@ -0,0 +1,339 @@
+"""
+xlsx_reader.py - Fast read-only access to worksheet values in an xlsx file.
+
+An xlsx is a zip of XML parts. This reader opens the zip once, loads the shared
+string table once, and streams only the requested sheet in blocks of rows,
+keeping only the requested columns. There's no per-cell object model like openpyxl's, so
+reading the Bills/Test/Ordering sheets is several times faster.
+
+Values match openpyxl's load_workbook(read_only=True, data_only=True): shared and
+inline strings, int/float numbers, booleans, cached formula results, and dates
+for cells with a date number format (in the workbook's 1900 or 1904 date system).
+
+The engine used by the spreadsheet readers is picked with XLSX_READER_ENGINE:
+"fast" (this module, default) or "openpyxl".
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+import zipfile
+from typing import Iterable, Iterator
+from xml.etree.ElementTree import iterparse, fromstring
+
+from openpyxl.utils.datetime import from_excel, MAC_EPOCH, WINDOWS_EPOCH
+
+ENGINES = ("fast", "openpyxl")
+DEFAULT_ENGINE = os.environ.get("XLSX_READER_ENGINE", "fast")
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_VALUE = _NS + "v"
+_INLINE = _NS + "is"
+_TEXT = _NS + "t"
+_RUN = _NS + "r"
+
+# Built-in number formats that display dates/times (ECMA-376 18.8.30)
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(45, 48))
+_COLUMN_REF = re.compile(r"[A-Z]+")
+_XMLNS = re.compile(rb'\sxmlns(?::[\w.-]+)?="[^"]*"')
+
+
+def resolve_engine(engine: str | None) -> str:
+    """Return engine, or DEFAULT_ENGINE if None. Raises ValueError for unknown names."""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown xlsx engine '{engine}' (expected one of {', '.join(ENGINES)})")
+    return engine
+
+
+def _column_index(ref: str) -> int:
+    """'A1' -> 0, 'AB12' -> 27."""
+    idx = 0
+    for ch in _COLUMN_REF.match(ref).group():
+        idx = idx * 26 + ord(ch) - 64
+    return idx - 1
+
+
+def _is_date_format(code: str) -> bool:
+    """True if a custom number format code displays a date or time."""
+    code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", code)  # drop literals, colours, escapes
+    return bool(re.search(r"[dmyhs]", code, re.IGNORECASE))
+
+
+def _cast_number(text: str):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+class XlsxReader:
+    """
+    Read-only view of an xlsx file's cell values.
+
+        with XlsxReader(path) as book:
+            for row_num, values in book.iter_rows("Bills"):
+                ...
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._epoch = WINDOWS_EPOCH
+        self._sheets = self._read_sheet_paths()
+        self._shared_strings: list[str] | None = None
+        self._date_styles: set[int] | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self._sheets)
+
+    def _read_sheet_paths(self) -> dict[str, str]:
+        """Map sheet name -> zip path of its worksheet XML, in workbook order. Also picks the date epoch."""
+        rels = fromstring(self._zip.read("xl/_rels/workbook.xml.rels"))
+        targets = {}
+        for rel in rels.iter(_PKG_REL_NS + "Relationship"):
+            target = rel.get("Target", "")
+            # Targets are relative to xl/ unless absolute
+            targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+        workbook = fromstring(self._zip.read("xl/workbook.xml"))
+        props = workbook.find(_NS + "workbookPr")
+        if props is not None and props.get("date1904", "").lower() in ("1", "true"):
+            self._epoch = MAC_EPOCH
+        sheets = {}
+        for sheet in workbook.iter(_NS + "sheet"):
+            path = targets.get(sheet.get(_REL_NS + "id"))
+            if path:
+                sheets[sheet.get("name")] = path
+        return sheets
+
+    def _strings(self) -> list[str]:
+        """The shared string table, parsed on first use."""
+        if self._shared_strings is None:
+            strings = []
+            if "xl/sharedStrings.xml" in self._zip.namelist():
+                with self._zip.open("xl/sharedStrings.xml") as f:
+                    for _, elem in iterparse(f):
+                        if elem.tag == _NS + "si":
+                            strings.append(_rich_text(elem))
+                            elem.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def _dates(self) -> set[int]:
+        """Indices of cell styles (the c/@s attribute) that format numbers as dates."""
+        if self._date_styles is None:
+            styles = set()
+            if "xl/styles.xml" in self._zip.namelist():
+                root = fromstring(self._zip.read("xl/styles.xml"))
+                date_formats = set(_BUILTIN_DATE_FORMATS)
+                for fmt in root.iter(_NS + "numFmt"):
+                    if _is_date_format(fmt.get("formatCode", "")):
+                        date_formats.add(int(fmt.get("numFmtId")))
+                cell_xfs = root.find(_NS + "cellXfs")
+                if cell_xfs is not None:
+                    for i, xf in enumerate(cell_xfs.iter(_NS + "xf")):
+                        if int(xf.get("numFmtId", 0)) in date_formats:
+                            styles.add(i)
+            self._date_styles = styles
+        return self._date_styles
+
+    def iter_rows(self, sheet: str, min_row: int = 1, max_row: int | None = None,
+                  columns: Iterable[int] | None = None) -> Iterator[tuple[int, tuple]]:
+        """
+        Yield (row_number, values) for each stored row of a sheet (1-indexed row numbers).
+
+        columns: 0-based column indices to keep, in the order given. Defaults to every
+        column up to the widest row seen so far. Missing cells are None.
+        Rows Excel didn't store (never edited) are skipped, so check row_number.
+        """
+        if sheet not in self._sheets:
+            raise KeyError(f"Worksheet {sheet} does not exist.")
+        strings = self._strings()
+        dates = self._dates()
+        wanted = list(columns) if columns is not None else None
+        slots = {col: i for i, col in enumerate(wanted)} if wanted is not None else None
+        width = len(wanted) if wanted is not None else 0
+        next_row = 1
+        column_of: dict[str, int] = {}
+
+        with self._zip.open(self._sheets[sheet]) as f:
+            for elem in _row_elements(f):
+                row_num = int(elem.get("r") or next_row)
+                next_row = row_num + 1
+                if row_num < min_row:
+                    continue
+                if max_row is not None and row_num > max_row:
+                    break
+
+                cells = {}
+                next_col = 0
+                for c in elem:
+                    ref = c.get("r")
+                    if ref:
+                        letters = ref.rstrip("0123456789")
+                        col = column_of.get(letters)
+                        if col is None:
+                            col = column_of[letters] = _column_index(letters)
+                    else:
+                        col = next_col
+                    next_col = col + 1
+                    if slots is not None:
+                        if col not in slots:
+                            continue
+                        col = slots[col]
+                    value = _cell_value(c, strings, dates, self._epoch)
+                    if value is not None:
+                        cells[col] = value
+
+                if slots is None and cells:
+                    width = max(width, max(cells) + 1)
+                yield row_num, tuple(cells.get(i) for i in range(width))
+
+    def read_rows(self, sheet: str, **kwargs) -> list[tuple]:
+        """All rows of a sheet as value tuples, with gaps filled and trailing empty rows dropped."""
+        rows = []
+        expected = kwargs.get("min_row", 1)
+        for row_num, values in self.iter_rows(sheet, **kwargs):
+            rows.extend(() for _ in range(row_num - expected))
+            rows.append(values)
+            expected = row_num + 1
+        while rows and not any(v is not None for v in rows[-1]):
+            rows.pop()
+        return rows
+
+
+def _row_elements(f, chunk_size: int = 1 << 18) -> Iterator:
+    """
+    Yield the <row> elements of a worksheet XML stream.
+
+    Rather than iterparse (a Python-level event per cell and value element), the
+    <sheetData> body is cut into blocks of whole rows and each block is parsed in
+    one C-level fromstring call, with the worksheet's namespace declarations.
+    """
+    buf = b""
+    while b"<sheetData" not in buf:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+    head, _, buf = buf.partition(b"<sheetData")
+    while b">" not in buf:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+    tag, _, buf = buf.partition(b">")
+    if tag.endswith(b"/"):
+        return  # <sheetData/>: no rows
+    wrapper = b"<sheetData" + b"".join(_XMLNS.findall(head)) + b">"
+
+    done = False
+    while not done:
+        chunk = f.read(chunk_size)
+        if chunk:
+            buf += chunk
+        end = buf.find(b"</sheetData>")
+        if end >= 0:
+            block, buf, done = buf[:end], b"", True
+        elif not chunk:
+            block, buf, done = buf, b"", True
+        else:
+            cut = buf.rfind(b"</row>")
+            if cut < 0:
+                continue
+            block, buf = buf[:cut + 6], buf[cut + 6:]
+        if block.strip():
+            yield from fromstring(wrapper + block + b"</sheetData>")
+
+
+def _rich_text(elem) -> str:
+    """Text of an <si> or <is> element: plain <t>, or the <t> of each rich-text run."""
+    t = elem.find(_TEXT)
+    if t is not None:
+        return t.text or ""
+    return "".join(r.findtext(_TEXT, "") for r in elem.iter(_RUN))
+
+
+def _cell_value(c, strings: list[str], dates: set[int], epoch=WINDOWS_EPOCH):
+    kind = c.get("t", "n")
+    if kind == "inlineStr":
+        inline = c.find(_INLINE)
+        return _rich_text(inline) if inline is not None else None
+    v = c.find(_VALUE)
+    if v is None or v.text is None:
+        return None
+    text = v.text
+    if kind == "s":
+        return strings[int(text)]
+    if kind == "n":
+        number = _cast_number(text)
+        style = c.get("s")
+        if style is not None and int(style) in dates:
+            return from_excel(number, epoch)
+        return number
+    if kind == "b":
+        return text == "1"
+    return text  # "str" (formula result), "e" (error like #N/A), "d" (ISO date)
+
+
+def read_rows(path: str, sheet: str, **kwargs) -> list[tuple]:
+    """Open path and return XlsxReader.read_rows(sheet)."""
+    with XlsxReader(path) as book:
+        return book.read_rows(sheet, **kwargs)
+
+
+def sheet_names(path: str) -> list[str]:
+    with XlsxReader(path) as book:
+        return book.sheetnames
+
+
+def read_frame(path: str, sheet: str, header: int = 0):
+    """Read a sheet into a DataFrame like pd.read_excel(path, sheet_name=sheet, header=header)."""
+    return frame_from_rows(read_rows(path, sheet), header=header)
+
+
+def frame_from_rows(rows: list, header: int = 0):
+    """
+    Build the DataFrame pd.read_excel(..., header=header) makes from these cell values.
+
+    The rows go through the same pandas TextParser call read_excel uses, after the
+    cell conversion its openpyxl reader does (empty cells -> "", whole floats -> int),
+    so column names ("Unnamed: N", ".1" suffixes), dtypes (float columns with NaN for
+    gaps, datetime64, ...) and NA handling are the same as with the openpyxl engine.
+    """
+    import pandas as pd
+    from pandas.errors import EmptyDataError
+    from pandas.io.parsers import TextParser
+
+    if len(rows) <= header:
+        return pd.DataFrame()
+    width = max(len(r) for r in rows)
+    data = [[_excel_value(v) for v in r] + [""] * (width - len(r)) for r in rows]
+    try:
+        return TextParser(data, header=header, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def _excel_value(value):
+    """A cell value as pandas' openpyxl reader passes it on."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value